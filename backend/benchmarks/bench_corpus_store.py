@@ -0,0 +1,131 @@
+"""
+Benchmark: packed corpus store vs. the flat one-file-per-abstract layout
+
+Measures write throughput, random-read throughput, listing time and disk usage
+for N synthetic abstracts.
+
+Usage (from backend/):
+    python benchmarks/bench_corpus_store.py [--papers 20000] [--reads 5000] [--codec gzip]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from services.corpus_store import CorpusStore, abstract_filename, format_abstract
+
+WORDS = (
+    "we propose a novel method for learning representations of graphs neural networks "
+    "results show significant improvements over baselines on benchmark datasets theory "
+    "quantum field model data analysis experiments simulation galaxy protein optimization"
+).split()
+
+
+def make_papers(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    papers = []
+    for i in range(n):
+        papers.append({
+            "arxiv_id": f"2601.{i:05d}",
+            "title": " ".join(rng.choices(WORDS, k=10)).title(),
+            "abstract": " ".join(rng.choices(WORDS, k=rng.randint(120, 250))),
+            "subject": rng.choice(["cs", "math", "physics", "astro-ph"]),
+        })
+    return papers
+
+
+def dir_usage(path: Path):
+    files = 0
+    size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return files, size
+
+
+def bench_flat(papers, read_ids, workdir: Path):
+    data_dir = workdir / "flat"
+    data_dir.mkdir()
+    start = time.perf_counter()
+    for p in papers:
+        with open(data_dir / abstract_filename(p["arxiv_id"]), "w", encoding="utf-8") as f:
+            f.write(format_abstract(p["title"], p["abstract"]))
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for aid in read_ids:
+        with open(data_dir / abstract_filename(aid), "r", encoding="utf-8") as f:
+            f.read()
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    listed = sum(1 for e in os.scandir(data_dir) if e.name.endswith("_abstract.txt") and e.is_file())
+    list_s = time.perf_counter() - start
+
+    files, size = dir_usage(data_dir)
+    return write_s, read_s, list_s, listed, files, size
+
+
+def bench_packed(papers, read_ids, workdir: Path, codec):
+    store = CorpusStore(root_dir=str(workdir / "packed"), codec=codec)
+    start = time.perf_counter()
+    batch = 1000
+    for i in range(0, len(papers), batch):
+        store.put_many(papers[i:i + batch])
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for aid in read_ids:
+        store.read_text(abstract_filename(aid))
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    listed = store.count()
+    list_s = time.perf_counter() - start
+
+    usage = store.disk_usage()
+    codec_used = store.codec
+    store.close()
+    return write_s, read_s, list_s, listed, usage["files"], usage["bytes"], codec_used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=20000)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--codec", choices=["zstd", "gzip"], default=None)
+    args = parser.parse_args()
+
+    papers = make_papers(args.papers)
+    rng = random.Random(1)
+    read_ids = [rng.choice(papers)["arxiv_id"] for _ in range(args.reads)]
+
+    workdir = Path(tempfile.mkdtemp(prefix="corpus-bench-"))
+    try:
+        fw, fr, fl, fcount, ffiles, fbytes = bench_flat(papers, read_ids, workdir)
+        pw, pr, pl, pcount, pfiles, pbytes, codec = bench_packed(papers, read_ids, workdir, args.codec)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.papers} abstracts, {args.reads} random reads (packed codec: {codec})")
+    print(f"{'':14}{'flat':>14}{'packed':>14}")
+    print(f"{'writes/s':14}{args.papers / fw:14.0f}{args.papers / pw:14.0f}")
+    print(f"{'reads/s':14}{args.reads / fr:14.0f}{args.reads / pr:14.0f}")
+    print(f"{'list (ms)':14}{fl * 1000:14.2f}{pl * 1000:14.2f}")
+    print(f"{'listed':14}{fcount:14d}{pcount:14d}")
+    print(f"{'files':14}{ffiles:14d}{pfiles:14d}")
+    print(f"{'bytes':14}{fbytes:14d}{pbytes:14d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: bulk abstract fetching, blocking scraper vs async crawler
+
+Starts a local stand-in for arXiv (list pages and abstract pages with
+artificial latency) and fetches the same papers with:
+- HTMLpull.fetch_arxiv_abstracts_bulk: one request at a time, sleeping `delay` between them
+- ArxivCrawler: pooled async client, token bucket at 1/delay requests per
+  second, list paging overlapped with abstract fetches
+
+Usage (from backend/):
+    python benchmarks/bench_crawler.py [--papers 200] [--latency-ms 80] [--delay 0.02] [--concurrency 8]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+backend_dir = Path(__file__).resolve().parent.parent
+for path in (backend_dir, backend_dir / "services" / "web_scraper"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from scraper import HTMLpull
+from async_crawler import ArxivCrawler
+
+ABSTRACT = (
+    "We propose a method for learning representations of graphs with attention. "
+    "Experiments on standard benchmarks show improvements over strong baselines. "
+) * 6
+
+
+def make_handler(papers: int, latency: float):
+    class StandInArxiv(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: str):
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            if url.path.startswith("/list/"):
+                query = parse_qs(url.query)
+                skip = int(query.get("skip", ["0"])[0])
+                show = int(query.get("show", ["50"])[0])
+                entries = "".join(
+                    f'<dt><a href="/abs/2401.{i:05d}" title="Abstract">arXiv:2401.{i:05d}</a></dt>'
+                    f"<dd>Paper {i}</dd>"
+                    for i in range(skip, min(skip + show, papers))
+                )
+                self._send(f"<html><head><title>List</title></head><body><dl>{entries}</dl></body></html>")
+            elif url.path.startswith("/abs/"):
+                arxiv_id = url.path.split("/abs/")[-1]
+                self._send(
+                    f"<html><head><title>[{arxiv_id}] Paper {arxiv_id}</title></head><body>"
+                    f'<blockquote class="abstract">Abstract: {ABSTRACT}</blockquote></body></html>'
+                )
+            else:
+                self.send_error(404)
+
+    return StandInArxiv
+
+
+def run_sync(base_url: str, papers: int, delay: float) -> int:
+    with tempfile.TemporaryDirectory() as data_dir:
+        scraper = HTMLpull(base_url=base_url)
+        return len(scraper.fetch_arxiv_abstracts_bulk("cs", None, None, papers, data_dir, delay=delay))
+
+
+def run_async(base_url: str, papers: int, rate: float, concurrency: int):
+    async def crawl():
+        crawler = ArxivCrawler(base_url=base_url, concurrency=concurrency, rate=rate, burst=concurrency,
+                               per_host_concurrency=concurrency)
+        try:
+            with tempfile.TemporaryDirectory() as data_dir:
+                result = await crawler.fetch_arxiv_abstracts_bulk("cs", None, None, papers, data_dir)
+            return len(result), crawler.stats()
+        finally:
+            await crawler.aclose()
+
+    return asyncio.run(crawl())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80, help="Server latency per request")
+    parser.add_argument("--delay", type=float, default=0.02,
+                        help="Sync scraper's delay between requests; the crawler gets the same average rate")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-sync", action="store_true", help="Only run the async crawler")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.papers, args.latency_ms / 1000))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    rate = 1 / args.delay if args.delay > 0 else 0
+
+    print(f"{args.papers} papers, {args.latency_ms:.0f} ms server latency, "
+          f"{'unlimited' if not rate else f'{rate:.0f} req/s'} politeness rate")
+    print(f"  {'path':40}{'seconds':>10}{'papers/s':>10}{'saved':>8}")
+    if not args.skip_sync:
+        started = time.perf_counter()
+        saved = run_sync(base_url, args.papers, args.delay)
+        elapsed = time.perf_counter() - started
+        print(f"  {f'HTMLpull (delay {args.delay}s)':40}{elapsed:10.2f}{saved / elapsed:10.1f}{saved:8d}")
+    for concurrency in sorted({1, args.concurrency}):
+        started = time.perf_counter()
+        saved, stats = run_async(base_url, args.papers, rate, concurrency)
+        elapsed = time.perf_counter() - started
+        label = f"ArxivCrawler (concurrency {concurrency})"
+        print(f"  {label:40}{elapsed:10.2f}{saved / elapsed:10.1f}{saved:8d}"
+              f"  ({stats['requests']} requests, {sum(stats['rate_limit_wait_seconds'].values()):.1f}s rate-limited)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
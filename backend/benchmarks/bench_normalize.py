@@ -0,0 +1,66 @@
+"""
+Benchmark: text normalization on the PDFs in backend/data
+
+Extracts each PDF's pages once with pdfplumber, then times normalize_pages and
+reports characters and estimated tokens removed per document.
+
+Usage (from backend/):
+    python benchmarks/bench_normalize.py [--data-dir data] [--repeat 20]
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+import pdfplumber
+
+from services.text_normalizer import normalize_pages
+
+
+def extract_pages(path: Path):
+    with pdfplumber.open(path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=str(backend_dir / "data"))
+    parser.add_argument("--repeat", type=int, default=20, help="Normalization runs per document")
+    args = parser.parse_args()
+
+    pdfs = sorted(Path(args.data_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {args.data_dir}")
+        return
+
+    print(f"{'document':28}{'pages':>6}{'chars':>10}{'->':>10}{'tokens':>9}{'->':>9}{'saved':>8}{'ms':>9}")
+    total_before = total_after = 0
+    for path in pdfs:
+        pages = extract_pages(path)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            _, stats = normalize_pages(pages)
+            timings.append((time.perf_counter() - started) * 1000)
+        total_before += stats["tokens_before"]
+        total_after += stats["tokens_after"]
+        saved = stats["tokens_removed"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        print(
+            f"{path.name[:27]:28}{len(pages):6d}{stats['chars_before']:10d}{stats['chars_after']:10d}"
+            f"{stats['tokens_before']:9d}{stats['tokens_after']:9d}{saved:8.1%}{statistics.median(timings):9.2f}"
+        )
+        removed = {k: v for k, v in stats.items() if k.endswith(("_lines", "_joined", "_unwrapped", "_fixed"))}
+        print(f"{'':28}{removed}")
+
+    if total_before:
+        print(f"total: {total_before} -> {total_after} estimated tokens ({1 - total_after / total_before:.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
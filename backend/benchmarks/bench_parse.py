@@ -0,0 +1,90 @@
+"""
+Benchmark: arXiv page parsing, targeted extractors vs full BeautifulSoup
+
+Parses the saved abstract and list pages in benchmarks/fixtures with each
+path parse_abstract_page / parse_list_page can take and reports pages per
+second, checking every path extracts the same abstract and links as the full
+BeautifulSoup parser.
+
+Usage (from backend/):
+    python benchmarks/bench_parse.py [--repeat 200]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+for path in (backend_dir, backend_dir / "services" / "web_scraper"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from arxiv_html import (
+    LXML_AVAILABLE,
+    abstract_from_lxml,
+    abstract_from_meta,
+    abstract_from_strainer,
+    clean_abstract,
+    links_from_anchors,
+)
+from scraper import ARXIV_BASE_URL, parse_abstract_page_soup, parse_list_page_soup
+from services.lazy_import import LazyModule, is_available
+
+BS4_AVAILABLE = is_available(LazyModule("bs4"))
+fixtures = Path(__file__).resolve().parent / "fixtures"
+
+
+def pages_per_second(parse, html: str, repeat: int) -> float:
+    parse(html)  # warm up (imports, regex compilation)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse(html)
+    return repeat / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Parses per path")
+    args = parser.parse_args()
+
+    abs_html = (fixtures / "arxiv_abs.html").read_text(encoding="utf-8")
+    # The same page without citation_* meta tags exercises the paths after the fast one
+    abs_no_meta = re.sub(r'\s*<meta name="citation_[^>]*>', "", abs_html)
+    list_html = (fixtures / "arxiv_list.html").read_text(encoding="utf-8")
+
+    expected_abstract = None
+    expected_links = None
+    if BS4_AVAILABLE:
+        expected_abstract = clean_abstract(parse_abstract_page_soup(abs_html)["abstract"])
+        expected_links = parse_list_page_soup(list_html, ARXIV_BASE_URL)
+
+    abstract_paths = [("citation_abstract meta tag", abstract_from_meta, abs_html)]
+    if LXML_AVAILABLE:
+        abstract_paths.append(("lxml, no meta tags", abstract_from_lxml, abs_no_meta))
+    if BS4_AVAILABLE:
+        abstract_paths.append(("SoupStrainer, no meta tags", abstract_from_strainer, abs_no_meta))
+        abstract_paths.append(("full BeautifulSoup (fallback)", parse_abstract_page_soup, abs_html))
+    list_paths = [("<a> tag scan", lambda html: links_from_anchors(html, ARXIV_BASE_URL), list_html)]
+    if BS4_AVAILABLE:
+        list_paths.append(("full BeautifulSoup (fallback)", lambda html: parse_list_page_soup(html, ARXIV_BASE_URL), list_html))
+    if not BS4_AVAILABLE:
+        print("beautifulsoup4 not installed: skipping the BeautifulSoup paths and the output check")
+
+    for label, paths in ((f"abstract page ({len(abs_html) // 1024} KB)", abstract_paths),
+                         (f"list page ({len(list_html) // 1024} KB)", list_paths)):
+        print(label)
+        print(f"  {'path':34}{'pages/s':>10}{'ms/page':>10}  same output")
+        for name, parse, html in paths:
+            result = parse(html)
+            if isinstance(result, dict):
+                same = expected_abstract is None or clean_abstract(result["abstract"]) == expected_abstract
+            else:
+                same = expected_links is None or result == expected_links
+            rate = pages_per_second(parse, html, args.repeat)
+            print(f"  {name:34}{rate:10.0f}{1000 / rate:10.3f}  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
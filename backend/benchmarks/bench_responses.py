@@ -0,0 +1,181 @@
+"""
+Benchmark: JSON serialization time and wire bytes for large responses
+
+Compares the default response path (stdlib json, as in JSONResponse, no
+compression) with orjson plus gzip/brotli for two payloads:
+- a SummaryResponse for a PDF with base64 thumbnails (synthetic, or a real PDF with --pdf)
+- a /api/fetch-articles result with a batch of summaries
+
+Usage (from backend/):
+    python benchmarks/bench_responses.py [--images 12] [--image-kb 40] [--summaries 50] [--repeat 20]
+    python benchmarks/bench_responses.py --pdf data/paper.pdf
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from services.compression import BROTLI_AVAILABLE, compress_body
+from services.lazy_import import LazyModule, is_available
+
+orjson = LazyModule("orjson")
+
+WORDS = (
+    "model data learning network training results method paper we propose show "
+    "performance task dataset approach neural language graph attention layer based "
+    "using analysis experiments accuracy state art baseline improve evaluation"
+).split()
+
+
+def prose(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        n = min(words, rng.randint(8, 20))
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + ".")
+        words -= n
+    return " ".join(sentences)
+
+
+def pdf_response(images: int, image_kb: int, rng: random.Random) -> dict:
+    """SummaryResponse-shaped dict; random bytes stand in for already-compressed WebP data"""
+    image_list = []
+    for i in range(images):
+        data = base64.b64encode(os.urandom(image_kb * 1024)).decode()
+        image_list.append({
+            "data": f"data:image/webp;base64,{data}",
+            "format": "webp",
+            "page": i // 2 + 1,
+            "index": i % 2,
+            "xref": 100 + i,
+            "width": 1600,
+            "height": 1200,
+            "full_url": f"/api/pdf-image/paper.pdf/{100 + i}",
+            "thumbnails": None,
+        })
+    return {
+        "summary": prose(rng, 300),
+        "model": "llama-3.1-8b-instant",
+        "images": image_list,
+        "image_stats": {
+            "images_found": images + 5,
+            "dropped_small": 4,
+            "dropped_duplicate": 1,
+            "skipped_errors": 0,
+            "images_returned": images,
+            "original_bytes": images * image_kb * 4096,
+            "returned_bytes": images * image_kb * 1024,
+            "bytes_saved": images * image_kb * 3072,
+        },
+    }
+
+
+def real_pdf_response(path: Path) -> dict:
+    from services.file_reader import FileReaderService
+
+    reader = FileReaderService(data_dir=str(path.parent.resolve()))
+    extraction = reader.extract_pdf(path.name)
+    return {
+        "summary": extraction["text"][:2000],
+        "model": "llama-3.1-8b-instant",
+        "images": extraction["images"],
+        "image_stats": extraction["image_stats"],
+    }
+
+
+def batch_response(summaries: int, rng: random.Random) -> dict:
+    return {
+        "status": "success",
+        "total_fetched": summaries,
+        "files": [f"2401.{i:05d}_abstract.txt" for i in range(summaries)],
+        "summaries": [
+            {
+                "filename": f"2401.{i:05d}_abstract.txt",
+                "title": prose(rng, 10),
+                "summary": prose(rng, 250),
+                "model": "llama-3.1-8b-instant",
+            }
+            for i in range(summaries)
+        ],
+    }
+
+
+def stdlib_render(content) -> bytes:
+    # Same call as starlette's JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_render(content) -> bytes:
+    return orjson.dumps(content)
+
+
+def timed(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(timings)
+
+
+def report(name: str, content: dict, repeat: int):
+    print(f"\n{name}")
+    print(f"  {'path':34}{'serialize ms':>14}{'compress ms':>13}{'total ms':>10}{'wire bytes':>13}")
+    renderers = [("stdlib json", stdlib_render)]
+    if is_available(orjson):
+        renderers.append(("orjson", orjson_render))
+    encodings = [None, "gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+
+    baseline = None
+    for render_name, render in renderers:
+        body, serialize_ms = timed(lambda: render(content), repeat)
+        for encoding in encodings:
+            if encoding is None:
+                wire, compress_ms = body, 0.0
+            else:
+                wire, compress_ms = timed(lambda: compress_body(body, encoding), max(1, repeat // 4))
+            label = f"{render_name} + {encoding or 'identity'}"
+            total = serialize_ms + compress_ms
+            if baseline is None:
+                baseline = (total, len(wire))
+            print(f"  {label:34}{serialize_ms:14.2f}{compress_ms:13.2f}{total:10.2f}{len(wire):13,d}"
+                  f"  ({len(wire) / baseline[1]:.0%} of baseline bytes)")
+    if not is_available(orjson):
+        print("  (orjson not installed: pip install orjson)")
+    if not BROTLI_AVAILABLE:
+        print("  (brotli not installed: pip install brotli)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=12, help="Thumbnails in the synthetic PDF response")
+    parser.add_argument("--image-kb", type=int, default=40, help="Size of each thumbnail before base64")
+    parser.add_argument("--summaries", type=int, default=50, help="Summaries in the fetch-articles response")
+    parser.add_argument("--pdf", help="Build the PDF response from this PDF instead (needs the PDF libraries)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.pdf:
+        report(f"summarize-file response for {args.pdf}", real_pdf_response(Path(args.pdf)), args.repeat)
+    else:
+        report(
+            f"summarize-file response, {args.images} images x {args.image_kb} KB",
+            pdf_response(args.images, args.image_kb, rng),
+            args.repeat,
+        )
+    report(f"fetch-articles response, {args.summaries} summaries", batch_response(args.summaries, rng), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
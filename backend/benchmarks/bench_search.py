@@ -0,0 +1,96 @@
+"""
+Benchmark: search index build time, snapshot size and query latency
+
+Generates a synthetic corpus with a Zipf-like vocabulary (so term frequencies
+look like real text) and measures BM25 top-k query latency.
+
+Usage (from backend/):
+    python benchmarks/bench_search.py [--docs 100000] [--queries 200] [--k 10]
+    python benchmarks/bench_search.py --docs 1000000
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from services import search_index as search_module
+from services.search_index import SearchIndex
+
+
+def make_vocabulary(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 10))))
+    words = sorted(words)
+    # Zipf weights: the i-th most common word has frequency ~ 1/i
+    cum_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(size)))
+    return words, cum_weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    args = parser.parse_args()
+
+    words, cum_weights = make_vocabulary(args.vocabulary)
+    rng = random.Random(1)
+    workdir = Path(tempfile.mkdtemp(prefix="search-bench-"))
+    try:
+        index = SearchIndex(str(workdir), checkpoint_every=10 ** 12)
+        started = time.perf_counter()
+        for i in range(args.docs):
+            title = " ".join(rng.choices(words, cum_weights=cum_weights, k=8))
+            body = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(120, 220)))
+            # Index without the change log to measure the in-memory build alone
+            index._add(f"{i}_abstract.txt", "v1", title, body)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.save()
+        save_s = time.perf_counter() - started
+        snapshot_bytes = os.path.getsize(index.snapshot_path)
+
+        started = time.perf_counter()
+        reloaded = SearchIndex(str(workdir))
+        reloaded.load()
+        load_s = time.perf_counter() - started
+
+        # Queries mix mid-frequency and rare terms, 1-3 terms each
+        queries = [" ".join(rng.choices(words[50:], k=rng.randint(1, 3))) for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            reloaded.search(query, args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.docs} docs, vocabulary {args.vocabulary}, numpy={'yes' if search_module.NUMPY_AVAILABLE else 'no'}")
+    print(f"build:    {build_s:.2f}s ({args.docs / build_s:.0f} docs/s)")
+    print(f"save:     {save_s:.2f}s, snapshot {snapshot_bytes / 1e6:.1f} MB")
+    print(f"load:     {load_s:.2f}s")
+    print(
+        f"query:    p50 {statistics.median(latencies):.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, max {latencies[-1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: related-articles index build time, size, and top-k query latency
+
+Generates a synthetic corpus with a Zipf-like vocabulary split into topics (so
+related articles actually exist) and measures single and batched top-k cosine
+queries against the memory-mapped matrix.
+
+Usage (from backend/):
+    python benchmarks/bench_similarity.py [--docs 100000] [--queries 200] [--batch 32] [--k 5]
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from services.similarity import SimilarityIndex
+
+
+def make_vocabulary(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 10))))
+    words = sorted(words)
+    # Zipf weights: the i-th most common word has frequency ~ 1/i
+    cum_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(size)))
+    return words, cum_weights
+
+
+def percentile(values, fraction):
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--topics", type=int, default=200)
+    args = parser.parse_args()
+
+    words, cum_weights = make_vocabulary(args.vocabulary)
+    rng = random.Random(1)
+    # Each topic draws part of its text from its own small set of words
+    topic_words = [rng.sample(words[500:], 40) for _ in range(args.topics)]
+    names = [f"{i}_abstract.txt" for i in range(args.docs)]
+
+    workdir = Path(tempfile.mkdtemp(prefix="similarity-bench-"))
+    try:
+        index = SimilarityIndex(str(workdir), checkpoint_every=10 ** 12)
+        started = time.perf_counter()
+        for i, name in enumerate(names):
+            topic = topic_words[i % args.topics]
+            body = rng.choices(words, cum_weights=cum_weights, k=rng.randint(80, 160))
+            body += rng.choices(topic, k=40)
+            index.add_document(name, "", " ".join(body), "v1")
+        add_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.save()
+        save_s = time.perf_counter() - started
+        version_dir = workdir / (workdir / "CURRENT").read_text()
+        size_bytes = sum(os.path.getsize(p) for p in version_dir.iterdir())
+
+        started = time.perf_counter()
+        reloaded = SimilarityIndex(str(workdir))
+        reloaded.load()
+        load_s = time.perf_counter() - started
+
+        query_names = [rng.choice(names) for _ in range(args.queries)]
+        latencies = []
+        hits = 0
+        for name in query_names:
+            started = time.perf_counter()
+            related = reloaded.related(name, args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            topic = int(name.split("_")[0]) % args.topics
+            hits += sum(1 for r in related if int(r["filename"].split("_")[0]) % args.topics == topic)
+        latencies.sort()
+
+        started = time.perf_counter()
+        for i in range(0, len(query_names), args.batch):
+            reloaded.related_batch(query_names[i:i + args.batch], args.k)
+        batch_s = time.perf_counter() - started
+
+        # Incremental adds on top of the memory-mapped base
+        started = time.perf_counter()
+        for i in range(1000):
+            reloaded.add_document(f"new{i}_abstract.txt", "", " ".join(rng.choices(words, k=120)), "v1")
+        incremental_ms = (time.perf_counter() - started) * 1000 / 1000
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.docs} docs, vocabulary {args.vocabulary}, {args.topics} topics, k={args.k}")
+    print(f"add:      {add_s:.2f}s ({args.docs / add_s:.0f} docs/s)")
+    print(f"save:     {save_s:.2f}s, {size_bytes / 1e6:.1f} MB on disk")
+    print(f"load:     {load_s * 1000:.1f} ms (memory-mapped)")
+    print(
+        f"query:    p50 {statistics.median(latencies):.2f} ms, "
+        f"p95 {percentile(latencies, 0.95):.2f} ms, max {latencies[-1]:.2f} ms"
+    )
+    print(f"batched:  {len(query_names) / batch_s:.0f} queries/s in batches of {args.batch}")
+    print(f"precision (same topic in top-{args.k}): {hits / (len(query_names) * args.k):.2f}")
+    print(f"incremental add: {incremental_ms:.3f} ms/doc")
+
+
+if __name__ == "__main__":
+    main()
@@ -65,6 +65,15 @@ function renderSummary(summary, model) {
   modelNameBadge.textContent = model ? `Model: ${model}` : "";
 }
 
+function imageTag(img, index) {
+  // Summaries carry thumbnails; link to the full-resolution image when available
+  const tag = `<img src="${img.data}" alt="PDF image ${index + 1} from page ${img.page}" />`;
+  if (!img.full_url) {
+    return tag;
+  }
+  return `<a href="${API_BASE_URL}${img.full_url}" target="_blank" rel="noopener">${tag}</a>`;
+}
+
 function renderSummaryWithImages(summary, model, images) {
   if (!summary) {
     showPlaceholder();
@@ -84,7 +93,7 @@ function renderSummaryWithImages(summary, model, images) {
     images.forEach((img, index) => {
       html += `<div class="pdf-image">
         <p><strong>Page ${img.page}</strong></p>
-        <img src="${img.data}" alt="PDF image ${index + 1} from page ${img.page}" />
+        ${imageTag(img, index)}
       </div>`;
     });
     html += '</div>';
@@ -420,7 +429,7 @@ async function handleRandomArticle() {
       result.images.forEach((img, index) => {
         html += `<div class="pdf-image">
           <p><strong>Page ${img.page}</strong></p>
-          <img src="${img.data}" alt="PDF image ${index + 1} from page ${img.page}" />
+          ${imageTag(img, index)}
         </div>`;
       });
       html += '</div>';
@@ -4,18 +4,40 @@ FastAPI backend for Topical - Academic Paper Summarization App
 
 import os
 import sys
-import random
+import json
+import codecs
+import asyncio
+import hashlib
 import datetime
-import re
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
 from urllib.parse import urlparse
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, Tuple, Union
 
 from services.llm_service import LLMService
 from services.file_reader import FileReaderService
+from services.image_processor import ImageProcessorService, parse_widths
+from services.executor_service import ExecutorService
+from services.summary_store import SummaryStore
+from services.corpus_store import CorpusStore, format_abstract, parse_abstract
+from services.search_index import SearchIndex, SearchIndexer
+from services.similarity import SimilarityIndex, NUMPY_AVAILABLE, SCIPY_AVAILABLE
+from services.pre_summarizer import PreSummarizer
+from services.ingest_scheduler import IngestScheduler
+from services.upload_service import UploadService, UploadError, UploadTooLarge
+from services.extraction_cache import ExtractionCache
+from services.http_cache import HttpCache, parse_ttls
+from services.crawl_ledger import CrawlLedger
+from services.shared_state import SingleFlight, create_shared_state, hit_rates
+from services.paper_structure import section_outline, select_text, summary_text
+from services.feed import FeedOrder, decode_cursor, encode_cursor, new_seed
+from services.lazy_import import LazyModule, is_available
+from services.compression import CompressionMiddleware
+from services import deadline
 
 # Add web_scraper to Python path
 backend_dir = Path(__file__).parent
@@ -23,15 +45,167 @@ scraper_path = backend_dir / "services" / "web_scraper"
 if str(scraper_path) not in sys.path:
     sys.path.insert(0, str(scraper_path))
 
-# Import scraper
+# Import scraper (cheap: requests and BeautifulSoup are imported on first scrape)
 try:
     from scraper import HTMLpull
-    SCRAPER_AVAILABLE = True
+    from async_crawler import ArxivCrawler
+    from arxiv_export import ArxivExporter
+    from pdf_downloader import PdfDownloader
+    SCRAPER_AVAILABLE = is_available(LazyModule("requests")) and is_available(LazyModule("bs4"))
 except ImportError:
     HTMLpull = None
+    ArxivCrawler = None
+    ArxivExporter = None
+    PdfDownloader = None
     SCRAPER_AVAILABLE = False
 
-app = FastAPI(title="Topical API", version="1.0.0")
+# App-wide executors for blocking work: a thread pool for file/scraper I/O and
+# a process pool for CPU-heavy PDF parsing. Created in the lifespan below.
+executors = ExecutorService(
+    io_workers=int(os.getenv("IO_POOL_WORKERS", "0")) or None,
+    cpu_workers=int(os.getenv("CPU_POOL_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("EXECUTOR_MAX_QUEUE", "64")),
+    start_method=os.getenv("CPU_POOL_START_METHOD", "spawn"),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executors.start()
+    # Build the file catalog once; a watcher keeps it current afterwards
+    await executors.run_io(
+        file_reader.start_catalog,
+        poll_interval=float(os.getenv("CATALOG_POLL_INTERVAL", "2")),
+    )
+    # Indexes load in the background so the app starts serving right away
+    global index_warmup
+    index_warmup = asyncio.create_task(_load_indexes())
+    if PRESUMMARIZE_ENABLED:
+        pre_summarizer.start()
+    if INGEST_ENABLED:
+        ingest_scheduler.start()
+    try:
+        yield
+    finally:
+        index_warmup.cancel()
+        await asyncio.gather(index_warmup, return_exceptions=True)
+        background = list(feed_prefetches) + list(feed_tasks.values())
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await ingest_scheduler.stop()
+        await pre_summarizer.stop()
+        await search_indexer.stop()
+        if arxiv_crawler is not None:
+            await arxiv_crawler.aclose()
+        if arxiv_exporter is not None:
+            await arxiv_exporter.aclose()
+        await executors.run_io(search_index.close)
+        if similarity_index is not None:
+            await executors.run_io(similarity_index.close)
+        file_reader.stop_catalog()
+        executors.shutdown(wait=False)
+        summary_store.close()
+        extraction_cache.close()
+        if http_cache is not None:
+            http_cache.close()
+        crawl_ledger.close()
+        if corpus_store is not None:
+            corpus_store.close()
+        shared_state.close()
+
+
+index_warmup: Optional[asyncio.Task] = None
+
+
+async def _load_indexes():
+    """Load the search and similarity indexes, then start keeping them current"""
+    import logging
+    logger = logging.getLogger("uvicorn")
+
+    started = datetime.datetime.now()
+    try:
+        await executors.run_io(search_index.load)
+        if similarity_index is not None:
+            await executors.run_io(similarity_index.load)
+    except Exception:
+        logger.exception("Failed to load the persisted indexes")
+        raise
+    finally:
+        # Keep following the catalog either way; a failed load leaves articles for the indexer to add back
+        search_indexer.start()
+    logger.info(f"Indexes loaded in {(datetime.datetime.now() - started).total_seconds():.2f}s")
+
+
+def _index_warmup_error() -> Optional[BaseException]:
+    """
+    Why loading the indexes failed, or None if it succeeded, is still running,
+    or the indexer has since rebuilt them from the catalog
+    """
+    if index_warmup is None or not index_warmup.done() or index_warmup.cancelled():
+        return None
+    if search_indexer.scans:
+        # The indexer starts after a failed load, so a completed scan re-added everything
+        return None
+    return index_warmup.exception()
+
+
+def _require_indexes_loaded():
+    error = _index_warmup_error()
+    if error is not None:
+        raise HTTPException(status_code=503, detail=f"Indexes failed to load: {error}")
+    if index_warmup is None or not index_warmup.done():
+        raise HTTPException(
+            status_code=503,
+            detail="Indexes are still loading, please retry shortly",
+            headers={"Retry-After": "2"},
+        )
+
+
+# orjson serializes large responses (base64 images, batches of summaries)
+# several times faster than the standard json module
+orjson = LazyModule("orjson")
+ORJSON_AVAILABLE = is_available(orjson)
+
+
+def _ndjson(event: Dict) -> bytes:
+    """One newline-delimited JSON event for streamed responses"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(event) + b"\n"
+    return (json.dumps(event) + "\n").encode()
+
+
+app = FastAPI(
+    title="Topical API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
+)
+
+# Per-request deadlines (X-Request-Timeout header or REQUEST_TIMEOUT seconds)
+# bound LLM and extraction work; a client disconnect cancels its request's work.
+# Streamed and long-running endpoints only get a deadline if the client asks.
+app.add_middleware(
+    deadline.DeadlineMiddleware,
+    default_timeout=float(os.getenv("REQUEST_TIMEOUT", "120")),
+    max_timeout=float(os.getenv("REQUEST_TIMEOUT_MAX", "600")),
+    long_running_paths=("/api/upload-and-summarize", "/api/summarize-batch", "/api/fetch-articles"),
+)
+
+
+@app.exception_handler(deadline.DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: deadline.DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+# Brotli or gzip for JSON and NDJSON responses, negotiated from Accept-Encoding
+if os.getenv("RESPONSE_COMPRESSION", "1") != "0":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+        gzip_level=int(os.getenv("GZIP_LEVEL", "5")),
+        brotli_quality=int(os.getenv("BROTLI_QUALITY", "4")),
+    )
 
 # CORS middleware for React Native app
 app.add_middleware(
@@ -50,12 +224,91 @@ app.add_middleware(
 provider = os.getenv("LLM_PROVIDER", "ollama")
 model_name = "llama-3.1-8b-instant" if provider == "groq" else "mistral"
 llm_service = LLMService(provider=provider, model_name=model_name)
-file_reader = FileReaderService()
+# Extracted PDF figures are filtered, deduped and sent as thumbnails;
+# full resolution is served on demand by /api/pdf-image/{filename}/{xref}
+image_processor = ImageProcessorService(
+    min_width=int(os.getenv("IMAGE_MIN_WIDTH", "100")),
+    min_height=int(os.getenv("IMAGE_MIN_HEIGHT", "100")),
+    thumbnail_widths=parse_widths(os.getenv("THUMBNAIL_WIDTHS"), default=(480,)),
+    thumbnail_format=os.getenv("THUMBNAIL_FORMAT", "webp"),
+)
+# Abstract storage: "flat" writes one .txt per paper into backend/data,
+# "packed" uses the SQLite catalog + compressed segments in backend/corpus
+CORPUS_BACKEND = os.getenv("CORPUS_BACKEND", "flat")
+corpus_store = CorpusStore() if CORPUS_BACKEND == "packed" else None
+file_reader = FileReaderService(
+    image_processor=image_processor,
+    corpus_store=corpus_store,
+    normalize=os.getenv("TEXT_NORMALIZATION", "1") != "0",
+)
+# State shared by every uvicorn worker: LLM summary cache, cache hit counters
+# and leases that make concurrent requests for the same work compute it once.
+# SHARED_STATE_URL: "sqlite" (default, workers on one host), "local" or "redis://..."
+shared_state = create_shared_state(os.getenv("SHARED_STATE_URL"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+extraction_flights = SingleFlight(shared_state, executors.run_io, "extract")
+summary_flights = SingleFlight(shared_state, executors.run_io, "summary")
+# Extracted PDF text, parsed paper structure and images, per file version
+extraction_cache = ExtractionCache(state=shared_state)
+# User uploads are streamed to backend/uploads and removed once summarized
+upload_service = UploadService(max_bytes=int(os.getenv("UPLOAD_MAX_MB", "50")) * 1024 * 1024)
+UPLOAD_PAGE_BATCH = int(os.getenv("UPLOAD_PAGE_BATCH", "4"))
+
+# Scraped pages are cached on disk and revalidated with conditional GETs once
+# their URL pattern's TTL has passed (HTTP_CACHE_TTLS overrides the defaults)
+http_cache = None
+if os.getenv("HTTP_CACHE_ENABLED", "1") != "0":
+    http_cache = HttpCache(
+        max_bytes=int(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        ttls=parse_ttls(os.getenv("HTTP_CACHE_TTLS")) or None,
+        default_ttl=float(os.getenv("HTTP_CACHE_DEFAULT_TTL", "3600")),
+        state=shared_state,
+    )
+
+# Which arXiv ids crawls have listed, fetched or failed, plus a cursor per
+# listing: repeated crawls fetch only new papers and interrupted ones resume
+crawl_ledger = CrawlLedger(
+    retry_base=float(os.getenv("CRAWL_RETRY_BASE", "300")),
+    max_attempts=int(os.getenv("CRAWL_MAX_ATTEMPTS", "5")),
+)
 
 # Initialize scraper if available
 html_scraper = None
 if SCRAPER_AVAILABLE:
-    html_scraper = HTMLpull()
+    html_scraper = HTMLpull(http_cache=http_cache)
+
+# Bulk abstract fetching: async crawler (pooled httpx client, per-host rate
+# limit, list paging overlapped with abstract fetches) when httpx is installed
+arxiv_crawler = None
+if SCRAPER_AVAILABLE and is_available(LazyModule("httpx")):
+    arxiv_crawler = ArxivCrawler(
+        concurrency=int(os.getenv("ARXIV_CRAWL_CONCURRENCY", "4")),
+        rate=float(os.getenv("ARXIV_RATE_LIMIT", "2")),
+        burst=int(os.getenv("ARXIV_RATE_BURST", "2")),
+        run_io=executors.run_io,
+        http_cache=http_cache,
+    )
+
+# PDFs for fetched papers (download_pdfs=True): streamed into the data
+# directory concurrently, sharing the crawler's client and per-host limits
+pdf_downloader = None
+if arxiv_crawler is not None:
+    pdf_downloader = PdfDownloader(
+        arxiv_crawler,
+        concurrency=int(os.getenv("PDF_DOWNLOAD_CONCURRENCY", "4")),
+        max_bytes=int(os.getenv("PDF_MAX_MB", "100")) * 1024 * 1024,
+    )
+
+# Bulk metadata ingestion from arXiv's export API or OAI-PMH feed (hundreds
+# of records per response, no HTML parsing); only needs httpx
+arxiv_exporter = None
+if ArxivExporter is not None and is_available(LazyModule("httpx")):
+    arxiv_exporter = ArxivExporter(
+        page_size=int(os.getenv("ARXIV_EXPORT_PAGE_SIZE", "200")),
+        delay=float(os.getenv("ARXIV_EXPORT_DELAY", "3")),
+        run_io=executors.run_io,
+    )
+ARTICLE_SOURCES = ("html", "api", "oai")
 
 
 class SummaryRequest(BaseModel):
@@ -63,21 +316,51 @@ class SummaryRequest(BaseModel):
     topic: Optional[str] = None
 
 
-class ImageInfo(BaseModel):
+class ThumbnailInfo(BaseModel):
     data: str  # base64 data URI
-    format: str  # image format (png, jpeg, etc.)
+    format: str  # image format (webp or jpeg)
+    width: int
+    height: int
+
+
+class ImageInfo(BaseModel):
+    data: str  # base64 data URI of the primary thumbnail
+    format: str  # image format (webp, jpeg, etc.)
     page: int  # page number (1-indexed)
     index: int  # image index on the page
+    xref: Optional[int] = None  # PDF xref, used to fetch full resolution
+    width: Optional[int] = None  # full-resolution width
+    height: Optional[int] = None  # full-resolution height
+    full_url: Optional[str] = None  # URL of the full-resolution image
+    thumbnails: Optional[List[ThumbnailInfo]] = None  # additional thumbnail widths
+
+
+class ImageStats(BaseModel):
+    images_found: int
+    dropped_small: int
+    dropped_duplicate: int
+    skipped_errors: int = 0  # images that could not be decoded (absent from older cached extractions)
+    images_returned: int
+    original_bytes: int
+    returned_bytes: int
+    bytes_saved: int
+
 
 class SummaryResponse(BaseModel):
     summary: str
     model: str
     images: Optional[List[ImageInfo]] = None
+    image_stats: Optional[ImageStats] = None
 
 
 class FileSummaryRequest(BaseModel):
     filename: str
     topic: Optional[str] = None
+    # PDFs only: summarize these parts instead of just the abstract, e.g.
+    # ["abstract", "3", "conclusion"] (see paper_structure.select_text)
+    sections: Optional[List[str]] = None
+    include_references: bool = False
+    include_appendix: bool = False
 
 
 class FetchArticlesRequest(BaseModel):
@@ -85,8 +368,18 @@ class FetchArticlesRequest(BaseModel):
     year: Optional[int] = None
     month: Optional[int] = None
     max_papers: int = 10
-    download_pdfs: bool = True
+    download_pdfs: bool = True  # Also download each fetched paper's PDF into the data directory
     summarize_after_fetch: bool = False  # If True, summarize all fetched abstracts in parallel
+    source: str = "html"  # "html" (list and abstract pages), "api" (export API) or "oai" (OAI-PMH)
+    incremental: bool = True  # Skip papers fetched before and resume interrupted crawls (crawl ledger)
+    stream: bool = False  # Respond with NDJSON events as articles are saved and summarized
+
+
+class SummarizeBatchRequest(BaseModel):
+    filenames: List[str] = []  # files in the data directory
+    urls: List[str] = []  # arXiv abstract page URLs
+    topic: Optional[str] = None
+    include_images: bool = False  # PDF thumbnails in each result (large)
 
 
 class ArticleSummaryItem(BaseModel):
@@ -108,55 +401,142 @@ class FetchUrlResponse(BaseModel):
     model: str
 
 
+class FeedItem(BaseModel):
+    filename: str
+    subject: Optional[str] = None
+    summary: str
+    model: str
+    images: Optional[List[ImageInfo]] = None
+    image_stats: Optional[ImageStats] = None
+
+
+class FeedResponse(BaseModel):
+    items: List[FeedItem]
+    next_cursor: Optional[str] = None  # None once the feed is exhausted
+
+
+class RelatedBatchRequest(BaseModel):
+    filenames: List[str]
+    k: int = 5
+
+
 class RandomArticleResponse(BaseModel):
     filename: str
     summary: str
     model: str
     images: Optional[List[ImageInfo]] = None
+    image_stats: Optional[ImageStats] = None
 
 
-def _extract_abstract(text: str, max_chars: int = 4000) -> str:
+async def _extract_pdf(filename: str, with_images: bool = True) -> Dict:
     """
-    Heuristically extract the abstract section from a paper's full text.
-    Falls back to the first part of the document if no explicit abstract is found.
+    Normalized text, paper structure and processed images of a PDF, with full-resolution
+    image URLs attached. Served from the extraction cache when the file hasn't
+    changed; otherwise parsed once in the CPU pool and cached.
+
+    Returns:
+        Dict with 'text', 'text_stats', 'structure', 'images' and 'image_stats'
+        ('images' and 'image_stats' are None unless with_images)
     """
-    if not text:
-        return text
+    entry = file_reader.catalog.get(filename)
+    # Changed extraction settings (normalization, image filters, thumbnails) miss like a changed file
+    version = f"{entry.version}:{file_reader.extraction_fingerprint()}" if entry is not None else None
+    result = None
+    if version is not None:
+        cached = await executors.run_io(extraction_cache.get, filename, version)
+        if cached is not None and (cached["images"] is not None or not with_images):
+            result = cached
+    if result is None and version is None:
+        result = await executors.run_cpu(file_reader.extract_pdf, filename, with_images, deadline.current())
+    elif result is None:
+        async def extract():
+            extraction = await executors.run_cpu(file_reader.extract_pdf, filename, with_images, deadline.current())
+            await executors.run_io(
+                extraction_cache.put,
+                filename,
+                version,
+                extraction["text"],
+                extraction["structure"],
+                extraction["images"],
+                extraction["image_stats"],
+                extraction["text_stats"],
+            )
+            return extraction
 
-    # Normalize newlines
-    normalized = text.replace("\r\n", "\n")
+        async def lookup():
+            cached = await executors.run_io(extraction_cache.get, filename, version, False)
+            return cached if cached is not None and (cached["images"] is not None or not with_images) else None
 
-    # Try to find 'Abstract' header near the beginning
-    abstract_pattern = re.compile(r"\babstract\b[:.]?\s*", re.IGNORECASE)
-    match = abstract_pattern.search(normalized)
+        # Concurrent requests for the same file, in any worker, extract it once
+        result = await extraction_flights.run(f"{filename}:{version}:{int(with_images)}", extract, lookup)
+    for image in result["images"] or []:
+        if image.get("xref") is not None:
+            image["full_url"] = f"/api/pdf-image/{filename}/{image['xref']}"
+    return result
 
-    if match and match.start() < len(normalized) * 0.3:
-        start_idx = match.end()
-    else:
-        # Fallback: start from the beginning
-        start_idx = 0
 
-    following = normalized[start_idx:]
+async def _cached_summary(text: str, topic: Optional[str] = None) -> str:
+    """
+    LLM summary of a text through the shared summary cache. Keyed by model,
+    topic and a hash of the text, so changed sources miss automatically;
+    concurrent requests for the same summary, in any worker, call the LLM once.
+    """
+    key = hashlib.sha256(
+        json.dumps([llm_service.get_model_name(), llm_service.PROMPT_VERSION, topic or "", text]).encode()
+    ).hexdigest()
+    cache_key = f"summary:{key}"
+    summary = await executors.run_io(shared_state.get, cache_key)
+    await executors.run_io(shared_state.incr, "summary_cache.misses" if summary is None else "summary_cache.hits")
+    if summary is not None:
+        return summary
 
-    # Look for common section headers that typically follow the abstract
-    end_pattern = re.compile(
-        r"\n\s*(?:keywords?|index terms|1\.?\s+introduction|i\.?\s+introduction)\b",
-        re.IGNORECASE,
-    )
-    end_match = end_pattern.search(following)
+    async def generate():
+        generated = await llm_service.generate_summary(text, topic)
+        await executors.run_io(shared_state.set, cache_key, generated, SUMMARY_CACHE_TTL)
+        return generated
+
+    return await summary_flights.run(key, generate, lambda: executors.run_io(shared_state.get, cache_key))
 
-    if end_match:
-        end_idx = start_idx + end_match.start()
-    else:
-        end_idx = min(len(normalized), start_idx + max_chars)
 
-    abstract_text = normalized[start_idx:end_idx].strip()
+# HTTP caching: responses carry ETags derived from the content hash of the
+# source file plus everything else that shapes the response (model, prompt
+# version, options), so If-None-Match can be answered with 304 before doing work
+SUMMARY_MAX_AGE = int(os.getenv("SUMMARY_MAX_AGE", "3600"))
+LISTING_MAX_AGE = int(os.getenv("LISTING_MAX_AGE", "10"))
 
-    # If the extracted region is suspiciously short, fall back to the start of the document
-    if len(abstract_text) < 200:
-        abstract_text = normalized[:max_chars].strip()
 
-    return abstract_text
+def _etag(*parts) -> str:
+    """Strong ETag from the JSON-encoded parts that determine a response"""
+    return '"' + hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match lists the ETag (weak comparison, per RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _cache_headers(response: Response, etag: str, cache_control: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+async def _content_hash(filename: str) -> str:
+    """Content hash of a data file, raising the matching HTTP error if it can't be read"""
+    try:
+        return await executors.run_io(file_reader.content_hash, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/")
@@ -167,7 +547,14 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    error = _index_warmup_error()
+    health = {
+        "status": "healthy" if error is None else "degraded",
+        "indexes_loaded": error is None and index_warmup is not None and index_warmup.done(),
+    }
+    if error is not None:
+        health["index_error"] = str(error)
+    return health
 
 
 @app.post("/api/generate-summary", response_model=SummaryResponse)
@@ -184,19 +571,74 @@ async def generate_summary(request: SummaryRequest):
         raise HTTPException(status_code=400, detail="Invalid or missing input text")
     
     try:
-        summary = await llm_service.generate_summary(request.text, request.topic)
+        summary = await _cached_summary(request.text, request.topic)
         model_name = llm_service.get_model_name()
         return SummaryResponse(summary=summary, model=model_name)
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @app.post("/api/summarize-file", response_model=SummaryResponse)
-async def summarize_file(request: FileSummaryRequest):
+async def summarize_file(request: FileSummaryRequest, http_request: Request, response: Response):
     """
     Reads a text file or PDF from the data directory and generates a summary.
     For PDF files, also extracts and returns images/graphs.
+    Sends an ETag; a matching If-None-Match gets 304 without any work.
+    """
+    return await _conditional_summary(request, http_request, response, "no-cache")
+
+
+@app.get("/api/summarize-file", response_model=SummaryResponse)
+async def summarize_file_get(
+    http_request: Request,
+    response: Response,
+    filename: str,
+    topic: Optional[str] = None,
+    sections: Optional[List[str]] = Query(None),
+    include_references: bool = False,
+    include_appendix: bool = False,
+):
+    """
+    Same as POST /api/summarize-file with the options as query parameters
+    (repeat 'sections' for several), so HTTP caches and CDNs can store results
     """
+    request = FileSummaryRequest(
+        filename=filename,
+        topic=topic,
+        sections=sections,
+        include_references=include_references,
+        include_appendix=include_appendix,
+    )
+    return await _conditional_summary(request, http_request, response, f"public, max-age={SUMMARY_MAX_AGE}")
+
+
+async def _conditional_summary(
+    request: FileSummaryRequest,
+    http_request: Request,
+    response: Response,
+    cache_control: str,
+):
+    etag = _etag(
+        "summary",
+        await _content_hash(request.filename),
+        llm_service.get_model_name(),
+        llm_service.PROMPT_VERSION,
+        request.topic,
+        request.sections,
+        request.include_references,
+        request.include_appendix,
+        file_reader.extraction_fingerprint(),
+    )
+    if _etag_matches(http_request, etag):
+        return _not_modified(etag, cache_control)
+    result = await _summarize_file(request)
+    _cache_headers(response, etag, cache_control)
+    return result
+
+
+async def _summarize_file(request: FileSummaryRequest) -> SummaryResponse:
     import logging
     logger = logging.getLogger("uvicorn")
     
@@ -209,8 +651,14 @@ async def summarize_file(request: FileSummaryRequest):
             logger.info("PDF detected, extracting text and images...")
             # Read PDF with images
             try:
-                text, images = file_reader.read_pdf_with_images(request.filename)
-                logger.info(f"PDF extracted: {len(text)} characters, {len(images)} images")
+                extraction = await _extract_pdf(request.filename)
+                text, images, image_stats = extraction["text"], extraction["images"], extraction["image_stats"]
+                logger.info(
+                    f"PDF extracted: {len(text)} characters, {len(images)} images "
+                    f"({image_stats['bytes_saved']} image bytes saved)"
+                )
+                if extraction["text_stats"]:
+                    logger.info(f"Normalization removed ~{extraction['text_stats']['tokens_removed']} tokens")
             except ImportError as e:
                 raise HTTPException(
                     status_code=500, 
@@ -220,29 +668,46 @@ async def summarize_file(request: FileSummaryRequest):
             if not text:
                 raise HTTPException(status_code=404, detail=f"PDF '{request.filename}' is empty or could not be read")
             
-            # Only summarize the abstract portion of the paper
-            abstract_text = _extract_abstract(text)
-            logger.info(f"Using abstract-only text for summary ({len(abstract_text)} characters)...")
+            if request.sections:
+                # Only the requested sections; references and appendix are dropped unless asked for
+                source_text = select_text(
+                    extraction["structure"],
+                    request.sections,
+                    include_references=request.include_references,
+                    include_appendix=request.include_appendix,
+                )
+                if not source_text:
+                    raise HTTPException(status_code=400, detail="None of the requested sections were found")
+                logger.info(f"Using sections {request.sections} for summary ({len(source_text)} characters)...")
+            else:
+                # Only summarize the abstract portion of the paper
+                source_text = summary_text(extraction["structure"], text)
+                logger.info(f"Using abstract-only text for summary ({len(source_text)} characters)...")
             logger.info(f"Generating summary with {llm_service.provider.value}...")
-            summary = await llm_service.generate_summary(abstract_text, request.topic)
+            summary = await _cached_summary(source_text, request.topic)
             model_name = llm_service.get_model_name()
             logger.info(f"Summary generated: {len(summary)} characters")
-            return SummaryResponse(summary=summary, model=model_name, images=images if images else [])
+            return SummaryResponse(
+                summary=summary,
+                model=model_name,
+                images=images if images else [],
+                image_stats=image_stats,
+            )
         else:
             # Read regular text file
-            text = file_reader.read_file(request.filename)
+            text = await executors.run_io(file_reader.read_file, request.filename)
             if not text:
                 raise HTTPException(status_code=404, detail=f"File '{request.filename}' not found or empty")
             
-            summary = await llm_service.generate_summary(text, request.topic)
+            summary = await _cached_summary(text, request.topic)
             model_name = llm_service.get_model_name()
             return SummaryResponse(summary=summary, model=model_name, images=None)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"File '{request.filename}' not found")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except HTTPException:
-        # Re-raise HTTP exceptions as-is
+    except (HTTPException, deadline.DeadlineExceeded):
+        # Re-raise HTTP exceptions as-is; running out of time becomes a 504
         raise
     except Exception as e:
         import traceback
@@ -253,32 +718,214 @@ async def summarize_file(request: FileSummaryRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {error_msg}")
 
 
-@app.get("/api/list-files")
-async def list_files():
-    """List all available text and PDF files in the data directory"""
+@app.get("/api/paper-structure/{filename}")
+async def get_paper_structure(filename: str, request: Request, response: Response):
+    """
+    Title, abstract and section outline of a PDF, for choosing which sections
+    to pass to /api/summarize-file
+    """
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Paper structure is only available for PDF files")
+    cache_control = f"public, max-age={SUMMARY_MAX_AGE}"
+    etag = _etag("paper-structure", await _content_hash(filename), file_reader.extraction_fingerprint())
+    if _etag_matches(request, etag):
+        return _not_modified(etag, cache_control)
     try:
-        files = file_reader.list_files()
-        return {"files": files}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error listing files: {str(e)}")
+        extraction = await _extract_pdf(filename, with_images=False)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=500, detail=f"PDF processing libraries not installed: {str(e)}")
+    structure = extraction["structure"]
+    _cache_headers(response, etag, cache_control)
+    return {
+        "filename": filename,
+        "title": structure["title"],
+        "abstract": structure["abstract"],
+        "sections": section_outline(structure),
+        "references_chars": len(structure["references"]),
+        "appendix_chars": len(structure["appendix"]),
+        "text_stats": extraction["text_stats"],
+    }
+
+
+@app.post("/api/upload-and-summarize")
+async def upload_and_summarize(request: Request):
+    """
+    Upload a PDF or text file (multipart form field 'file', optional 'topic')
+    and stream back its summary as newline-delimited JSON events:
+    'uploaded', 'pages' (extraction progress), 'summary' (text deltas), then
+    'done' or 'error'.
+
+    The upload is written to disk as it arrives. Pages are extracted in small
+    batches and each chunk is summarized as soon as its text is available, so
+    extraction of later pages overlaps with summarization of earlier ones.
+    """
+    content_length = request.headers.get("content-length")
+    try:
+        upload = await upload_service.receive(
+            request.headers.get("content-type", ""),
+            int(content_length) if content_length and content_length.isdigit() else None,
+            request.stream(),
+            executors.run_io,
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    topic = upload["fields"].get("topic") or None
+    return StreamingResponse(_stream_upload_summary(upload, topic), media_type="application/x-ndjson")
+
+
+async def _upload_text_pieces(path: Path, events: asyncio.Queue):
+    """Yield an upload's text in pieces, reading the next piece while the current one is summarized"""
+    if path.suffix.lower() != ".pdf":
+        # Incremental decoding keeps multi-byte characters split across pieces intact
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        f = await executors.run_io(open, path, "rb")
+        try:
+            while True:
+                data = await executors.run_io(f.read, 1024 * 1024)
+                text = decoder.decode(data, final=not data)
+                if text:
+                    yield text
+                if not data:
+                    return
+        finally:
+            f.close()
+
+    start = 0
+    batch = asyncio.ensure_future(
+        executors.run_cpu(file_reader.read_pdf_pages, str(path), 0, UPLOAD_PAGE_BATCH, deadline.current())
+    )
+    try:
+        while batch is not None:
+            pages, total = await batch
+            start += len(pages)
+            # Read ahead: extract the next batch while this one is summarized
+            batch = None
+            if pages and start < total:
+                batch = asyncio.ensure_future(
+                    executors.run_cpu(
+                        file_reader.read_pdf_pages, str(path), start, start + UPLOAD_PAGE_BATCH, deadline.current()
+                    )
+                )
+            await events.put({"event": "pages", "extracted": start, "total": total})
+            text = "\n\n".join(page for page in pages if page).strip()
+            if text:
+                yield text
+    finally:
+        if batch is not None:
+            batch.cancel()
+
+
+async def _stream_upload_summary(upload: Dict, topic: Optional[str]):
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def summarize():
+        try:
+            chars = 0
+            async for delta in llm_service.stream_summary_incremental(_upload_text_pieces(upload["path"], events), topic):
+                chars += len(delta)
+                await events.put({"event": "summary", "delta": delta})
+            await events.put({"event": "done", "model": llm_service.get_model_name(), "summary_chars": chars})
+        except Exception as e:
+            await events.put({"event": "error", "detail": str(e)})
+        finally:
+            await events.put(None)
+
+    yield _ndjson({"event": "uploaded", "filename": upload["filename"], "bytes": upload["bytes"]})
+    task = asyncio.create_task(summarize())
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield _ndjson(event)
+    finally:
+        # Also runs when the client disconnects mid-stream
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await executors.run_io(upload_service.discard, upload["path"])
+
+
+@app.get("/api/admin/executors")
+async def executor_stats():
+    """
+    Queue depth and utilization of the shared I/O and CPU executors, and
+    requests cut short by their deadline or a client disconnect
+    """
+    stats = executors.stats()
+    stats["requests"] = deadline.stats()
+    return stats
 
 
-@app.post("/api/fetch-and-summarize-url", response_model=FetchUrlResponse)
-async def fetch_and_summarize_url(request: FetchUrlRequest):
+@app.get("/api/pdf-image/{filename}/{xref}")
+async def get_pdf_image(filename: str, xref: int, request: Request):
     """
-    Fetch a single article by URL, then generate a summary.
-    One call = fetch + summary.
+    Return a single embedded PDF image at full resolution.
+    Summaries only carry thumbnails; clients fetch the original on demand.
     """
-    import logging
-    logger = logging.getLogger("uvicorn")
-
-    if not SCRAPER_AVAILABLE or not html_scraper:
+    cache_control = f"public, max-age={SUMMARY_MAX_AGE}"
+    etag = _etag("pdf-image", await _content_hash(filename), xref)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, cache_control)
+    try:
+        image_bytes, mime_type = await executors.run_io(file_reader.get_pdf_image, filename, xref)
+        return Response(
+            content=image_bytes,
+            media_type=mime_type,
+            headers={"ETag": etag, "Cache-Control": cache_control},
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
         raise HTTPException(
             status_code=500,
-            detail="Scraper not available. Install dependencies: pip install -r requirements.txt (requests, beautifulsoup4)"
+            detail=f"PDF processing libraries not installed: {str(e)}. Please run: pip install -r requirements.txt"
         )
 
-    url = (request.url or "").strip()
+
+@app.get("/api/list-files")
+async def list_files(
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    type: Optional[str] = None,
+    subject: Optional[str] = None,
+):
+    """
+    List available text and PDF files in the data directory.
+    Served from the in-memory catalog; supports pagination (offset/limit) and
+    filtering by type ("article", "pdf", "abstract", "text") and subject.
+    The ETag is a hash of the page, so unchanged listings get 304.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise HTTPException(status_code=400, detail="offset and limit must be non-negative")
+    try:
+        files, total = file_reader.list_files_page(offset=offset, limit=limit, type=type, subject=subject)
+        body = {"files": files, "total": total, "offset": offset, "limit": limit}
+        cache_control = f"public, max-age={LISTING_MAX_AGE}"
+        etag = _etag("files", body)
+        if _etag_matches(request, etag):
+            return _not_modified(etag, cache_control)
+        _cache_headers(response, etag, cache_control)
+        return body
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing files: {str(e)}")
+
+
+def _arxiv_abs_url(url: Optional[str]) -> str:
+    """Normalize a user-supplied arXiv abstract page URL (400 for anything else)"""
+    url = (url or "").strip()
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
 
@@ -292,17 +939,28 @@ async def fetch_and_summarize_url(request: FetchUrlRequest):
             status_code=400,
             detail="Only arXiv article URLs are supported (e.g. https://arxiv.org/abs/2401.00001)"
         )
+    return url
 
-    try:
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
 
-        def _scrape():
-            return html_scraper.scrape_arxiv_abstract(url)
+@app.post("/api/fetch-and-summarize-url", response_model=FetchUrlResponse)
+async def fetch_and_summarize_url(request: FetchUrlRequest):
+    """
+    Fetch a single article by URL, then generate a summary.
+    One call = fetch + summary.
+    """
+    import logging
+    logger = logging.getLogger("uvicorn")
 
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            scraped = await loop.run_in_executor(executor, _scrape)
+    if not SCRAPER_AVAILABLE or not html_scraper:
+        raise HTTPException(
+            status_code=500,
+            detail="Scraper not available. Install dependencies: pip install -r requirements.txt (requests, beautifulsoup4)"
+        )
+
+    url = _arxiv_abs_url(request.url)
+
+    try:
+        scraped = await executors.run_io(html_scraper.scrape_arxiv_abstract, url)
 
         title = scraped.get("title") or url
         text = (scraped.get("abstract") or "").strip()
@@ -313,11 +971,11 @@ async def fetch_and_summarize_url(request: FetchUrlRequest):
             )
 
         logger.info(f"Generating summary from arXiv abstract ({url}, {len(text)} chars)...")
-        summary = await llm_service.generate_summary(text, request.topic)
+        summary = await _cached_summary(text, request.topic)
         model_name = llm_service.get_model_name()
 
         return FetchUrlResponse(title=title, url=url, summary=summary, model=model_name)
-    except HTTPException:
+    except (HTTPException, deadline.DeadlineExceeded):
         raise
     except Exception as e:
         logger.error(f"Error fetching/summarizing URL: {str(e)}")
@@ -327,150 +985,855 @@ async def fetch_and_summarize_url(request: FetchUrlRequest):
 @app.post("/api/fetch-articles")
 async def fetch_articles(request: FetchArticlesRequest):
     """
-    Fetch arXiv abstracts only (no PDFs): scrape list pages for abstract links,
-    fetch each abstract page, extract the abstract text, and save as .txt files
-    in the data directory. Summarize-file and random-article can then use those files.
+    Fetch arXiv abstracts and save them as .txt files in the data directory.
+    Summarize-file and random-article can then use those files.
+    source 'html' scrapes list pages for abstract links and fetches each abstract
+    page; 'api' and 'oai' pull records in bulk from the export API or OAI-PMH.
+    With download_pdfs, each fetched paper's PDF is downloaded as well.
+    summarize_after_fetch summarizes each abstract as soon as it is saved,
+    while the crawl goes on; with stream, results are sent as NDJSON events
+    as they come out of the pipeline (see _fetch_pipeline).
     """
     import logging
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor
 
     logger = logging.getLogger("uvicorn")
-    if not SCRAPER_AVAILABLE or not html_scraper:
+    if request.source not in ARTICLE_SOURCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown source '{request.source}', expected one of: {', '.join(ARTICLE_SOURCES)}"
+        )
+    if request.source == "html" and (not SCRAPER_AVAILABLE or not html_scraper):
         raise HTTPException(
             status_code=500,
             detail="Scraper not available. Install dependencies: pip install -r requirements.txt (requests, beautifulsoup4)"
         )
-    # Use year/month only if explicitly provided; otherwise use "recent" list to avoid 400 for future/invalid months
-    year = request.year
-    month = request.month
+    if request.source != "html" and arxiv_exporter is None:
+        raise HTTPException(
+            status_code=500,
+            detail="arXiv export API not available. Install dependencies: pip install -r requirements.txt (httpx)"
+        )
     data_dir = str(file_reader.get_data_dir_path())
+    ledger = crawl_ledger if request.incremental else None
+    events = _fetch_pipeline(request, data_dir, ledger)
+    if request.stream:
+        return StreamingResponse(_stream_fetch(events), media_type="application/x-ndjson")
     try:
-        def _fetch():
-            return html_scraper.fetch_arxiv_abstracts_bulk(
-                subject=request.subject,
-                year=year,
-                month=month,
-                max_papers=request.max_papers,
-                data_dir=data_dir,
-                delay=0.5,
-            )
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            result = await loop.run_in_executor(executor, _fetch)
-        files = [r["filename"] for r in result]
-        out = {
-            "status": "success",
-            "total_fetched": len(result),
-            "files": files,
-        }
-        if request.summarize_after_fetch and result:
-            # Summarize all fetched abstracts in parallel
-            async def summarize_one(item):
-                fn = item["filename"]
-                try:
-                    text = file_reader.read_file(fn)
-                    summary = await llm_service.generate_summary(text, None)
-                    return ArticleSummaryItem(
-                        filename=fn,
-                        title=item.get("title") or fn,
-                        summary=summary,
-                        model=llm_service.get_model_name(),
-                    )
-                except Exception as e:
-                    logger.warning(f"Summarize failed for {fn}: {e}")
-                    return None
-
-            summaries = await asyncio.gather(*[summarize_one(r) for r in result])
-            out["summaries"] = [s for s in summaries if s is not None]
+        out = {"status": "success"}
+        summaries = []
+        async with aclosing(events):
+            async for event in events:
+                if event["event"] == "fetched":
+                    out.update({k: v for k, v in event.items() if k != "event"})
+                elif event["event"] == "summary":
+                    summaries.append(event)
+        if request.summarize_after_fetch and out["files"]:
+            order = {fn: i for i, fn in enumerate(out["files"])}
+            out["summaries"] = [
+                ArticleSummaryItem(filename=s["filename"], title=s["title"], summary=s["summary"], model=s["model"])
+                for s in sorted(summaries, key=lambda s: order.get(s["filename"], len(order)))
+            ]
         return out
+    except deadline.DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error fetching articles: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
 
 
+# Fetch-and-summarize pipeline: the crawl hands each saved abstract to the
+# summarizers through a bounded queue, so a crawl that gets ahead waits
+FETCH_SUMMARY_CONCURRENCY = int(os.getenv("FETCH_SUMMARY_CONCURRENCY", "4"))
+FETCH_SUMMARY_QUEUE = int(os.getenv("FETCH_SUMMARY_QUEUE", "8"))
+
+
+async def _crawl_articles(request: FetchArticlesRequest, data_dir: str, ledger, on_item=None) -> List[Dict]:
+    """First pipeline stage: fetch and save abstracts from the requested source, handing each to on_item"""
+    # Use year/month only if explicitly provided; otherwise use "recent" list to avoid 400 for future/invalid months
+    if request.source != "html":
+        return await arxiv_exporter.fetch_arxiv_abstracts_bulk(
+            subject=request.subject,
+            year=request.year,
+            month=request.month,
+            max_papers=request.max_papers,
+            data_dir=data_dir,
+            source=request.source,
+            on_saved=_on_article_saved,
+            store=corpus_store,
+            ledger=ledger,
+            on_item=on_item,
+        )
+    if arxiv_crawler is not None:
+        return await arxiv_crawler.fetch_arxiv_abstracts_bulk(
+            subject=request.subject,
+            year=request.year,
+            month=request.month,
+            max_papers=request.max_papers,
+            data_dir=data_dir,
+            on_saved=_on_article_saved,
+            store=corpus_store,
+            ledger=ledger,
+            on_item=on_item,
+        )
+    result = await executors.run_io(
+        html_scraper.fetch_arxiv_abstracts_bulk,
+        subject=request.subject,
+        year=request.year,
+        month=request.month,
+        max_papers=request.max_papers,
+        data_dir=data_dir,
+        delay=0.5,
+        on_saved=_on_article_saved,
+        store=corpus_store,
+        ledger=ledger,
+    )
+    # The blocking scraper can't hand items over as it goes; they follow the crawl
+    if on_item is not None:
+        for item in result:
+            await on_item(item)
+    return result
+
+
+async def _fetch_pipeline(request: FetchArticlesRequest, data_dir: str, ledger):
+    """
+    Crawl, and with summarize_after_fetch summarize, as one pipeline. Each
+    abstract goes to the summarizers as soon as it is saved, with its text in
+    hand instead of read back from disk, so summarizing overlaps the crawl.
+
+    Yields 'article' for each saved abstract, 'summary' (or 'error') for each
+    summarized one, 'fetched' once the crawl and any PDF downloads are done,
+    and finally 'done'. A failed crawl is raised after the events before it.
+    """
+    import time
+    import logging
+
+    logger = logging.getLogger("uvicorn")
+    started = time.perf_counter()
+    events: asyncio.Queue = asyncio.Queue()
+    to_summarize: asyncio.Queue = asyncio.Queue(maxsize=FETCH_SUMMARY_QUEUE)
+    workers = FETCH_SUMMARY_CONCURRENCY if request.summarize_after_fetch else 0
+    counts = {"summarized": 0, "failed": 0}
+
+    async def on_item(item):
+        events.put_nowait({"event": "article", "id": item["id"], "filename": item["filename"], "title": item["title"]})
+        if workers:
+            await to_summarize.put(item)
+
+    async def crawl():
+        # A failed crawl fails the gather below, which ends the pipeline without these
+        result = await _crawl_articles(request, data_dir, ledger, on_item)
+        for _ in range(workers):
+            await to_summarize.put(None)
+        files = [r["filename"] for r in result]
+        # Newly saved abstracts jump ahead of the background scan
+        for fn in files:
+            pre_summarizer.enqueue(fn)
+        fetched = {"event": "fetched", "total_fetched": len(result), "files": files}
+        if request.download_pdfs and result:
+            if pdf_downloader is None:
+                logger.warning("PDF downloads need httpx; only abstracts were fetched")
+            else:
+                def on_pdf_saved(item):
+                    file_reader.notify_file_added(item["filename"], subject=request.subject)
+
+                downloads = await pdf_downloader.download_many([r["id"] for r in result], data_dir, on_pdf_saved)
+                fetched["pdfs"] = [d["filename"] for d in downloads if "filename" in d]
+                fetched["pdf_errors"] = [d for d in downloads if "error" in d]
+                # Not queued for pre-summarization: each PDF is an attachment of its abstract in the catalog
+        events.put_nowait(fetched)
+
+    async def summarize():
+        while True:
+            item = await to_summarize.get()
+            if item is None:
+                return
+            fn = item["filename"]
+            item_started = time.perf_counter()
+            try:
+                # Same text as the saved file, so the summary cache is shared with file-based summaries
+                if item.get("abstract"):
+                    text = format_abstract(item["title"], item["abstract"])
+                else:
+                    text = await executors.run_io(file_reader.read_file, fn)
+                async with batch_llm_slots:
+                    summary = await _cached_summary(text, None)
+                counts["summarized"] += 1
+                events.put_nowait({
+                    "event": "summary",
+                    "filename": fn,
+                    "title": item.get("title") or fn,
+                    "summary": summary,
+                    "model": llm_service.get_model_name(),
+                    "elapsed_ms": round((time.perf_counter() - item_started) * 1000),
+                })
+            except Exception as e:
+                counts["failed"] += 1
+                logger.warning(f"Summarize failed for {fn}: {e}")
+                events.put_nowait({"event": "error", "filename": fn, "detail": str(e)})
+
+    tasks = [asyncio.create_task(crawl())] + [asyncio.create_task(summarize()) for _ in range(workers)]
+    runner = asyncio.gather(*tasks)
+    runner.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        await runner  # raises if the crawl failed
+        yield {"event": "done", **counts, "elapsed_ms": round((time.perf_counter() - started) * 1000)}
+    finally:
+        # Also runs when the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(runner, *tasks, return_exceptions=True)
+
+
+async def _stream_fetch(events):
+    """NDJSON lines of a fetch pipeline's events; a failed crawl ends the stream with an 'error' line"""
+    import logging
+
+    logger = logging.getLogger("uvicorn")
+    async with aclosing(events):
+        try:
+            async for event in events:
+                yield _ndjson(event)
+        except deadline.DeadlineExceeded as e:
+            yield _ndjson({"event": "error", "status": 504, "detail": str(e)})
+        except Exception as e:
+            logger.error(f"Error fetching articles: {str(e)}")
+            yield _ndjson({"event": "error", "status": 500, "detail": f"Error fetching articles: {str(e)}"})
+
+
+# Batch pipeline stages, bounded across all batch requests: extraction or
+# scraping, then the LLM. Items move through independently, so one item's
+# extraction overlaps with another's LLM call.
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+batch_extract_slots = asyncio.Semaphore(int(os.getenv("BATCH_EXTRACT_CONCURRENCY", "8")))
+batch_llm_slots = asyncio.Semaphore(int(os.getenv("BATCH_LLM_CONCURRENCY", "4")))
+
+
+@app.post("/api/summarize-batch")
+async def summarize_batch(request: SummarizeBatchRequest):
+    """
+    Summarize many files and/or arXiv URLs, streaming one NDJSON line per item
+    as soon as it finishes ('result' or 'error', with the item's index), then
+    a final 'done' line. Items finish in any order, so the whole batch takes
+    about as long as its slowest item.
+    """
+    items = [("file", fn) for fn in request.filenames] + [("url", url) for url in request.urls]
+    if not items:
+        raise HTTPException(status_code=400, detail="Provide at least one filename or URL")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    if request.urls and (not SCRAPER_AVAILABLE or not html_scraper):
+        raise HTTPException(
+            status_code=500,
+            detail="Scraper not available. Install dependencies: pip install -r requirements.txt (requests, beautifulsoup4)"
+        )
+    return StreamingResponse(
+        _stream_batch(items, request.topic, request.include_images),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _batch_source(kind: str, source: str, include_images: bool) -> Dict:
+    """First pipeline stage: extract a file or scrape a URL and select the text to summarize"""
+    if kind == "url":
+        url = _arxiv_abs_url(source)
+        scraped = await executors.run_io(html_scraper.scrape_arxiv_abstract, url)
+        text = (scraped.get("abstract") or "").strip()
+        if not text:
+            raise HTTPException(status_code=422, detail="Could not extract the abstract from this arXiv page.")
+        return {"title": scraped.get("title") or url, "text": text, "images": None, "image_stats": None}
+
+    if source.lower().endswith(".pdf"):
+        extraction = await _extract_pdf(source, with_images=include_images)
+        if not extraction["text"]:
+            raise HTTPException(status_code=404, detail=f"PDF '{source}' is empty or could not be read")
+        structure = extraction["structure"]
+        return {
+            "title": structure["title"] or source,
+            "text": summary_text(structure, extraction["text"]),
+            "images": extraction["images"],
+            "image_stats": extraction["image_stats"],
+        }
+
+    text = await executors.run_io(file_reader.read_file, source)
+    if not text:
+        raise HTTPException(status_code=404, detail=f"File '{source}' not found or empty")
+    return {"title": parse_abstract(text)["title"] or source, "text": text, "images": None, "image_stats": None}
+
+
+async def _batch_item(index: int, kind: str, source: str, topic: Optional[str], include_images: bool) -> Dict:
+    """Run one item through the pipeline; errors become an 'error' line instead of failing the batch"""
+    import time
+
+    started = time.perf_counter()
+    line = {"index": index, ("filename" if kind == "file" else "url"): source}
+    try:
+        async with batch_extract_slots:
+            document = await _batch_source(kind, source, include_images)
+        async with batch_llm_slots:
+            summary = await _cached_summary(document["text"], topic)
+        line.update(
+            event="result",
+            title=document["title"],
+            summary=summary,
+            model=llm_service.get_model_name(),
+        )
+        if include_images:
+            line.update(images=document["images"], image_stats=document["image_stats"])
+    except HTTPException as e:
+        line.update(event="error", status=e.status_code, detail=e.detail)
+    except deadline.DeadlineExceeded as e:
+        line.update(event="error", status=504, detail=str(e))
+    except FileNotFoundError:
+        line.update(event="error", status=404, detail=f"File '{source}' not found")
+    except ValueError as e:
+        line.update(event="error", status=400, detail=str(e))
+    except Exception as e:
+        line.update(event="error", status=500, detail=str(e))
+    line["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+    return line
+
+
+async def _stream_batch(items: List[tuple], topic: Optional[str], include_images: bool):
+    import time
+
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(_batch_item(i, kind, source, topic, include_images))
+        for i, (kind, source) in enumerate(items)
+    ]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            line = await next_done
+            succeeded += line["event"] == "result"
+            yield _ndjson(line)
+        yield _ndjson({
+            "event": "done",
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        })
+    finally:
+        # Also runs when the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _summarize_article(filename: str, topic: Optional[str] = None) -> Dict:
+    """
+    Extract and summarize one article from the data directory.
+    Used by the random feed and by the background pre-summarizer.
+
+    Returns:
+        Dict with 'summary', 'model', 'images' and 'image_stats'
+    """
+    import logging
+    logger = logging.getLogger("uvicorn")
+
+    file_path = file_reader.get_data_dir_path() / filename
+
+    # Check if it's a PDF
+    if file_path.suffix.lower() == ".pdf":
+        try:
+            extraction = await _extract_pdf(filename)
+            text, images, image_stats = extraction["text"], extraction["images"], extraction["image_stats"]
+            logger.info(
+                f"PDF extracted: {len(text)} characters, {len(images)} images "
+                f"({image_stats['bytes_saved']} image bytes saved)"
+            )
+        except ImportError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"PDF processing libraries not installed: {str(e)}. Please run: pip install -r requirements.txt"
+            )
+
+        if not text:
+            raise HTTPException(status_code=404, detail=f"PDF '{filename}' is empty or could not be read")
+
+        # Generate summary using only the abstract portion of the paper
+        abstract_text = summary_text(extraction["structure"], text)
+        logger.info(f"Using abstract-only text for summary ({len(abstract_text)} characters)...")
+        logger.info(f"Generating summary with {llm_service.provider.value}...")
+        summary = await _cached_summary(abstract_text, topic)
+        return {
+            "summary": summary,
+            "model": llm_service.get_model_name(),
+            "images": images if images else [],
+            "image_stats": image_stats,
+        }
+
+    # Regular text file
+    text = await executors.run_io(file_reader.read_file, filename)
+    if not text:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found or empty")
+
+    summary = await _cached_summary(text, topic)
+    return {
+        "summary": summary,
+        "model": llm_service.get_model_name(),
+        "images": None,
+        "image_stats": None,
+    }
+
+
+# Full-text search over titles, abstracts and generated summaries. The indexer
+# picks up catalog changes; saved abstracts and new summaries are indexed directly.
+search_index = SearchIndex()
+
+# Related articles: hashed TF-IDF vectors compared by cosine similarity. Fed by
+# the same indexer as search; needs NumPy and SciPy.
+similarity_index = SimilarityIndex() if NUMPY_AVAILABLE and SCIPY_AVAILABLE else None
+
+
+async def _load_search_document(filename: str):
+    """Title and body to index for an article"""
+    if filename.lower().endswith(".pdf"):
+        extraction = await _extract_pdf(filename, with_images=False)
+        return extraction["structure"]["title"] or filename, summary_text(extraction["structure"], extraction["text"])
+    text = await executors.run_io(file_reader.read_file, filename)
+    parsed = parse_abstract(text)
+    return parsed["title"] or filename, parsed["abstract"]
+
+
+search_indexer = SearchIndexer(
+    index=search_index,
+    catalog=file_reader.catalog,
+    load_document=_load_search_document,
+    run_io=executors.run_io,
+    scan_interval=float(os.getenv("SEARCH_INDEX_SCAN_INTERVAL", "10")),
+    extra_indexes=[similarity_index] if similarity_index is not None else [],
+)
+
+
+def _index_summary(filename: str, topic: Optional[str], summary: str):
+    # Only the default (topic-free) summary is searchable
+    if topic is None:
+        search_index.add_summary(filename, summary)
+
+
+def _on_article_saved(item: Dict):
+    """Called by the scraper (in an I/O thread) right after it saves an abstract"""
+    file_reader.notify_file_added(item["filename"], subject=item["subject"])
+    entry = file_reader.catalog.get(item["filename"])
+    if entry is not None:
+        parsed = parse_abstract(file_reader.read_file(item["filename"]))
+        title = parsed["title"] or item["title"]
+        search_index.add_document(item["filename"], title, parsed["abstract"], entry.version)
+        if similarity_index is not None:
+            similarity_index.add_document(item["filename"], title, parsed["abstract"], entry.version)
+
+
+# Background pre-summarization: keeps a persistent store of ready summaries for
+# every article so /api/random-article doesn't wait on extraction and the LLM.
+# PRESUMMARIZE_TOPICS adds per-topic variants (comma-separated).
+summary_store = SummaryStore()
+pre_summarizer = PreSummarizer(
+    catalog=file_reader.catalog,
+    store=summary_store,
+    summarize=_summarize_article,
+    model=llm_service.get_model_name(),
+    run_io=executors.run_io,
+    topics=[t.strip() for t in os.getenv("PRESUMMARIZE_TOPICS", "").split(",") if t.strip()],
+    concurrency=int(os.getenv("PRESUMMARIZE_CONCURRENCY", "1")),
+    scan_interval=float(os.getenv("PRESUMMARIZE_SCAN_INTERVAL", "30")),
+    retry_base=float(os.getenv("PRESUMMARIZE_RETRY_BASE", "300")),
+    max_attempts=int(os.getenv("PRESUMMARIZE_MAX_ATTEMPTS", "5")),
+    on_summarized=_index_summary,
+)
+PRESUMMARIZE_ENABLED = os.getenv("PRESUMMARIZE_ENABLED", "1") != "0"
+
+
+async def _ingest_subject(subject: str, max_papers: int) -> List[Dict]:
+    """Crawl one subject for the ingestion scheduler, same as an incremental /api/fetch-articles"""
+    if INGEST_SOURCE == "html" and arxiv_crawler is None and html_scraper is None:
+        raise RuntimeError("Scraper not available (requests, beautifulsoup4)")
+    if INGEST_SOURCE != "html" and arxiv_exporter is None:
+        raise RuntimeError("arXiv export API not available (httpx)")
+    request = FetchArticlesRequest(subject=subject, max_papers=max_papers, source=INGEST_SOURCE)
+    return await _crawl_articles(request, str(file_reader.get_data_dir_path()), crawl_ledger)
+
+
+def _queue_ingested(item: Dict):
+    # Behind anything a user asked for, ahead of the catalog scan finding it
+    pre_summarizer.enqueue(item["filename"], priority=PreSummarizer.PRIORITY_BACKGROUND)
+
+
+# Scheduled ingestion: crawls INGEST_SUBJECTS (comma-separated) on the
+# INGEST_SCHEDULE cron schedule and queues new abstracts for pre-summarization.
+# Off unless INGEST_ENABLED=1; scripts/ingest.py runs it as its own process.
+INGEST_SOURCE = os.getenv("INGEST_SOURCE", "html")
+if INGEST_SOURCE not in ARTICLE_SOURCES:
+    raise ValueError(f"INGEST_SOURCE must be one of: {', '.join(ARTICLE_SOURCES)}")
+ingest_scheduler = IngestScheduler(
+    crawl=_ingest_subject,
+    subjects=[s.strip() for s in os.getenv("INGEST_SUBJECTS", "cs.AI,cs.LG,cs.CL").split(",") if s.strip()],
+    schedule=os.getenv("INGEST_SCHEDULE", "0 */6 * * *"),
+    jitter=float(os.getenv("INGEST_JITTER", "300")),
+    budget=int(os.getenv("INGEST_BUDGET", "200")),
+    on_saved=_queue_ingested,
+    state=shared_state,
+    run_io=executors.run_io,
+    run_on_start=os.getenv("INGEST_RUN_ON_START", "0") == "1",
+)
+INGEST_ENABLED = os.getenv("INGEST_ENABLED", "0") == "1"
+
+
+async def _summarize_and_store(filename: str, topic: Optional[str] = None) -> Optional[Dict]:
+    """
+    Summarize an article live and keep the result in the summary store
+
+    Returns:
+        Dict with 'summary', 'model', 'images' and 'image_stats', or None if
+        the article is no longer in the catalog
+    """
+    entry = file_reader.catalog.get(filename)
+    if entry is None:
+        return None
+    result = await _summarize_article(filename, topic)
+    await executors.run_io(
+        summary_store.put,
+        filename,
+        result["model"],
+        entry.version,
+        result["summary"],
+        topic,
+        result["images"],
+        result["image_stats"],
+    )
+    await executors.run_io(_index_summary, filename, topic, result["summary"])
+    return result
+
+
+# Catalog draws /api/random-article makes looking for an article whose summary is ready
+RANDOM_READY_ATTEMPTS = 8
+
+
+def _pick_random_article(model: str, topic: Optional[str]) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Blocking: draw articles uniformly from the catalog until one has a stored
+    summary built from its current version. Every article is equally likely,
+    whatever the store's ids look like.
+
+    Returns:
+        (filename, stored summary), or (first article drawn, None) if none of
+        the draws was ready, or (None, None) if there are no articles
+    """
+    first = None
+    for _ in range(RANDOM_READY_ATTEMPTS):
+        filename = file_reader.random_article(type="article")
+        entry = file_reader.catalog.get(filename) if filename else None
+        if entry is None:
+            break
+        first = first or entry.name
+        stored = summary_store.get(entry.name, model, topic)
+        # A summary of an older version of the file is left for the pre-summarizer to redo
+        if stored is not None and stored["source_version"] == entry.version:
+            return entry.name, stored
+    return first, None
+
+
 @app.get("/api/random-article", response_model=RandomArticleResponse)
 async def get_random_article(topic: Optional[str] = None):
     """
     Get a random article from the data directory with its summary.
-    Returns a random PDF file with pre-generated summary.
+    Serves a precomputed summary when one is ready; otherwise (cold start or a
+    topic that hasn't been precomputed) summarizes a random article live.
+    Articles are drawn uniformly from the catalog (see _pick_random_article).
     """
     import logging
     logger = logging.getLogger("uvicorn")
     
     try:
-        # Get random article: PDFs or abstract .txt files saved by fetch-articles
-        data_dir = file_reader.get_data_dir_path()
-        pdf_files = list(data_dir.glob("*.pdf"))
-        abstract_txt = list(data_dir.glob("*_abstract.txt"))
-        article_files = pdf_files + abstract_txt
-        if not article_files:
+        model_name = llm_service.get_model_name()
+        # PDFs or abstract .txt files saved by fetch-articles
+        filename, stored = await executors.run_io(_pick_random_article, model_name, topic)
+        if stored:
+            return RandomArticleResponse(
+                filename=filename,
+                summary=stored["summary"],
+                model=stored["model"],
+                images=stored["images"],
+                image_stats=stored["image_stats"],
+            )
+        if not filename:
             raise HTTPException(
                 status_code=404,
                 detail="No articles found. Please fetch articles first using /api/fetch-articles"
             )
-        random_file = random.choice(article_files)
-        filename = random_file.name
-        
         
-        logger.info(f"Getting random article: {filename}")
+        logger.info(f"No precomputed summary ready, summarizing random article live: {filename}")
         
-        # Read the file and generate summary
-        file_path = file_reader.get_data_dir_path() / filename
+        result = await _summarize_and_store(filename, topic)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Article file not found")
         
-        # Check if it's a PDF
-        if file_path.suffix.lower() == ".pdf":
-            try:
-                text, images = file_reader.read_pdf_with_images(filename)
-                logger.info(f"PDF extracted: {len(text)} characters, {len(images)} images")
-            except ImportError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"PDF processing libraries not installed: {str(e)}. Please run: pip install -r requirements.txt"
-                )
-            
-            if not text:
-                raise HTTPException(status_code=404, detail=f"PDF '{filename}' is empty or could not be read")
-            
-            # Generate summary using only the abstract portion of the paper
-            abstract_text = _extract_abstract(text)
-            logger.info(f"Using abstract-only text for summary ({len(abstract_text)} characters)...")
-            logger.info(f"Generating summary with {llm_service.provider.value}...")
-            summary = await llm_service.generate_summary(abstract_text, topic)
-            model_name = llm_service.get_model_name()
-            
-            return RandomArticleResponse(
-                filename=filename,
-                summary=summary,
-                model=model_name,
-                images=images if images else []
-            )
-        else:
-            # Regular text file
-            text = file_reader.read_file(filename)
-            if not text:
-                raise HTTPException(status_code=404, detail=f"File '{filename}' not found or empty")
-            
-            summary = await llm_service.generate_summary(text, topic)
-            model_name = llm_service.get_model_name()
-            
-            return RandomArticleResponse(
-                filename=filename,
-                summary=summary,
-                model=model_name,
-                images=None
-            )
+        return RandomArticleResponse(
+            filename=filename,
+            summary=result["summary"],
+            model=result["model"],
+            images=result["images"],
+            image_stats=result["image_stats"],
+        )
             
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Article file not found")
-    except HTTPException:
+    except (HTTPException, deadline.DeadlineExceeded):
         raise
     except Exception as e:
         logger.error(f"Error getting random article: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting random article: {str(e)}")
 
 
+# Feed: each session walks the catalog in its own stable random order. Serving
+# page k starts summarizing page k+1 in the background, so by the time the
+# client scrolls there its summaries are ready.
+feed_order = FeedOrder(file_reader.catalog)
+FEED_PREFETCH_CONCURRENCY = int(os.getenv("FEED_PREFETCH_CONCURRENCY", "2"))
+feed_prefetch_slots = asyncio.Semaphore(FEED_PREFETCH_CONCURRENCY)
+# (filename, topic) -> task summarizing it, shared by page requests and prefetch
+feed_tasks: Dict[tuple, asyncio.Task] = {}
+feed_prefetches = set()
+
+
+async def _feed_summary(filename: str, topic: Optional[str]) -> Optional[Dict]:
+    """Stored summary of an article if current, otherwise summarize it (once, however many callers)"""
+    entry = file_reader.catalog.get(filename)
+    if entry is None:
+        return None
+    stored = await executors.run_io(summary_store.get, filename, llm_service.get_model_name(), topic)
+    if stored is not None and stored["source_version"] == entry.version:
+        return stored
+    key = (filename, topic)
+    task = feed_tasks.get(key)
+    if task is None:
+        task = asyncio.create_task(_summarize_and_store(filename, topic))
+        feed_tasks[key] = task
+        task.add_done_callback(lambda _: feed_tasks.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _prefetch_feed(filenames: List[str], topic: Optional[str]):
+    import logging
+    logger = logging.getLogger("uvicorn")
+
+    # Runs past the page request that started it, so not under its deadline
+    deadline.clear()
+
+    async def prefetch(filename: str):
+        async with feed_prefetch_slots:
+            try:
+                await _feed_summary(filename, topic)
+            except Exception as e:
+                logger.warning(f"Feed prefetch failed for {filename}: {e}")
+
+    await asyncio.gather(*[prefetch(fn) for fn in filenames])
+
+
+@app.get("/api/feed", response_model=FeedResponse)
+async def get_feed(cursor: Optional[str] = None, limit: int = 10, topic: Optional[str] = None):
+    """
+    A page of articles with ready summaries in a stable random order per
+    session. Omit the cursor to start a new session; pass the returned
+    next_cursor to get the following page.
+    """
+    import logging
+    logger = logging.getLogger("uvicorn")
+
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    if cursor:
+        try:
+            seed, after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        seed, after = new_seed(), None
+
+    names, last_key, has_more = await executors.run_io(feed_order.page, seed, after, limit)
+    if has_more:
+        # Speculatively summarize the next page while this one is served
+        next_names = await executors.run_io(feed_order.next_names, seed, last_key, limit)
+        prefetch = asyncio.create_task(_prefetch_feed(next_names, topic))
+        feed_prefetches.add(prefetch)
+        prefetch.add_done_callback(feed_prefetches.discard)
+
+    async def load(filename: str):
+        try:
+            return filename, await _feed_summary(filename, topic)
+        except Exception as e:
+            logger.warning(f"Feed summary failed for {filename}: {e}")
+            return filename, None
+
+    items = []
+    for filename, result in await asyncio.gather(*[load(fn) for fn in names]):
+        if result is None:
+            continue  # removed, or failed to summarize: skipped rather than failing the page
+        entry = file_reader.catalog.get(filename)
+        items.append(FeedItem(
+            filename=filename,
+            subject=entry.subject if entry else None,
+            summary=result["summary"],
+            model=result["model"],
+            images=result["images"],
+            image_stats=result["image_stats"],
+        ))
+    return FeedResponse(items=items, next_cursor=encode_cursor(seed, last_key) if has_more else None)
+
+
+@app.get("/api/search")
+async def search(q: str, k: int = 10):
+    """
+    Full-text search over article titles, abstracts and generated summaries,
+    ranked by BM25. Returns the top-k matching articles.
+    """
+    import time
+
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query parameter 'q' is required")
+    _require_indexes_loaded()
+    if k < 1 or k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    started = time.perf_counter()
+    hits = await executors.run_io(search_index.search, q, k)
+    for hit in hits:
+        entry = file_reader.catalog.get(hit["filename"])
+        hit["subject"] = entry.subject if entry else None
+    return {
+        "query": q,
+        "hits": hits,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@app.get("/api/admin/search-index")
+async def search_index_stats():
+    """Size and progress of the full-text search index"""
+    return search_indexer.stats()
+
+
+def _require_similarity_index() -> SimilarityIndex:
+    if similarity_index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Related articles need NumPy and SciPy. Please install them with: pip install numpy scipy"
+        )
+    _require_indexes_loaded()
+    return similarity_index
+
+
+@app.get("/api/related/{filename}")
+async def related_articles(filename: str, k: int = 5):
+    """Articles most similar to the given one (cosine similarity of TF-IDF vectors)"""
+    index = _require_similarity_index()
+    if k < 1 or k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    try:
+        related = await executors.run_io(index.related, filename, k)
+    except KeyError:
+        if file_reader.catalog.get(filename) is None:
+            raise HTTPException(status_code=404, detail="Article file not found")
+        raise HTTPException(status_code=404, detail="Article is not indexed yet, try again shortly")
+    return {"filename": filename, "related": related}
+
+
+@app.post("/api/related")
+async def related_articles_batch(request: RelatedBatchRequest):
+    """
+    Related articles for several articles in one call. Queries are answered in
+    batched sparse products, so this is much cheaper than one request each.
+    Articles that aren't indexed are left out of the result.
+    """
+    index = _require_similarity_index()
+    if request.k < 1 or request.k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    if len(request.filenames) > 500:
+        raise HTTPException(status_code=400, detail="At most 500 filenames per request")
+    related = await executors.run_io(index.related_batch, request.filenames, request.k)
+    return {"related": related}
+
+
+@app.get("/api/admin/similarity-index")
+async def similarity_index_stats():
+    """Size of the related-articles index"""
+    index = _require_similarity_index()
+    return await executors.run_io(index.stats)
+
+
+@app.get("/api/admin/shared-state")
+async def shared_state_stats():
+    """
+    Shared state backend and cache/dedupe counters, summed over every worker
+    using the same backend
+    """
+    counters = await executors.run_io(shared_state.counters)
+    return {
+        "backend": shared_state.backend,
+        "counters": counters,
+        "hit_rates": hit_rates(counters),
+        "in_flight": {
+            "extract": extraction_flights.in_flight(),
+            "summary": summary_flights.in_flight(),
+        },
+        "pid": os.getpid(),
+    }
+
+
+@app.get("/api/admin/http-cache")
+async def http_cache_stats():
+    """Scraper HTTP cache size, hit rate (fresh or revalidated) and bytes not downloaded"""
+    if http_cache is None:
+        return {"enabled": False}
+    stats = await executors.run_io(http_cache.stats)
+    stats["enabled"] = True
+    return stats
+
+
+@app.get("/api/admin/crawl-ledger")
+async def crawl_ledger_stats():
+    """Papers seen, fetched and failed by crawls, and each listing's cursor"""
+    return await executors.run_io(crawl_ledger.stats)
+
+
+@app.get("/api/admin/pre-summarizer")
+async def pre_summarizer_stats():
+    """Progress of the background pre-summarizer and size of the summary store"""
+    stats = pre_summarizer.stats()
+    stats["enabled"] = PRESUMMARIZE_ENABLED
+    stats["stored"] = await executors.run_io(summary_store.count)
+    return stats
+
+
+@app.get("/api/admin/ingest")
+async def ingest_stats():
+    """Scheduled ingestion: next and last run, lag since the last successful run, and throughput"""
+    stats = ingest_scheduler.stats()
+    stats["enabled"] = INGEST_ENABLED
+    return stats
+
+
+@app.post("/api/admin/ingest/run")
+async def run_ingest():
+    """Start an ingestion run now instead of at the next scheduled time"""
+    if not ingest_scheduler.trigger():
+        raise HTTPException(
+            status_code=409,
+            detail="Ingestion is already running" if ingest_scheduler.running else "Ingestion is not enabled (INGEST_ENABLED=1)",
+        )
+    return {"status": "started"}
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Several workers share caches and dedupe work through SHARED_STATE_URL;
+    # uvicorn needs an import string to start them
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        app if workers == 1 else "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+    )
 
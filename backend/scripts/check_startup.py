@@ -0,0 +1,153 @@
+"""
+Check the backend's startup cost
+
+1. Import budget: runs `python -X importtime -c "import main"` in fresh
+   interpreters, fails if the median import time is over the budget or the
+   app pulls in any of the heavy libraries that must only load on first use.
+2. Optionally (--health), starts uvicorn and measures the time from process
+   start to the first 200 from GET /health.
+
+Usage (from backend/):
+    python scripts/check_startup.py [--budget-ms 800] [--import-runs 5] [--top 15]
+    python scripts/check_startup.py --health [--port 8765] [--runs 3]
+
+Exits non-zero when the import budget is exceeded or a heavy module is
+imported at startup, so it can run in CI.
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+# Must not be imported by `import main`; each is loaded on first use
+LAZY_MODULES = (
+    "fitz", "pdfplumber", "PIL", "httpx", "bs4", "requests", "numpy", "scipy", "zstandard", "redis", "watchdog",
+)
+
+
+def measure_imports(module: str = "main"):
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Returns:
+        Tuple of (total cumulative microseconds, {top-level package: cumulative us},
+        list of (cumulative us, module name) for every import)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"'import {module}' failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    top_level = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        cumulative = int(cumulative_us)
+        imports.append((cumulative, name))
+        # Top-level imports have no indentation in the module column
+        raw_name = line.rsplit("|", 1)[1]
+        if raw_name.startswith(" ") and not raw_name.startswith("  "):
+            top_level[name] = cumulative
+            total += cumulative
+    return total, top_level, imports
+
+
+def check_imports(budget_ms: float, top: int, runs: int = 5) -> bool:
+    # A single cold import is noisy (disk cache, CPU frequency); judge the median run
+    measurements = sorted((measure_imports() for _ in range(max(1, runs))), key=lambda m: m[0])
+    total_us, top_level, imports = measurements[len(measurements) // 2]
+    imported = {name.split(".")[0] for _, _, run_imports in measurements for _, name in run_imports}
+    eager = [name for name in LAZY_MODULES if name in imported]
+
+    print(
+        f"import main: median {total_us / 1000:.1f} ms (budget {budget_ms:.0f} ms, "
+        f"min {measurements[0][0] / 1000:.1f}, max {measurements[-1][0] / 1000:.1f}, {len(measurements)} runs)"
+    )
+    print("slowest top-level imports:")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    ok = True
+    if eager:
+        ok = False
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(eager)}")
+        for cumulative, name in imports:
+            if name.split(".")[0] in eager and "." not in name:
+                print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    if total_us / 1000 > budget_ms:
+        ok = False
+        print(f"FAIL: median import time {total_us / 1000:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+    if ok:
+        print("OK")
+    return ok
+
+
+def measure_health(port: int, timeout: float = 60.0) -> float:
+    """Seconds from starting uvicorn to the first 200 from /health"""
+    url = f"http://127.0.0.1:{port}/health"
+    env = dict(os.environ, PRESUMMARIZE_ENABLED=os.environ.get("PRESUMMARIZE_ENABLED", "0"))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.01)
+        raise SystemExit(f"/health did not return 200 within {timeout:.0f}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="Maximum median time for 'import main'")
+    parser.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters to time 'import main' in")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--health", action="store_true", help="Also measure time to the first /health 200")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--runs", type=int, default=3, help="Startup measurements to take with --health")
+    args = parser.parse_args()
+
+    ok = check_imports(args.budget_ms, args.top, args.import_runs)
+
+    if args.health:
+        timings = [measure_health(args.port) for _ in range(args.runs)]
+        print(
+            f"process start -> first /health 200: median {statistics.median(timings) * 1000:.0f} ms "
+            f"(min {min(timings) * 1000:.0f}, max {max(timings) * 1000:.0f}, {args.runs} runs)"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Run scheduled arXiv ingestion as its own process instead of inside the web server
+
+Uses the same INGEST_* settings, data directory, crawl ledger and shared
+state as the backend (see "Scheduled Ingestion" in the README). With a
+shared state (SHARED_STATE_URL) each scheduled run happens once even if the
+server also has INGEST_ENABLED=1. Set PRESUMMARIZE_ENABLED=0 here when a
+server is running: it picks up the new files with its own pre-summarizer.
+
+Usage (from backend/):
+    python scripts/ingest.py            # run on the schedule until interrupted
+    python scripts/ingest.py --once     # one run now, print its summary and exit
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+# Make main and the services package importable when run as a script
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+import main
+
+
+async def run(once: bool):
+    # The app's lifespan starts and stops everything ingestion uses (executors,
+    # catalog, indexes, pre-summarizer) the same way the server does
+    async with main.lifespan(main.app):
+        scheduler = main.ingest_scheduler
+        if once:
+            print(json.dumps(await scheduler.run_once(), indent=2))
+            return
+        if not scheduler.subjects:
+            sys.exit("No subjects to ingest (INGEST_SUBJECTS)")
+        scheduler.start()
+        print(f"Ingesting {', '.join(scheduler.subjects)} on '{scheduler.schedule.spec}' (Ctrl+C to stop)")
+        await asyncio.Event().wait()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Scheduled arXiv ingestion")
+    parser.add_argument("--once", action="store_true", help="Run once now and exit")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.once))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    cli()
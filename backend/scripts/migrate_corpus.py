@@ -0,0 +1,53 @@
+"""
+Migrate flat {arxiv_id}_abstract.txt files from backend/data into the packed corpus store
+
+Usage (from backend/):
+    python scripts/migrate_corpus.py [--data-dir data] [--corpus-dir corpus] [--subject cs] [--delete-originals]
+
+Then start the backend with CORPUS_BACKEND=packed.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Make the services package importable when run as a script
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from services.corpus_store import CorpusStore, migrate_flat_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate flat abstract files into the packed corpus store")
+    parser.add_argument("--data-dir", default=str(backend_dir / "data"), help="Directory with *_abstract.txt files")
+    parser.add_argument("--corpus-dir", default=str(backend_dir / "corpus"), help="Corpus store directory")
+    parser.add_argument("--codec", choices=["zstd", "gzip"], default=None, help="Compression codec (default: zstd if installed)")
+    parser.add_argument("--subject", default=None, help="Subject to record for the migrated papers")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Records per transaction")
+    parser.add_argument("--delete-originals", action="store_true", help="Delete each file after it is migrated")
+    args = parser.parse_args()
+
+    store = CorpusStore(root_dir=args.corpus_dir, codec=args.codec)
+    started = time.perf_counter()
+    try:
+        result = migrate_flat_directory(
+            args.data_dir,
+            store,
+            subject=args.subject,
+            delete_originals=args.delete_originals,
+            batch_size=args.batch_size,
+        )
+        elapsed = time.perf_counter() - started
+        usage = store.disk_usage()
+    finally:
+        store.close()
+
+    print(f"Migrated {result['migrated']} abstracts ({result['skipped']} skipped) in {elapsed:.2f}s")
+    print(f"Corpus store: {usage['files']} files, {usage['bytes']} bytes in {args.corpus_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Article Catalog: in-memory index of the files in the data directory
+Supports O(1) random sampling, filtering by type/subject and paginated listing
+"""
+
+import os
+import random
+import bisect
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.lazy_import import LazyModule, is_available
+
+# Watchdog gives inotify/FSEvents-based watching; fall back to polling without it.
+# It is imported when the watcher starts, not at startup.
+watchdog_observers = LazyModule("watchdog.observers")
+WATCHDOG_AVAILABLE = is_available(watchdog_observers)
+
+logger = logging.getLogger("uvicorn")
+
+SUPPORTED_EXTENSIONS = {".txt", ".md", ".text", ".pdf"}
+
+# File types tracked by the catalog
+TYPE_PDF = "pdf"
+TYPE_ABSTRACT = "abstract"  # {arxiv_id}_abstract.txt saved by fetch-articles
+TYPE_TEXT = "text"
+ARTICLE_TYPES = (TYPE_PDF, TYPE_ABSTRACT)
+
+
+def abstract_for_pdf(name: str) -> Optional[str]:
+    """Abstract filename a PDF belongs to ({arxiv_id}.pdf -> {arxiv_id}_abstract.txt), None if not a PDF"""
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}_abstract.txt" if suffix.lower() == ".pdf" else None
+
+
+def pdf_for_abstract(name: str) -> Optional[str]:
+    """PDF filename of an abstract ({arxiv_id}_abstract.txt -> {arxiv_id}.pdf), None if not an abstract"""
+    return f"{name[:-len('_abstract.txt')]}.pdf" if name.endswith("_abstract.txt") else None
+
+
+def file_type(name: str) -> Optional[str]:
+    """Catalog type of a filename, or None if it isn't a supported file"""
+    lower = name.lower()
+    suffix = os.path.splitext(lower)[1]
+    if suffix not in SUPPORTED_EXTENSIONS:
+        return None
+    if suffix == ".pdf":
+        return TYPE_PDF
+    if lower.endswith("_abstract.txt"):
+        return TYPE_ABSTRACT
+    return TYPE_TEXT
+
+
+@dataclass
+class CatalogEntry:
+    name: str
+    type: str
+    size: int
+    mtime_ns: int
+    subject: Optional[str] = None
+    source: str = "file"  # "file" (data directory) or "corpus" (packed corpus store)
+
+    @property
+    def version(self) -> str:
+        """Cheap version stamp of the file (size and mtime)"""
+        return f"{self.size}:{self.mtime_ns}"
+
+
+class _Bucket:
+    """
+    Set of names supporting O(1) add/remove/random choice (array + position map)
+    plus a sorted view for stable pagination.
+    """
+
+    def __init__(self):
+        self.items: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.sorted: List[str] = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, name: str):
+        if name in self.positions:
+            return
+        self.positions[name] = len(self.items)
+        self.items.append(name)
+        bisect.insort(self.sorted, name)
+
+    def remove(self, name: str):
+        pos = self.positions.pop(name, None)
+        if pos is None:
+            return
+        # Swap-remove: move the last item into the hole
+        last = self.items.pop()
+        if pos < len(self.items):
+            self.items[pos] = last
+            self.positions[last] = pos
+        idx = bisect.bisect_left(self.sorted, name)
+        if idx < len(self.sorted) and self.sorted[idx] == name:
+            del self.sorted[idx]
+
+    def choice(self, rng: random.Random) -> Optional[str]:
+        if not self.items:
+            return None
+        return self.items[rng.randrange(len(self.items))]
+
+
+class ArticleCatalog:
+    """
+    Thread-safe in-memory catalog of the data directory.
+
+    Built once with a single directory scan, then kept current by a watcher
+    (inotify via watchdog when installed, directory polling otherwise) and by
+    explicit notifications from the scraper.
+
+    A paper's PDF downloaded next to its abstract ({arxiv_id}.pdf beside
+    {arxiv_id}_abstract.txt) is an attachment of the abstract: it is listed
+    and can be read by name, but only the abstract counts as an article, so
+    each paper is sampled, summarized and indexed once.
+    """
+
+    def __init__(self, data_dir: Path):
+        """
+        Initialize catalog
+
+        Args:
+            data_dir: Directory to catalog
+        """
+        self.data_dir = data_dir
+        self._lock = threading.RLock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._rng = random.Random()
+        self.built = False
+        # Incremented on every change so consumers can cheaply detect updates
+        self.generation = 0
+        # Directory mtime observed right before the last full scan
+        self.scanned_mtime_ns: Optional[int] = None
+
+    def __getstate__(self):
+        # Pickled copies (e.g. in the PDF process pool) start out empty
+        return {"data_dir": self.data_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state["data_dir"])
+
+    def _bucket(self, kind: str, value: str) -> _Bucket:
+        key = (kind, value)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+        return bucket
+
+    def is_attachment(self, entry: CatalogEntry) -> bool:
+        """Whether an entry is a PDF attached to an abstract in the catalog (not an article of its own)"""
+        return entry.type == TYPE_PDF and abstract_for_pdf(entry.name) in self._entries
+
+    def _article_keys(self, entry: CatalogEntry) -> List[Tuple[str, str]]:
+        keys = [("article", "")]
+        if entry.subject:
+            keys.append(("type+subject", f"article/{entry.subject}"))
+        return keys
+
+    def _bucket_keys(self, entry: CatalogEntry, as_article: bool = False) -> List[Tuple[str, str]]:
+        keys = [("all", ""), ("type", entry.type)]
+        if entry.subject:
+            keys.append(("subject", entry.subject))
+            keys.append(("type+subject", f"{entry.type}/{entry.subject}"))
+        if entry.type in ARTICLE_TYPES and (as_article or not self.is_attachment(entry)):
+            keys.extend(self._article_keys(entry))
+        return keys
+
+    def _index(self, entry: CatalogEntry):
+        for kind, value in self._bucket_keys(entry):
+            self._bucket(kind, value).add(entry.name)
+        # The abstract's PDF, if present, becomes its attachment
+        pdf = self._entries.get(pdf_for_abstract(entry.name) or "")
+        if entry.type == TYPE_ABSTRACT and pdf is not None:
+            for key in self._article_keys(pdf):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.remove(pdf.name)
+
+    def _unindex(self, entry: CatalogEntry):
+        # Article keys too: whether it was an attachment may have changed since it was indexed
+        for key in self._bucket_keys(entry, as_article=True):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(entry.name)
+        # Without the abstract its PDF is an article again (re-hidden if the abstract is re-added)
+        pdf = self._entries.get(pdf_for_abstract(entry.name) or "")
+        if entry.type == TYPE_ABSTRACT and pdf is not None:
+            for kind, value in self._article_keys(pdf):
+                self._bucket(kind, value).add(pdf.name)
+
+    def build(self):
+        """(Re)build the catalog with a single scan of the data directory"""
+        entries = {}
+        self.scanned_mtime_ns = self.dir_mtime_ns()
+        if self.data_dir.exists():
+            with os.scandir(self.data_dir) as it:
+                for dirent in it:
+                    ftype = file_type(dirent.name)
+                    if ftype is None or not dirent.is_file():
+                        continue
+                    stat = dirent.stat()
+                    entries[dirent.name] = CatalogEntry(dirent.name, ftype, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            # Keep subjects we were told about; the filesystem doesn't know them
+            for name, entry in entries.items():
+                old = self._entries.get(name)
+                if old is not None:
+                    entry.subject = old.subject
+            # Keep entries that don't live in the directory (corpus store records)
+            for name, old in self._entries.items():
+                if old.source != "file" and name not in entries:
+                    entries[name] = old
+            self._entries = {}
+            self._buckets = {}
+            # Index in name order so every sorted-list insert is an append
+            for name in sorted(entries):
+                entry = entries[name]
+                self._entries[name] = entry
+                self._index(entry)
+            self.built = True
+            self.generation += 1
+
+    def add(self, name: str, subject: Optional[str] = None) -> Optional[CatalogEntry]:
+        """
+        Add or refresh a file (called by the watcher and scraper notifications)
+
+        Args:
+            name: Filename in the data directory
+            subject: Subject category, if known (e.g. the arXiv subject it was fetched for)
+
+        Returns:
+            The catalog entry, or None if the file isn't supported or doesn't exist
+        """
+        ftype = file_type(name)
+        if ftype is None:
+            return None
+        try:
+            stat = (self.data_dir / name).stat()
+        except FileNotFoundError:
+            entry = self.get(name)
+            if entry is None or entry.source == "file":
+                self.remove(name)
+            return None
+        with self._lock:
+            old = self._entries.get(name)
+            if old is not None:
+                subject = subject or old.subject
+                self._unindex(old)
+            entry = CatalogEntry(name, ftype, stat.st_size, stat.st_mtime_ns, subject)
+            self._entries[name] = entry
+            self._index(entry)
+            self.generation += 1
+            return entry
+
+    def add_entry(self, entry: CatalogEntry):
+        """Add or replace an entry that isn't backed by a file in the directory"""
+        with self._lock:
+            old = self._entries.get(entry.name)
+            if old is not None:
+                entry.subject = entry.subject or old.subject
+                self._unindex(old)
+            self._entries[entry.name] = entry
+            self._index(entry)
+            self.generation += 1
+
+    def remove(self, name: str):
+        """Remove a file from the catalog"""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._unindex(entry)
+                self.generation += 1
+
+    def dir_mtime_ns(self) -> Optional[int]:
+        """Current mtime of the data directory (changes when entries are added/removed)"""
+        try:
+            return self.data_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def sync(self):
+        """Rescan the directory and apply the differences (used by the polling watcher)"""
+        names = set()
+        self.scanned_mtime_ns = self.dir_mtime_ns()
+        if self.data_dir.exists():
+            with os.scandir(self.data_dir) as it:
+                for dirent in it:
+                    if file_type(dirent.name) is not None and dirent.is_file():
+                        names.add(dirent.name)
+                        entry = self.get(dirent.name)
+                        stat = dirent.stat()
+                        if entry is None or entry.version != f"{stat.st_size}:{stat.st_mtime_ns}":
+                            self.add(dirent.name)
+        with self._lock:
+            removed = [
+                name for name, entry in self._entries.items()
+                if entry.source == "file" and name not in names
+            ]
+        for name in removed:
+            self.remove(name)
+
+    def _select(self, type: Optional[str] = None, subject: Optional[str] = None) -> _Bucket:
+        if type == "article" and not subject:
+            key = ("article", "")
+        elif type and subject:
+            key = ("type+subject", f"{type}/{subject}")
+        elif type:
+            key = ("type", type)
+        elif subject:
+            key = ("subject", subject)
+        else:
+            key = ("all", "")
+        return self._buckets.get(key) or _Bucket()
+
+    def get(self, name: str) -> Optional[CatalogEntry]:
+        """Look up a single entry"""
+        with self._lock:
+            return self._entries.get(name)
+
+    def random(self, type: Optional[str] = None, subject: Optional[str] = None) -> Optional[CatalogEntry]:
+        """
+        Uniformly random entry in O(1)
+
+        Args:
+            type: "pdf", "abstract", "text", "article" (abstracts, and PDFs not
+                  attached to one) or None for any
+            subject: Only entries with this subject
+        """
+        with self._lock:
+            name = self._select(type, subject).choice(self._rng)
+            return self._entries.get(name) if name else None
+
+    def count(self, type: Optional[str] = None, subject: Optional[str] = None) -> int:
+        """Number of entries matching the filters"""
+        with self._lock:
+            return len(self._select(type, subject))
+
+    def names(self, type: Optional[str] = None, subject: Optional[str] = None) -> List[str]:
+        """All matching names in sorted order"""
+        with self._lock:
+            return list(self._select(type, subject).sorted)
+
+    def entries(self, names: Iterable[str]) -> List[CatalogEntry]:
+        """Entries for the given names (missing names are skipped)"""
+        with self._lock:
+            return [self._entries[n] for n in names if n in self._entries]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        type: Optional[str] = None,
+        subject: Optional[str] = None,
+    ) -> Tuple[List[str], int]:
+        """
+        A page of matching names in sorted order
+
+        Returns:
+            Tuple of (names, total_matching)
+        """
+        with self._lock:
+            bucket = self._select(type, subject)
+            end = None if limit is None else offset + limit
+            return bucket.sorted[offset:end], len(bucket)
+
+
+class _WatchdogHandler:
+    # Observers only call dispatch(), so this needn't subclass watchdog's
+    # FileSystemEventHandler (and import watchdog to define it)
+    def __init__(self, catalog: ArticleCatalog):
+        self.catalog = catalog
+
+    def dispatch(self, event):
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler is not None:
+            handler(event)
+
+    def _name(self, path) -> Optional[str]:
+        path = Path(os.fsdecode(path))
+        if path.parent != self.catalog.data_dir:
+            return None
+        return path.name
+
+    def on_created(self, event):
+        if not event.is_directory and self._name(event.src_path):
+            self.catalog.add(self._name(event.src_path))
+
+    def on_modified(self, event):
+        self.on_created(event)
+
+    def on_deleted(self, event):
+        if not event.is_directory and self._name(event.src_path):
+            self.catalog.remove(self._name(event.src_path))
+
+    def on_moved(self, event):
+        self.on_deleted(event)
+        if not event.is_directory and self._name(event.dest_path):
+            self.catalog.add(self._name(event.dest_path))
+
+
+class CatalogWatcher:
+    """
+    Keeps an ArticleCatalog in sync with its directory.
+    Uses watchdog (inotify) when available, otherwise polls the directory
+    mtime and only rescans when it changes.
+    """
+
+    def __init__(self, catalog: ArticleCatalog, poll_interval: float = 2.0):
+        """
+        Initialize watcher
+
+        Args:
+            catalog: Catalog to keep current
+            poll_interval: Seconds between directory checks in polling mode
+        """
+        self.catalog = catalog
+        self.poll_interval = poll_interval
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._observer is not None else "polling"
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self._observer is not None or self._thread is not None:
+            return
+        if WATCHDOG_AVAILABLE:
+            try:
+                observer = watchdog_observers.Observer()
+                observer.schedule(_WatchdogHandler(self.catalog), str(self.catalog.data_dir), recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                return
+            except Exception as e:
+                logger.warning(f"File watching unavailable, falling back to polling: {e}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                # Only rescan when entries were added, removed or renamed
+                if self.catalog.dir_mtime_ns() != self.catalog.scanned_mtime_ns:
+                    self.catalog.sync()
+            except Exception as e:
+                logger.warning(f"Catalog polling failed: {e}")
@@ -0,0 +1,225 @@
+"""
+Response compression middleware
+Negotiates brotli or gzip from Accept-Encoding and compresses text and JSON
+responses above a size threshold
+"""
+
+import gzip
+import zlib
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from services.lazy_import import LazyModule, is_available
+
+brotli = LazyModule("brotli")
+BROTLI_AVAILABLE = is_available(brotli)
+
+# Images, PDFs and archives are already compressed
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Encodings and their q-values from an Accept-Encoding header"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def choose_encoding(header: str, brotli_enabled: bool = True) -> Optional[str]:
+    """Best encoding the client accepts: 'br', then 'gzip', else None"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli_enabled and BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor; flush() ends a streamed chunk so it can be decoded right away"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 5, brotli_quality: int = 4) -> bytes:
+    """Compress a complete response body"""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli (if installed) or gzip.
+
+    Complete responses are compressed if they are at least ``minimum_size``
+    bytes; streamed responses (e.g. NDJSON) are compressed chunk by chunk and
+    flushed after each chunk so clients still see events as they are sent.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+        offload_size: int = 256 * 1024,
+    ):
+        """
+        Initialize compression middleware
+
+        Args:
+            app: ASGI app to wrap
+            minimum_size: Smallest complete body (bytes) worth compressing
+            gzip_level: zlib compression level (1-9)
+            brotli_quality: Brotli quality (0-11); 4 is close to gzip's speed with smaller output
+            brotli_enabled: Offer brotli when the brotli package is installed
+            offload_size: Bodies at least this large are compressed in a worker
+                          thread instead of blocking the event loop
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept, self.brotli_enabled) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """Wraps the ASGI send callable for one response"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[dict] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _compressible(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        content_type = b""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").lower().startswith(COMPRESSIBLE_TYPES)
+
+    def _start_message(self, length: Optional[int]) -> dict:
+        headers = []
+        vary = b""
+        for name, value in self.start.get("headers", []):
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                # The encoded bytes differ from the identity response, so the
+                # validator becomes weak (If-None-Match uses weak comparison)
+                value = b"W/" + value
+            headers.append((name, value))
+        if b"accept-encoding" not in vary.lower():
+            vary = vary + b", Accept-Encoding" if vary else b"Accept-Encoding"
+        headers.append((b"vary", vary))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return dict(self.start, headers=headers)
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            status = message.get("status", 200)
+            self.passthrough = status < 200 or status in (204, 304) or not self._compressible(message.get("headers", []))
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        middleware = self.middleware
+
+        if self.compressor is None and not more_body:
+            # Complete body in one message: compress it whole, or send it as is if small
+            if len(body) < middleware.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                return
+            args = (body, self.encoding, middleware.gzip_level, middleware.brotli_quality)
+            if len(body) >= middleware.offload_size:
+                compressed = await asyncio.get_running_loop().run_in_executor(None, compress_body, *args)
+            else:
+                compressed = compress_body(*args)
+            await self.send(self._start_message(len(compressed)))
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.compressor is None:
+            # Streamed body: the length isn't known, send chunked
+            self.compressor = _Compressor(self.encoding, middleware.gzip_level, middleware.brotli_quality)
+            await self.send(self._start_message(None))
+        data = self.compressor.compress(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,433 @@
+"""
+Corpus Store: scalable storage for fetched abstracts
+SQLite catalog plus append-only, compressed segment files with random-access reads
+"""
+
+import os
+import time
+import gzip
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.lazy_import import LazyModule, is_available
+
+# zstd compresses better and faster than gzip; use it when installed.
+# Imported on first use, since only the packed corpus backend needs it.
+zstandard = LazyModule("zstandard")
+ZSTD_AVAILABLE = is_available(zstandard)
+
+CODEC_ZSTD = "zstd"
+CODEC_GZIP = "gzip"
+_SEGMENT_SUFFIX = {CODEC_ZSTD: "zst", CODEC_GZIP: "gz"}
+
+
+def abstract_filename(arxiv_id: str) -> str:
+    """Filename used for an abstract, same as the flat layout ({arxiv_id}_abstract.txt)"""
+    return f"{arxiv_id.replace('/', '_')}_abstract.txt"
+
+
+def format_abstract(title: str, abstract: str) -> str:
+    """Text of an abstract record, same as the flat layout's file contents"""
+    return f"Title: {title}\n\nAbstract:\n{abstract}\n"
+
+
+def parse_abstract(text: str) -> Dict[str, str]:
+    """Split an abstract file's text back into title and abstract"""
+    title = ""
+    abstract = text
+    if text.startswith("Title:"):
+        head, _, rest = text.partition("\n\n")
+        title = head[len("Title:"):].strip()
+        abstract = rest
+    if abstract.startswith("Abstract:"):
+        abstract = abstract[len("Abstract:"):]
+    return {"title": title, "abstract": abstract.strip()}
+
+
+class CorpusStore:
+    """
+    Stores abstracts as independently compressed records appended to segment
+    files, indexed by a SQLite catalog (id, title, subject, dates, offsets).
+
+    - One segment file per ~64 MB instead of one file per paper (no inode pressure)
+    - Each record is its own gzip member / zstd frame, so any record can be read
+      with a single pread + decompress, and segments stay valid .gz/.zst files
+    - Metadata queries (by subject, date, id) go to SQLite instead of directory scans
+
+    Rewriting an id appends a new record and repoints the catalog; the old bytes
+    stay in the segment until it is compacted.
+    """
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        codec: Optional[str] = None,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compression_level: int = 3,
+    ):
+        """
+        Initialize corpus store
+
+        Args:
+            root_dir: Directory for the catalog and segments. Defaults to backend/corpus
+            codec: "zstd" or "gzip". Defaults to zstd when installed, gzip otherwise
+            max_segment_bytes: Size at which a new segment file is started
+            compression_level: Compression level passed to the codec
+        """
+        if root_dir is None:
+            root_dir = str(Path(__file__).parent.parent / "corpus")
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+        if codec is None:
+            codec = CODEC_ZSTD if ZSTD_AVAILABLE else CODEC_GZIP
+        if codec == CODEC_ZSTD and not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed. Please install it with: pip install zstandard")
+        if codec not in _SEGMENT_SUFFIX:
+            raise ValueError(f"Unknown codec '{codec}'")
+        self.codec = codec
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+
+        self._write_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._fds: Dict[str, int] = {}
+        self._fd_lock = threading.Lock()
+        self._local = threading.local()
+
+        self._conn = sqlite3.connect(str(self.root_dir / "catalog.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL UNIQUE,
+                title TEXT,
+                subject TEXT,
+                published TEXT,
+                fetched_at REAL NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_length INTEGER NOT NULL,
+                codec TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_subject ON papers (subject, fetched_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_fetched ON papers (fetched_at)")
+        self._conn.commit()
+
+        self._segment_name = self._latest_segment()
+
+    # ------------------------------------------------------------------
+    # Compression
+    # ------------------------------------------------------------------
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            compressor = getattr(self._local, "zc", None)
+            if compressor is None:
+                compressor = self._local.zc = zstandard.ZstdCompressor(level=self.compression_level)
+            return compressor.compress(data)
+        return gzip.compress(data, compresslevel=min(9, max(1, self.compression_level + 3)), mtime=0)
+
+    def _decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == CODEC_ZSTD:
+            decompressor = getattr(self._local, "zd", None)
+            if decompressor is None:
+                decompressor = self._local.zd = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data)
+        return gzip.decompress(data)
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def _latest_segment(self) -> str:
+        suffix = _SEGMENT_SUFFIX[self.codec]
+        existing = sorted(self.root_dir.glob(f"segment-*.{suffix}"))
+        if existing:
+            return existing[-1].name
+        return f"segment-000001.{suffix}"
+
+    def _next_segment(self, current: str) -> str:
+        number = int(current.split("-")[1].split(".")[0]) + 1
+        return f"segment-{number:06d}.{_SEGMENT_SUFFIX[self.codec]}"
+
+    def _read_fd(self, segment: str) -> int:
+        with self._fd_lock:
+            fd = self._fds.get(segment)
+            if fd is None:
+                fd = self._fds[segment] = os.open(str(self.root_dir / segment), os.O_RDONLY)
+            return fd
+
+    def _append(self, payloads: List[bytes]) -> List[Dict[str, Any]]:
+        """Append compressed payloads to the current segment. Caller holds the write lock."""
+        locations = []
+        path = self.root_dir / self._segment_name
+        handle = open(path, "ab")
+        try:
+            for payload in payloads:
+                offset = handle.tell()
+                if offset > 0 and offset + len(payload) > self.max_segment_bytes:
+                    handle.close()
+                    self._segment_name = self._next_segment(self._segment_name)
+                    path = self.root_dir / self._segment_name
+                    handle = open(path, "ab")
+                    offset = handle.tell()
+                handle.write(payload)
+                locations.append({"segment": self._segment_name, "offset": offset, "length": len(payload)})
+            handle.flush()
+            os.fsync(handle.fileno())
+        finally:
+            handle.close()
+        return locations
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Append many abstracts in one transaction
+
+        Args:
+            records: Dicts with 'arxiv_id', 'title', 'abstract' and optionally
+                     'subject', 'published', 'fetched_at' and 'text' (the full
+                     record text, used as-is instead of formatting title/abstract)
+
+        Returns:
+            Filenames of the stored records
+        """
+        rows = []
+        payloads = []
+        for record in records:
+            text = record.get("text") or format_abstract(record.get("title") or record["arxiv_id"], record["abstract"])
+            raw = text.encode("utf-8")
+            payloads.append(self._compress(raw))
+            rows.append((record, len(raw)))
+        if not rows:
+            return []
+
+        with self._write_lock:
+            locations = self._append(payloads)
+            with self._db_lock:
+                self._conn.executemany(
+                    """
+                    INSERT INTO papers
+                        (arxiv_id, filename, title, subject, published, fetched_at,
+                         segment, offset, length, raw_length, codec)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (arxiv_id) DO UPDATE SET
+                        title = excluded.title,
+                        subject = COALESCE(excluded.subject, papers.subject),
+                        published = COALESCE(excluded.published, papers.published),
+                        fetched_at = excluded.fetched_at,
+                        segment = excluded.segment,
+                        offset = excluded.offset,
+                        length = excluded.length,
+                        raw_length = excluded.raw_length,
+                        codec = excluded.codec
+                    """,
+                    [
+                        (
+                            record["arxiv_id"],
+                            abstract_filename(record["arxiv_id"]),
+                            record.get("title"),
+                            record.get("subject"),
+                            record.get("published"),
+                            record.get("fetched_at") or time.time(),
+                            location["segment"],
+                            location["offset"],
+                            location["length"],
+                            raw_length,
+                            self.codec,
+                        )
+                        for (record, raw_length), location in zip(rows, locations)
+                    ],
+                )
+                self._conn.commit()
+        return [abstract_filename(record["arxiv_id"]) for record, _ in rows]
+
+    def put_abstract(
+        self,
+        arxiv_id: str,
+        title: str,
+        abstract: str,
+        subject: Optional[str] = None,
+        published: Optional[str] = None,
+    ) -> str:
+        """
+        Store one abstract (used by the scraper in place of writing a .txt file)
+
+        Returns:
+            The record's filename ({arxiv_id}_abstract.txt)
+        """
+        return self.put_many([{
+            "arxiv_id": arxiv_id,
+            "title": title,
+            "abstract": abstract,
+            "subject": subject,
+            "published": published,
+        }])[0]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _row(self, filename: str) -> Optional[sqlite3.Row]:
+        with self._db_lock:
+            return self._conn.execute("SELECT * FROM papers WHERE filename = ?", (filename,)).fetchone()
+
+    def has(self, filename: str) -> bool:
+        """Check whether a record with this filename exists"""
+        return self._row(filename) is not None
+
+    def has_id(self, arxiv_id: str) -> bool:
+        """Check whether an arXiv id is stored"""
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT 1 FROM papers WHERE arxiv_id = ?", (arxiv_id,)
+            ).fetchone() is not None
+
+    def read_text(self, filename: str) -> str:
+        """
+        Read a record's text with a single positioned read
+
+        Raises:
+            FileNotFoundError: If no record has this filename
+        """
+        row = self._row(filename)
+        if row is None:
+            raise FileNotFoundError(f"File '{filename}' not found in corpus store")
+        data = os.pread(self._read_fd(row["segment"]), row["length"], row["offset"])
+        return self._decompress(data, row["codec"]).decode("utf-8")
+
+    def metadata(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Catalog metadata for a record (no segment read)"""
+        row = self._row(filename)
+        return dict(row) if row else None
+
+    def query(
+        self,
+        subject: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Metadata query over the catalog
+
+        Args:
+            subject: Only records with this subject
+            since: Only records fetched at or after this Unix time
+            limit: Maximum rows to return
+            offset: Rows to skip
+
+        Returns:
+            List of metadata dicts ordered by fetch time (newest first)
+        """
+        clauses = []
+        params: List[Any] = []
+        if subject:
+            clauses.append("subject = ?")
+            params.append(subject)
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            params.append(since)
+        sql = "SELECT arxiv_id, filename, title, subject, published, fetched_at, raw_length FROM papers"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY fetched_at DESC LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        with self._db_lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def count(self) -> int:
+        """Number of stored records"""
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def disk_usage(self) -> Dict[str, int]:
+        """Bytes and files used by segments and the catalog"""
+        files = [p for p in self.root_dir.iterdir() if p.is_file()]
+        return {"files": len(files), "bytes": sum(p.stat().st_size for p in files)}
+
+    def close(self):
+        """Close open file descriptors and the catalog"""
+        with self._fd_lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds = {}
+        with self._db_lock:
+            self._conn.close()
+
+
+def migrate_flat_directory(
+    data_dir: str,
+    store: CorpusStore,
+    subject: Optional[str] = None,
+    delete_originals: bool = False,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    Move {arxiv_id}_abstract.txt files from a flat directory into a corpus store
+
+    Args:
+        data_dir: Directory holding the flat abstract files
+        store: Destination store
+        subject: Subject to record for migrated papers (the flat layout doesn't keep it)
+        delete_originals: Remove each file once its batch is committed
+        batch_size: Records appended per transaction
+
+    Returns:
+        Counts of migrated and skipped files
+    """
+    migrated = 0
+    skipped = 0
+    batch: List[Dict[str, Any]] = []
+    batch_paths: List[str] = []
+
+    def flush():
+        nonlocal migrated
+        store.put_many(batch)
+        migrated += len(batch)
+        if delete_originals:
+            for path in batch_paths:
+                os.remove(path)
+        batch.clear()
+        batch_paths.clear()
+
+    with os.scandir(data_dir) as it:
+        for dirent in it:
+            if not dirent.is_file() or not dirent.name.endswith("_abstract.txt"):
+                continue
+            try:
+                with open(dirent.path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except UnicodeDecodeError:
+                with open(dirent.path, "r", encoding="latin-1") as f:
+                    text = f.read()
+            parsed = parse_abstract(text)
+            if not parsed["abstract"]:
+                skipped += 1
+                continue
+            batch.append({
+                "arxiv_id": dirent.name[: -len("_abstract.txt")],
+                "title": parsed["title"],
+                "abstract": parsed["abstract"],
+                "text": text,
+                "subject": subject,
+                "fetched_at": dirent.stat().st_mtime,
+            })
+            batch_paths.append(dirent.path)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    return {"migrated": migrated, "skipped": skipped}
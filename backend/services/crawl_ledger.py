@@ -0,0 +1,311 @@
+"""
+Crawl Ledger for incremental, resumable arXiv crawls
+Backed by SQLite so crawl progress survives failed requests and restarts
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+SEEN = "seen"  # listed, not fetched yet (queued, or the crawl stopped first)
+FETCHED = "fetched"
+FAILED = "failed"
+
+
+def listing_key(subject: str, year: Optional[int], month: Optional[int]) -> str:
+    """Ledger key of an arXiv listing: 'cs/2024-01', or 'cs/recent' if year/month are None"""
+    if year is not None and month is not None:
+        return f"{subject}/{year:04d}-{month:02d}"
+    return f"{subject}/recent"
+
+
+class CrawlLedger:
+    """
+    Persistent record of every arXiv id a crawl has listed, with its state
+    (seen, fetched or failed), plus a cursor per listing.
+
+    - Ids already fetched are never fetched again, so repeated crawls only
+      fetch new papers
+    - Ids listed but not fetched when a crawl stopped are fetched first on the
+      next crawl of the same listing, which then continues paging from the
+      listing's cursor
+    - Failed ids are retried on later crawls with exponential backoff, up to
+      max_attempts times
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        retry_base: float = 300.0,
+        retry_max: float = 86400.0,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize crawl ledger
+
+        Args:
+            db_path: Path of the SQLite database. Defaults to backend/cache/crawl_ledger.sqlite3
+            retry_base: Seconds before the first retry of a failed id; doubles per attempt
+            retry_max: Longest wait between retries
+            max_attempts: Fetch attempts before an id is given up on
+        """
+        if db_path is None:
+            backend_dir = Path(__file__).parent.parent
+            db_path = str(backend_dir / "cache" / "crawl_ledger.sqlite3")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                listing TEXT NOT NULL,
+                url TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                filename TEXT,
+                seen_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS papers_pending ON papers (listing, status, next_attempt)")
+        # Every listing an id appeared in: papers.listing only keeps the first, but an id
+        # cross-listed (or also in 'recent') is pending work for each listing that showed it
+        had_memberships = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_listings'"
+        ).fetchone()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS paper_listings (
+                listing TEXT NOT NULL,
+                arxiv_id TEXT NOT NULL,
+                PRIMARY KEY (listing, arxiv_id)
+            ) WITHOUT ROWID
+            """
+        )
+        if not had_memberships:
+            self._conn.execute("INSERT OR IGNORE INTO paper_listings (listing, arxiv_id) SELECT listing, arxiv_id FROM papers")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listings (
+                listing TEXT PRIMARY KEY,
+                cursor INTEGER NOT NULL DEFAULT 0,
+                completed_at REAL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Listings
+    # ------------------------------------------------------------------
+
+    def cursor(self, listing: str) -> int:
+        """skip of the next list page a crawl of this listing hasn't read yet (0 if none)"""
+        with self._lock:
+            row = self._conn.execute("SELECT cursor FROM listings WHERE listing = ?", (listing,)).fetchone()
+        return row["cursor"] if row else 0
+
+    def set_cursor(self, listing: str, cursor: int, complete: bool = False):
+        """
+        Move a listing's cursor. complete=True records that a crawl reached
+        the end of the listing; the cursor is then reset so the next crawl
+        starts over from the top (skipping ids it already has).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO listings (listing, cursor, completed_at, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (listing) DO UPDATE SET
+                    cursor = excluded.cursor,
+                    completed_at = COALESCE(excluded.completed_at, listings.completed_at),
+                    updated_at = excluded.updated_at
+                """,
+                (listing, 0 if complete else cursor, now if complete else None, now),
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Papers
+    # ------------------------------------------------------------------
+
+    def record_listed(
+        self,
+        listing: str,
+        links: Iterable[Tuple[str, str]],
+        exists: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Record the (arxiv_id, abs_url) pairs of a list page
+
+        Args:
+            listing: Listing key (see listing_key)
+            links: Pairs in page order
+            exists: Whether an id not in the ledger is already saved (e.g.
+                    fetched before the ledger existed); those are recorded as
+                    fetched instead of seen
+
+        Returns:
+            The pairs not in the ledger before and not already saved, in
+            page order: the new papers to fetch
+        """
+        links = list(links)
+        if not links:
+            return []
+        with self._lock:
+            known = {
+                row["arxiv_id"]
+                for row in self._conn.execute(
+                    f"SELECT arxiv_id FROM papers WHERE arxiv_id IN ({','.join('?' * len(links))})",
+                    [aid for aid, _ in links],
+                )
+            }
+        new = []
+        rows = []
+        now = time.time()
+        for aid, url in links:
+            if aid in known:
+                continue
+            known.add(aid)
+            saved = exists is not None and exists(aid)
+            rows.append((aid, listing, url, FETCHED if saved else SEEN, now, now))
+            if not saved:
+                new.append((aid, url))
+        with self._lock:
+            if rows:
+                self._conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO papers (arxiv_id, listing, url, status, seen_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+            # Known ids too: one first seen in another listing is still pending work for this one
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO paper_listings (listing, arxiv_id) VALUES (?, ?)",
+                [(listing, aid) for aid, _ in links],
+            )
+            self._conn.commit()
+        return new
+
+    def pending(self, listing: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        (arxiv_id, abs_url) of papers in this listing to fetch before paging:
+        ids listed by an earlier crawl that stopped before fetching them, then
+        failed ids whose backoff has passed. Includes ids first seen in another
+        listing, as long as this listing showed them too.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT p.arxiv_id, p.url FROM paper_listings AS l
+                JOIN papers AS p ON p.arxiv_id = l.arxiv_id
+                WHERE l.listing = ? AND p.url IS NOT NULL AND (
+                    p.status = ? OR (p.status = ? AND p.next_attempt <= ? AND p.attempts < ?)
+                )
+                ORDER BY p.status = ?, p.seen_at
+                LIMIT ?
+                """,
+                (listing, SEEN, FAILED, time.time(), self.max_attempts, FAILED, limit),
+            ).fetchall()
+        return [(row["arxiv_id"], row["url"]) for row in rows]
+
+    def mark_fetched(self, arxiv_id: str, filename: str):
+        """Record that a paper was fetched and saved"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE papers SET status = ?, filename = ?, last_error = NULL, updated_at = ? WHERE arxiv_id = ?",
+                (FETCHED, filename, time.time(), arxiv_id),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, arxiv_id: str, error: str):
+        """Record a failed fetch and schedule the next attempt"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM papers WHERE arxiv_id = ?", (arxiv_id,)).fetchone()
+            attempts = (row["attempts"] if row else 0) + 1
+            backoff = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+            self._conn.execute(
+                """
+                UPDATE papers SET status = ?, attempts = ?, next_attempt = ?, last_error = ?, updated_at = ?
+                WHERE arxiv_id = ?
+                """,
+                (FAILED, attempts, now + backoff, error[:500], now, arxiv_id),
+            )
+            self._conn.commit()
+
+    def record_fetched(self, listing: str, items: Iterable[Tuple[str, str]]):
+        """Record papers saved without going through a list page (e.g. bulk export), as (arxiv_id, filename)"""
+        items = list(items)
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO papers (arxiv_id, listing, status, filename, seen_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (arxiv_id) DO UPDATE SET
+                    status = excluded.status, filename = excluded.filename,
+                    last_error = NULL, updated_at = excluded.updated_at
+                """,
+                [(aid, listing, FETCHED, filename, now, now) for aid, filename in items],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO paper_listings (listing, arxiv_id) VALUES (?, ?)",
+                [(listing, aid) for aid, _ in items],
+            )
+            self._conn.commit()
+
+    def fetched(self, arxiv_ids: Iterable[str]) -> set:
+        """The given ids that were already fetched"""
+        ids = list(arxiv_ids)
+        if not ids:
+            return set()
+        with self._lock:
+            return {
+                row["arxiv_id"]
+                for row in self._conn.execute(
+                    f"SELECT arxiv_id FROM papers WHERE status = ? AND arxiv_id IN ({','.join('?' * len(ids))})",
+                    [FETCHED, *ids],
+                )
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {
+                row["status"]: row["n"]
+                for row in self._conn.execute("SELECT status, COUNT(*) AS n FROM papers GROUP BY status")
+            }
+            given_up = self._conn.execute(
+                "SELECT COUNT(*) FROM papers WHERE status = ? AND attempts >= ?", (FAILED, self.max_attempts)
+            ).fetchone()[0]
+            listings = {
+                row["listing"]: {"cursor": row["cursor"], "completed_at": row["completed_at"]}
+                for row in self._conn.execute("SELECT * FROM listings ORDER BY listing")
+            }
+        return {
+            "seen": counts.get(SEEN, 0),
+            "fetched": counts.get(FETCHED, 0),
+            "failed": counts.get(FAILED, 0),
+            "given_up": given_up,
+            "listings": listings,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,233 @@
+"""
+Request deadlines and cancellation on client disconnect
+The deadline of the current request lives in a context variable, so any code
+running for it (LLM calls, executor submissions, single-flight computations)
+can size its timeouts to the remaining budget
+"""
+
+import time
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence
+
+# Wall-clock time (time.time()) the current request must finish by; wall-clock
+# rather than monotonic so it can be handed to process pool workers
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+# Requests cut short by DeadlineMiddleware in this process
+_counts = {"timed_out": 0, "disconnected": 0}
+
+
+def stats() -> Dict[str, int]:
+    """Requests that timed out before responding, or whose client disconnected"""
+    return dict(_counts)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the work finished"""
+
+
+def current() -> Optional[float]:
+    """Deadline of the current request, or None if it has none"""
+    return _deadline.get()
+
+
+def clear():
+    """
+    Drop the deadline in the current context. Call at the start of background
+    tasks spawned from a request, which would otherwise inherit its deadline.
+    """
+    _deadline.set(None)
+
+
+def remaining(at: Optional[float] = None) -> Optional[float]:
+    """Seconds left until the deadline (default: the current request's), None if unbounded"""
+    at = current() if at is None else at
+    if at is None:
+        return None
+    return at - time.time()
+
+
+def expired(at: Optional[float] = None) -> bool:
+    """Whether the deadline has passed"""
+    left = remaining(at)
+    return left is not None and left <= 0
+
+
+def check(at: Optional[float] = None, slack: float = 0.0):
+    """
+    Raise DeadlineExceeded if the deadline has passed
+
+    Args:
+        at: Deadline to check; the current request's if None. Pass it
+            explicitly in process pool workers, which don't see the context.
+        slack: Also raise if no more than this many seconds are left (e.g.
+               after a timeout that was capped to the deadline fired)
+    """
+    left = remaining(at)
+    if left is not None and left <= slack:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def timeout(default: float) -> float:
+    """
+    Timeout for one blocking operation: the default, capped by the time left
+
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(default, left)
+
+
+async def sleep(seconds: float):
+    """asyncio.sleep that fails right away instead of sleeping past the deadline"""
+    left = remaining()
+    if left is not None and left < seconds:
+        raise DeadlineExceeded(f"Request deadline leaves {max(left, 0):.1f}s, less than the {seconds:.1f}s wait")
+    await asyncio.sleep(seconds)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware giving each request a deadline and cancelling it when the
+    client goes away.
+
+    The deadline comes from the ``X-Request-Timeout`` header (seconds, capped
+    at ``max_timeout``) or ``default_timeout``. If it passes before the
+    response has started, the handler is cancelled and a 504 is sent. If the
+    client disconnects at any point, the handler (and everything it awaits)
+    is cancelled.
+    """
+
+    header = b"x-request-timeout"
+
+    def __init__(
+        self,
+        app,
+        default_timeout: Optional[float] = 120.0,
+        max_timeout: float = 600.0,
+        long_running_paths: Sequence[str] = (),
+    ):
+        """
+        Initialize deadline middleware
+
+        Args:
+            app: ASGI app to wrap
+            default_timeout: Seconds allowed when the client doesn't send a
+                             timeout; None or 0 for no default deadline
+            max_timeout: Upper bound for timeouts asked for in the header
+            long_running_paths: Paths exempt from the default deadline
+                                (streamed or long-running responses); a
+                                timeout from the header still applies
+        """
+        self.app = app
+        self.default_timeout = default_timeout or None
+        self.max_timeout = max_timeout
+        self.long_running_paths = frozenset(long_running_paths)
+
+    def _timeout(self, scope) -> Optional[float]:
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                try:
+                    requested = float(value.decode("latin-1"))
+                except ValueError:
+                    break  # malformed: fall back to the default
+                if requested > 0:
+                    return min(requested, self.max_timeout)
+                break
+        if scope.get("path") in self.long_running_paths:
+            return None
+        return self.default_timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = self._timeout(scope)
+        token = _deadline.set(time.time() + timeout if timeout else None)
+        try:
+            await _RequestWatch(self, scope, receive, send).run()
+        finally:
+            _deadline.reset(token)
+
+
+class _RequestWatch:
+    """Runs one request's handler while watching for a disconnect and the deadline"""
+
+    def __init__(self, middleware: DeadlineMiddleware, scope, receive, send):
+        self.middleware = middleware
+        self.scope = scope
+        self._receive = receive
+        self._send = send
+        # One message of read-ahead keeps backpressure on request bodies
+        self.messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.disconnected = asyncio.Event()
+        self.response_started = False
+
+    async def _pump(self):
+        # The only reader of the server's receive, so a disconnect is seen even
+        # while the handler isn't reading (e.g. waiting on the LLM)
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self.disconnected.set()
+                await self.messages.put(message)
+                return
+            await self.messages.put(message)
+
+    async def receive(self):
+        return await self.messages.get()
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        await self._send(message)
+
+    async def run(self):
+        handler = asyncio.create_task(self.middleware.app(self.scope, self.receive, self.send))
+        pump = asyncio.create_task(self._pump())
+        disconnect = asyncio.create_task(self.disconnected.wait())
+        try:
+            while True:
+                wait = None
+                at = current()
+                if at is not None and not self.response_started:
+                    wait = max(0.0, at - time.time())
+                done, _ = await asyncio.wait({handler, disconnect}, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if handler in done:
+                    handler.result()
+                    return
+                if disconnect in done:
+                    _counts["disconnected"] += 1
+                    await _cancel(handler)
+                    return
+                if not self.response_started:
+                    _counts["timed_out"] += 1
+                    await _cancel(handler)
+                    if not self.response_started:
+                        await self._send_timeout()
+                    return
+        finally:
+            for task in (handler, pump, disconnect):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(pump, disconnect, return_exceptions=True)
+
+    async def _send_timeout(self):
+        body = b'{"detail":"Request deadline exceeded"}'
+        await self._send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await self._send({"type": "http.response.body", "body": body})
+
+
+async def _cancel(task: asyncio.Task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
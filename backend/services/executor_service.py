@@ -0,0 +1,202 @@
+"""
+Executor Service for running blocking work off the event loop
+Provides app-wide bounded pools: threads for I/O, processes for CPU-heavy parsing
+"""
+
+import os
+import time
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from services import deadline
+
+
+class BoundedExecutor:
+    """
+    Wraps a concurrent.futures executor with a bounded queue and usage stats.
+
+    At most ``max_workers + max_queue`` tasks are admitted at once; further
+    callers wait (backpressure) instead of piling up unbounded work.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], max_workers: int, max_queue: int):
+        """
+        Initialize a bounded executor
+
+        Args:
+            name: Name used in stats ("io" or "cpu")
+            factory: Callable creating the underlying executor
+            max_workers: Number of workers in the underlying executor
+            max_queue: Number of tasks allowed to wait for a free worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started_at = time.monotonic()
+
+        self.waiting = 0  # callers blocked on admission
+        self.in_flight = 0  # admitted tasks, running or queued in the executor
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0  # caller gave up (disconnect or deadline) before the result
+        self.busy_seconds = 0.0
+
+    def start(self):
+        """Create the underlying executor (idempotent)"""
+        if self._executor is None:
+            self._executor = self._factory()
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._started_at = time.monotonic()
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying executor"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the pool and await its result
+
+        Args:
+            fn: Callable to run. For process pools it must be picklable.
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            The callable's return value (exceptions are re-raised)
+
+        Raises:
+            DeadlineExceeded: If the request's deadline passed while waiting for a slot
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            # Work for a request that has run out of time is never submitted
+            deadline.check()
+        except deadline.DeadlineExceeded:
+            self._slots.release()
+            self.cancelled += 1
+            raise
+
+        self.in_flight += 1
+        self.submitted += 1
+        started = time.monotonic()
+        try:
+            call = functools.partial(fn, *args, **kwargs)
+            result = await loop.run_in_executor(self._executor, call)
+            self.completed += 1
+            return result
+        except asyncio.CancelledError:
+            # Tasks still queued in the executor are dropped; a running one finishes unobserved
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.busy_seconds += time.monotonic() - started
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and utilization of this pool"""
+        # The executor doesn't report when a task starts, so anything admitted
+        # beyond the worker count is counted as queued
+        running = min(self.in_flight, self.max_workers)
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "name": self.name,
+            "started": self._executor is not None,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queue_depth": max(0, self.in_flight - self.max_workers) + self.waiting,
+            "utilization": round(running / self.max_workers, 3),
+            "average_utilization": round(min(1.0, self.busy_seconds / (uptime * self.max_workers)), 3),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+
+class ExecutorService:
+    """
+    App-wide executors shared by every request handler.
+
+    - ``io``: thread pool for file reads, scraping and other blocking I/O
+    - ``cpu``: process pool for CPU-heavy PDF parsing
+    """
+
+    def __init__(
+        self,
+        io_workers: Optional[int] = None,
+        cpu_workers: Optional[int] = None,
+        max_queue: int = 64,
+        start_method: str = "spawn",
+    ):
+        """
+        Initialize executor service
+
+        Args:
+            io_workers: Threads in the I/O pool (default: min(32, cpus + 4))
+            cpu_workers: Processes in the CPU pool (default: number of CPUs)
+            max_queue: Tasks allowed to wait per pool before callers block
+            start_method: multiprocessing start method for the CPU pool.
+                          "spawn" is safe to use from a threaded server.
+        """
+        cpus = os.cpu_count() or 1
+        io_workers = io_workers or min(32, cpus + 4)
+        cpu_workers = cpu_workers or cpus
+
+        self.io = BoundedExecutor(
+            "io",
+            lambda: ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="topical-io"),
+            io_workers,
+            max_queue,
+        )
+        self.cpu = BoundedExecutor(
+            "cpu",
+            lambda: ProcessPoolExecutor(
+                max_workers=cpu_workers,
+                mp_context=multiprocessing.get_context(start_method),
+            ),
+            cpu_workers,
+            max_queue,
+        )
+
+    def start(self):
+        """Create both pools (call from the app lifespan)"""
+        self.io.start()
+        self.cpu.start()
+
+    def shutdown(self, wait: bool = True):
+        """Shut down both pools (call from the app lifespan)"""
+        self.io.shutdown(wait=wait)
+        self.cpu.shutdown(wait=wait)
+
+    async def run_io(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run blocking I/O work in the thread pool"""
+        return await self.io.run(fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run CPU-heavy work in the process pool (fn and args must be picklable)"""
+        return await self.cpu.run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats for both pools"""
+        return {"io": self.io.stats(), "cpu": self.cpu.stats()}
@@ -0,0 +1,162 @@
+"""
+Extraction Cache for parsed PDF documents
+Backed by SQLite so text, structure and images are extracted once per file version
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.shared_state import LocalState, SharedState
+
+
+class ExtractionCache:
+    """
+    Persistent cache of extraction results, keyed by filename. Each entry
+    remembers the version it was built from (the source file's version plus
+    a fingerprint of the extraction settings); entries for any other version
+    are treated as missing.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, state: Optional[SharedState] = None):
+        """
+        Initialize extraction cache
+
+        Args:
+            db_path: Path of the SQLite database. Defaults to backend/cache/extractions.sqlite3
+            state: Where hit/miss counters are kept, so hit rates cover every
+                   worker sharing it. Defaults to per-process counters.
+        """
+        if db_path is None:
+            backend_dir = Path(__file__).parent.parent
+            db_path = str(backend_dir / "cache" / "extractions.sqlite3")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                filename TEXT PRIMARY KEY,
+                source_version TEXT NOT NULL,
+                text TEXT NOT NULL,
+                structure TEXT NOT NULL,
+                images TEXT,
+                image_stats TEXT,
+                text_stats TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        # Databases created before text normalization lack the text_stats column. Their
+        # rows hold raw text and would never match a current source_version, so drop them
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(extractions)")}
+        if "text_stats" not in columns:
+            self._conn.execute("ALTER TABLE extractions ADD COLUMN text_stats TEXT")
+            self._conn.execute("DELETE FROM extractions")
+        self._conn.commit()
+        self.state = state if state is not None else LocalState()
+
+    def get(self, filename: str, source_version: str, count: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached extraction of a file if it matches the given version
+
+        Args:
+            filename: Article filename in the data directory
+            source_version: Version stamp of the source file and extraction settings
+            count: Record the lookup in the hit/miss counters
+
+        Returns:
+            Dict with 'text', 'text_stats', 'structure', 'images' and
+            'image_stats' ('images' is None if the entry was stored without
+            images), or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM extractions WHERE filename = ? AND source_version = ?",
+                (filename, source_version),
+            ).fetchone()
+        if count:
+            self.state.incr("extraction_cache.misses" if row is None else "extraction_cache.hits")
+        if row is None:
+            return None
+        return {
+            "text": row["text"],
+            "text_stats": json.loads(row["text_stats"]) if row["text_stats"] is not None else None,
+            "structure": json.loads(row["structure"]),
+            "images": json.loads(row["images"]) if row["images"] is not None else None,
+            "image_stats": json.loads(row["image_stats"]) if row["image_stats"] is not None else None,
+        }
+
+    def put(
+        self,
+        filename: str,
+        source_version: str,
+        text: str,
+        structure: Dict[str, Any],
+        images: Optional[List[Dict]] = None,
+        image_stats: Optional[Dict[str, int]] = None,
+        text_stats: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Insert or replace the extraction of a file
+
+        Args:
+            filename: Article filename in the data directory
+            source_version: Version stamp of the source file and extraction settings
+            text: Extracted text
+            structure: Parsed paper structure (see paper_structure.parse_paper)
+            images: Processed images, or None if images weren't extracted
+            image_stats: Image processing stats
+            text_stats: Text normalization stats
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO extractions
+                    (filename, source_version, text, structure, images, image_stats, text_stats, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    filename,
+                    source_version,
+                    text,
+                    json.dumps(structure),
+                    json.dumps(images) if images is not None else None,
+                    json.dumps(image_stats) if image_stats is not None else None,
+                    json.dumps(text_stats) if text_stats is not None else None,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, filename: str):
+        """Remove the cached extraction of a file"""
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions WHERE filename = ?", (filename,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        counters = self.state.counters("extraction_cache.")
+        hits = counters.get("extraction_cache.hits", 0)
+        misses = counters.get("extraction_cache.misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
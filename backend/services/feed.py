@@ -0,0 +1,145 @@
+"""
+Feed Order: stable per-session random order over the article catalog,
+paginated with opaque cursors
+"""
+
+import hashlib
+import heapq
+import secrets
+import string
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from services.article_catalog import ArticleCatalog
+from services.lazy_import import LazyModule, is_available
+
+# NumPy ranks large catalogs in one vectorized pass; pure Python is the fallback
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = is_available(np)
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(value: int) -> int:
+    """splitmix64 finalizer: a bijection on 64-bit integers that scrambles the order"""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def _name_hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def new_seed() -> int:
+    """Random seed for a new feed session"""
+    return secrets.randbits(64)
+
+
+def encode_cursor(seed: int, after: int) -> str:
+    """Opaque cursor: the session seed and the sort key of the last item served"""
+    return f"{seed:016x}{after:016x}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Parse a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if len(cursor) != 32 or any(ch not in string.hexdigits for ch in cursor):
+        raise ValueError("Invalid cursor")
+    return int(cursor[:16], 16), int(cursor[16:], 16)
+
+
+class FeedOrder:
+    """
+    Orders the catalog's articles by mix(hash(name) ^ seed). Each session
+    (seed) sees its own random order, and the order of two articles never
+    changes, so paging by "sort key greater than the last one served" has
+    no duplicates or gaps even while articles are added or removed.
+    """
+
+    def __init__(self, catalog: ArticleCatalog, type: str = "article"):
+        """
+        Initialize feed order
+
+        Args:
+            catalog: Catalog of the data directory
+            type: Catalog type the feed draws from
+        """
+        self.catalog = catalog
+        self.type = type
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._names: List[str] = []
+        self._hashes: List[int] = []
+        self._hash_cache: Dict[str, int] = {}
+        self._hash_array = None
+
+    def _refresh(self):
+        """Reload names when the catalog changed; only new names are hashed"""
+        generation = self.catalog.generation
+        if generation == self._generation:
+            return
+        names = self.catalog.names(type=self.type)
+        cache = self._hash_cache
+        hashes = []
+        for name in names:
+            value = cache.get(name)
+            if value is None:
+                value = cache[name] = _name_hash(name)
+            hashes.append(value)
+        if len(cache) > 2 * len(names) + 1024:
+            # Drop hashes of removed articles
+            self._hash_cache = dict(zip(names, hashes))
+        self._names, self._hashes = names, hashes
+        self._hash_array = np.array(hashes, dtype=np.uint64) if NUMPY_AVAILABLE else None
+        self._generation = generation
+
+    def page(self, seed: int, after: Optional[int], limit: int) -> Tuple[List[str], Optional[int], bool]:
+        """
+        One page of the session's order
+
+        Args:
+            seed: Session seed (see new_seed)
+            after: Sort key of the last item of the previous page, None for the first page
+            limit: Page size
+
+        Returns:
+            Tuple of (filenames, sort key of the last one, whether more items follow)
+        """
+        with self._lock:
+            self._refresh()
+            if NUMPY_AVAILABLE and self._hashes:
+                ranked = self._page_numpy(seed, after, limit + 1)
+            else:
+                ranked = self._page_python(seed, after, limit + 1)
+            names = self._names
+        has_more = len(ranked) > limit
+        ranked = ranked[:limit]
+        return [names[i] for _, i in ranked], (ranked[-1][0] if ranked else after), has_more
+
+    def _page_python(self, seed: int, after: Optional[int], count: int) -> List[Tuple[int, int]]:
+        keys = ((_mix(h ^ seed), i) for i, h in enumerate(self._hashes))
+        if after is not None:
+            keys = (item for item in keys if item[0] > after)
+        return heapq.nsmallest(count, keys)
+
+    def _page_numpy(self, seed: int, after: Optional[int], count: int) -> List[Tuple[int, int]]:
+        # Same arithmetic as _mix; uint64 multiplication wraps around like the mask
+        z = self._hash_array ^ np.uint64(seed)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+        candidates = np.nonzero(z > np.uint64(after))[0] if after is not None else np.arange(len(z))
+        if len(candidates) > count:
+            candidates = candidates[np.argpartition(z[candidates], count - 1)[:count]]
+        order = candidates[np.argsort(z[candidates], kind="stable")]
+        return [(int(z[i]), int(i)) for i in order]
+
+    def next_names(self, seed: int, after: Optional[int], limit: int) -> List[str]:
+        """Filenames of the page after the given key (for prefetching)"""
+        names, _, _ = self.page(seed, after, limit)
+        return names
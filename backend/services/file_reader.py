@@ -5,32 +5,29 @@
 File Reader Service for reading text files and PDFs from the data directory
 """
 
-import base64
+import hashlib
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from io import BytesIO
 
-# Try to import PDF libraries, handle gracefully if not installed
-try:
-    import fitz  # PyMuPDF
-    FITZ_AVAILABLE = True
-except ImportError:
-    FITZ_AVAILABLE = False
-    fitz = None
+from services.image_processor import ImageProcessorService
+from services.article_catalog import ArticleCatalog, CatalogEntry, CatalogWatcher, SUPPORTED_EXTENSIONS, file_type
+from services.corpus_store import CorpusStore
+from services.paper_structure import parse_paper
+from services.text_normalizer import normalize_pages
+from services.deadline import DeadlineExceeded, check as check_deadline
+from services.lazy_import import LazyModule, is_available
 
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
-    pdfplumber = None
+# PDF and imaging libraries are imported on first use, not at startup;
+# the flags only check that they are installed
+fitz = LazyModule("fitz")  # PyMuPDF
+FITZ_AVAILABLE = is_available(fitz)
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    Image = None
+pdfplumber = LazyModule("pdfplumber")
+PDFPLUMBER_AVAILABLE = is_available(pdfplumber)
+
+Image = LazyModule("PIL.Image")
+PIL_AVAILABLE = is_available(Image)
 
 
 class FileReaderService:
@@ -38,12 +35,28 @@ class FileReaderService:
     Service for reading text files from a designated data directory
     """
     
-    def __init__(self, data_dir: str = "data"):
+    # Bump whenever PDF text extraction, normalization or structure parsing
+    # changes its output, so cached extractions built by the old code are invalidated
+    EXTRACTION_VERSION = "1"
+    
+    def __init__(
+        self,
+        data_dir: str = "data",
+        image_processor: Optional[ImageProcessorService] = None,
+        corpus_store: Optional[CorpusStore] = None,
+        normalize: bool = True,
+    ):
         """
         Initialize file reader service
         
         Args:
             data_dir: Directory containing text files to read
+            image_processor: Filters, dedupes and thumbnails extracted PDF images.
+                             Defaults to an ImageProcessorService with default settings.
+            corpus_store: Optional packed store of abstracts. Files not found in the
+                          data directory are looked up there.
+            normalize: Clean extracted PDF text (hyphenation, wraps, headers and
+                       footers, non-prose lines) before it is returned
         """
         # Get the backend directory (parent of services)
         backend_dir = Path(__file__).parent.parent
@@ -51,6 +64,153 @@ class FileReaderService:
         
         # Create data directory if it doesn't exist
         self.data_dir.mkdir(exist_ok=True)
+        
+        self.image_processor = image_processor or ImageProcessorService()
+        self.corpus_store = corpus_store
+        self.normalize = normalize
+        
+        # In-memory catalog of the data directory, built by start_catalog()
+        self.catalog = ArticleCatalog(self.data_dir)
+        self._watcher: Optional[CatalogWatcher] = None
+        # filename -> (catalog version, SHA-256 of the contents)
+        self._hashes: Dict[str, Tuple[str, str]] = {}
+        self._fingerprint: Optional[str] = None
+    
+    def extraction_fingerprint(self) -> str:
+        """
+        Short hash of everything besides the file itself that shapes an
+        extraction (extraction version, normalization, image settings), for
+        extraction cache keys and ETags
+        """
+        if self._fingerprint is None:
+            settings = [self.EXTRACTION_VERSION, self.normalize, self.image_processor.settings()]
+            self._fingerprint = hashlib.sha256(repr(settings).encode()).hexdigest()[:16]
+        return self._fingerprint
+    
+    def __getstate__(self):
+        # Instances are pickled into the PDF process pool: the catalog contents
+        # and its watcher thread stay in the parent process
+        state = self.__dict__.copy()
+        state["_watcher"] = None
+        state["_hashes"] = {}
+        # PDFs never live in the corpus store, and its SQLite handle can't be pickled
+        state["corpus_store"] = None
+        return state
+    
+    def start_catalog(self, poll_interval: float = 2.0):
+        """
+        Build the catalog with one directory scan and keep it current
+        with a background watcher
+        
+        Args:
+            poll_interval: Seconds between directory checks when inotify isn't available
+        """
+        self.catalog.build()
+        if self.corpus_store is not None:
+            for record in self.corpus_store.query():
+                self._add_corpus_entry(record)
+        if self._watcher is None:
+            self._watcher = CatalogWatcher(self.catalog, poll_interval=poll_interval)
+            self._watcher.start()
+    
+    def stop_catalog(self):
+        """Stop watching the data directory"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
+    def _add_corpus_entry(self, record: Dict):
+        self.catalog.add_entry(CatalogEntry(
+            name=record["filename"],
+            type=file_type(record["filename"]),
+            size=record["raw_length"],
+            mtime_ns=int(record["fetched_at"] * 1e9),
+            subject=record.get("subject"),
+            source="corpus",
+        ))
+    
+    def notify_file_added(self, filename: str, subject: Optional[str] = None):
+        """
+        Record a file that was just written to the data directory (e.g. by the
+        scraper) without waiting for the watcher
+        
+        Args:
+            filename: Name of the new file
+            subject: Subject category the file belongs to, if known
+        """
+        if self.catalog.add(filename, subject=subject) is None and self.corpus_store is not None:
+            record = self.corpus_store.metadata(filename)
+            if record is not None:
+                self._add_corpus_entry(record)
+    
+    def random_article(self, type: str = "article", subject: Optional[str] = None) -> Optional[str]:
+        """
+        Pick a uniformly random file from the catalog in O(1)
+        
+        Args:
+            type: "article" (PDFs and abstracts), "pdf", "abstract", "text" or None for any
+            subject: Only files with this subject
+            
+        Returns:
+            Filename, or None if nothing matches
+        """
+        if not self.catalog.built:
+            self.catalog.build()
+        entry = self.catalog.random(type=type, subject=subject)
+        return entry.name if entry else None
+    
+    def list_files_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        type: Optional[str] = None,
+        subject: Optional[str] = None,
+    ) -> Tuple[List[str], int]:
+        """
+        List a page of files from the catalog in sorted order
+        
+        Args:
+            offset: Number of matching files to skip
+            limit: Maximum number of files to return (None for all)
+            type: Optional type filter ("article", "pdf", "abstract", "text")
+            subject: Optional subject filter
+            
+        Returns:
+            Tuple of (filenames, total_matching)
+        """
+        if not self.catalog.built:
+            self.catalog.build()
+        return self.catalog.page(offset=offset, limit=limit, type=type, subject=subject)
+    
+    def content_hash(self, filename: str) -> str:
+        """
+        SHA-256 of a file's contents, recomputed only when its catalog version
+        changes. Unlike the version stamp it is the same on every host.
+        
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        if ".." in filename or "/" in filename or "\\" in filename:
+            raise ValueError("Invalid filename: path traversal not allowed")
+        entry = self.catalog.get(filename)
+        cached = self._hashes.get(filename)
+        if entry is not None and cached is not None and cached[0] == entry.version:
+            return cached[1]
+        
+        digest = hashlib.sha256()
+        file_path = self.data_dir / filename
+        if file_path.is_file():
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        elif self.corpus_store is not None and self.corpus_store.has(filename):
+            digest.update(self.corpus_store.read_text(filename).encode("utf-8"))
+        else:
+            raise FileNotFoundError(f"File '{filename}' not found in data directory")
+        
+        if entry is not None:
+            self._hashes[filename] = (entry.version, digest.hexdigest())
+        return digest.hexdigest()
     
     def read_file(self, filename: str) -> str:
         """
@@ -72,6 +232,9 @@ class FileReaderService:
         file_path = self.data_dir / filename
         
         if not file_path.exists():
+            # Abstracts may live in the packed corpus store instead of the directory
+            if self.corpus_store is not None and self.corpus_store.has(filename):
+                return self.corpus_store.read_text(filename).strip()
             raise FileNotFoundError(f"File '{filename}' not found in data directory")
         
         if not file_path.is_file():
@@ -102,44 +265,86 @@ class FileReaderService:
         Returns:
             Extracted text as a string
         """
+        return self._extract_pdf_text(file_path)[0]
+    
+    def _extract_pdf_text(self, file_path: Path, deadline: Optional[float] = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Extract (and normalize, if enabled) the text of a PDF file
+        
+        Args:
+            file_path: Path to the PDF file
+            deadline: Wall-clock time to give up by (checked between pages)
+            
+        Returns:
+            Tuple of (text, normalization stats or None if normalization is off)
+        """
         if not PDFPLUMBER_AVAILABLE:
             raise ImportError(
                 "pdfplumber is not installed. Please install it with: pip install pdfplumber"
             )
         
-        text_parts = []
+        pages = []
         try:
             with pdfplumber.open(file_path) as pdf:
                 for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
+                    check_deadline(deadline)
+                    pages.append(page.extract_text() or "")
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise ValueError(f"Error reading PDF: {str(e)}")
         
-        return "\n\n".join(text_parts).strip()
+        stats = None
+        if self.normalize:
+            pages, stats = normalize_pages(pages)
+        return "\n\n".join(p for p in pages if p).strip(), stats
     
-    def extract_pdf_images(self, filename: str) -> List[Dict[str, str]]:
+    def read_pdf_pages(
+        self,
+        file_path: str,
+        start: int,
+        stop: int,
+        deadline: Optional[float] = None,
+    ) -> Tuple[List[str], int]:
         """
-        Extract images and graphs from a PDF file
-        
+        Extract the text of a range of pages of a PDF at any path
+
+        Used to extract uploads in page batches, so summarization can begin
+        before the whole document has been read.
+
         Args:
-            filename: Name of the PDF file (must be in data directory)
-            
+            file_path: Path to the PDF file
+            start: First page (0-based)
+            stop: Page after the last one to extract
+            deadline: Wall-clock time to give up by (checked between pages)
+
         Returns:
-            List of dictionaries containing base64-encoded images and metadata
-            Each dict has: {'data': base64_string, 'format': 'png/jpeg', 'page': page_number}
+            Tuple of (text of each page in the range, total page count)
         """
-        if not FITZ_AVAILABLE:
+        if not PDFPLUMBER_AVAILABLE:
             raise ImportError(
-                "PyMuPDF (fitz) is not installed. Please install it with: pip install PyMuPDF"
+                "pdfplumber is not installed. Please install it with: pip install pdfplumber"
             )
         
-        if not PIL_AVAILABLE:
-            raise ImportError(
-                "Pillow (PIL) is not installed. Please install it with: pip install Pillow"
-            )
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                texts = []
+                for page in pdf.pages[start:stop]:
+                    check_deadline(deadline)
+                    texts.append(page.extract_text() or "")
+                page_count = len(pdf.pages)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error reading PDF: {str(e)}")
         
+        if self.normalize:
+            # Headers and footers are detected within the batch
+            texts, _ = normalize_pages(texts)
+        return texts, page_count
+    
+    def _resolve_pdf_path(self, filename: str) -> Path:
+        """Validate a PDF filename and return its path in the data directory"""
         # Security: Ensure filename doesn't contain path traversal
         if ".." in filename or "/" in filename or "\\" in filename:
             raise ValueError("Invalid filename: path traversal not allowed")
@@ -152,61 +357,167 @@ class FileReaderService:
         if file_path.suffix.lower() != ".pdf":
             raise ValueError(f"'{filename}' is not a PDF file")
         
-        images = []
+        return file_path
+    
+    def _extract_raw_pdf_images(self, filename: str, deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Extract the raw embedded images of a PDF, one entry per unique xref
+        
+        Args:
+            filename: Name of the PDF file (must be in data directory)
+            deadline: Wall-clock time to give up by (checked between pages)
+            
+        Returns:
+            List of dicts with 'xref', 'page', 'index', 'image' (bytes), 'ext',
+            'width', 'height' and 'occurrences' (how many times the xref appears)
+        """
+        if not FITZ_AVAILABLE:
+            raise ImportError(
+                "PyMuPDF (fitz) is not installed. Please install it with: pip install PyMuPDF"
+            )
+        
+        file_path = self._resolve_pdf_path(filename)
+        
+        raw_images = []
+        by_xref = {}
         pdf_document = None
         try:
             pdf_document = fitz.open(str(file_path))
             
             for page_num in range(len(pdf_document)):
+                check_deadline(deadline)
                 page = pdf_document[page_num]
                 
                 # Extract images from the page
                 image_list = page.get_images(full=True)
                 
                 for img_index, img in enumerate(image_list):
+                    xref = img[0]
+                    # The same xref (e.g. a logo) is often repeated on every page:
+                    # extract it once and just count the repeats
+                    if xref in by_xref:
+                        by_xref[xref]["occurrences"] += 1
+                        continue
                     try:
-                        # Get image data
-                        xref = img[0]
                         base_image = pdf_document.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-                        
-                        # Convert to PIL Image for processing
-                        pil_image = Image.open(BytesIO(image_bytes))
-                        
-                        # Convert to PNG format for consistency (if not already)
-                        if image_ext.lower() not in ["png", "jpg", "jpeg"]:
-                            # Convert to PNG
-                            output = BytesIO()
-                            pil_image.save(output, format="PNG")
-                            image_bytes = output.getvalue()
-                            image_ext = "png"
-                        
-                        # Encode to base64
-                        base64_data = base64.b64encode(image_bytes).decode("utf-8")
-                        
-                        # Create data URI
-                        mime_type = f"image/{image_ext.lower()}" if image_ext.lower() != "jpg" else "image/jpeg"
-                        data_uri = f"data:{mime_type};base64,{base64_data}"
-                        
-                        images.append({
-                            "data": data_uri,
-                            "format": image_ext.lower(),
-                            "page": page_num + 1,  # 1-indexed page numbers
-                            "index": img_index
-                        })
-                    except Exception as e:
+                    except Exception:
                         # Skip images that can't be extracted
                         continue
+                    entry = {
+                        "xref": xref,
+                        "page": page_num + 1,  # 1-indexed page numbers
+                        "index": img_index,
+                        "image": base_image["image"],
+                        "ext": base_image["ext"],
+                        "width": base_image.get("width", 0),
+                        "height": base_image.get("height", 0),
+                        "occurrences": 1,
+                    }
+                    by_xref[xref] = entry
+                    raw_images.append(entry)
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise ValueError(f"Error extracting images from PDF: {str(e)}")
         finally:
             if pdf_document:
                 pdf_document.close()
         
+        return raw_images
+    
+    def process_pdf_images(self, filename: str, deadline: Optional[float] = None) -> Tuple[List[Dict], Dict[str, int]]:
+        """
+        Extract images from a PDF, drop tiny and duplicate ones and
+        generate downscaled thumbnails
+        
+        Args:
+            filename: Name of the PDF file (must be in data directory)
+            deadline: Wall-clock time to give up by
+            
+        Returns:
+            Tuple of (images, stats) where stats reports images dropped and
+            bytes saved compared to sending every image at full resolution
+        """
+        if not PIL_AVAILABLE:
+            raise ImportError(
+                "Pillow (PIL) is not installed. Please install it with: pip install Pillow"
+            )
+        
+        raw_images = self._extract_raw_pdf_images(filename, deadline)
+        check_deadline(deadline)
+        return self.image_processor.process(raw_images)
+    
+    def extract_pdf_images(self, filename: str) -> List[Dict[str, str]]:
+        """
+        Extract images and graphs from a PDF file as thumbnails
+        
+        Args:
+            filename: Name of the PDF file (must be in data directory)
+            
+        Returns:
+            List of dictionaries containing base64-encoded thumbnails and metadata
+            Each dict has: {'data': base64_string, 'format': 'webp/jpeg', 'page': page_number,
+            'index': index_on_page, 'xref': pdf_xref, 'width': full_width, 'height': full_height}
+        """
+        images, _ = self.process_pdf_images(filename)
         return images
     
+    def get_pdf_image(self, filename: str, xref: int) -> Tuple[bytes, str]:
+        """
+        Get a single embedded PDF image at full resolution
+        
+        Args:
+            filename: Name of the PDF file (must be in data directory)
+            xref: PDF cross-reference number of the image
+            
+        Returns:
+            Tuple of (image_bytes, mime_type)
+            
+        Raises:
+            FileNotFoundError: If the file or image doesn't exist
+        """
+        if not FITZ_AVAILABLE:
+            raise ImportError(
+                "PyMuPDF (fitz) is not installed. Please install it with: pip install PyMuPDF"
+            )
+        
+        file_path = self._resolve_pdf_path(filename)
+        
+        pdf_document = None
+        try:
+            pdf_document = fitz.open(str(file_path))
+            if xref <= 0 or xref >= pdf_document.xref_length():
+                raise FileNotFoundError(f"Image {xref} not found in '{filename}'")
+            base_image = pdf_document.extract_image(xref)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error extracting image from PDF: {str(e)}")
+        finally:
+            if pdf_document:
+                pdf_document.close()
+        
+        if not base_image:
+            raise FileNotFoundError(f"Image {xref} not found in '{filename}'")
+        
+        image_bytes = base_image["image"]
+        image_ext = base_image["ext"].lower()
+        
+        # Convert to PNG format for browser compatibility (if not already)
+        if image_ext not in ["png", "jpg", "jpeg"]:
+            if not PIL_AVAILABLE:
+                raise ImportError(
+                    "Pillow (PIL) is not installed. Please install it with: pip install Pillow"
+                )
+            output = BytesIO()
+            Image.open(BytesIO(image_bytes)).save(output, format="PNG")
+            image_bytes = output.getvalue()
+            image_ext = "png"
+        
+        mime_type = "image/jpeg" if image_ext in ("jpg", "jpeg") else f"image/{image_ext}"
+        return image_bytes, mime_type
+    
     def read_pdf_with_images(self, filename: str) -> Tuple[str, List[Dict[str, str]]]:
         """
         Read a PDF file and extract both text and images
@@ -221,6 +532,35 @@ class FileReaderService:
         images = self.extract_pdf_images(filename)
         return text, images
     
+    def extract_pdf(self, filename: str, with_images: bool = True, deadline: Optional[float] = None) -> Dict:
+        """
+        Read a PDF's text, parse its structure and (optionally) process its
+        images in one call. This is the unit of CPU-heavy work submitted to the
+        process pool, so the whole parse happens in a single worker.
+        
+        Args:
+            filename: Name of the PDF file (must be in data directory)
+            with_images: Also extract and process images
+            deadline: Wall-clock time (time.time()) of the request's deadline.
+                      Checked between pages, so a request that runs out of
+                      time stops tying up a worker process.
+            
+        Returns:
+            Dict with 'text', 'text_stats' (normalization stats, see
+            text_normalizer.normalize_pages), 'structure' (see
+            paper_structure.parse_paper), 'images' and 'image_stats' (None when
+            with_images is False)
+        """
+        text, text_stats = self._extract_pdf_text(self._resolve_pdf_path(filename), deadline)
+        images, image_stats = self.process_pdf_images(filename, deadline) if with_images else (None, None)
+        return {
+            "text": text,
+            "text_stats": text_stats,
+            "structure": parse_paper(text),
+            "images": images,
+            "image_stats": image_stats,
+        }
+    
     def list_files(self) -> List[str]:
         """
         List all text and PDF files in the data directory
@@ -228,14 +568,16 @@ class FileReaderService:
         Returns:
             List of filenames
         """
-        supported_extensions = {".txt", ".md", ".text", ".pdf"}
+        if self.catalog.built:
+            return self.catalog.names()
+        
         files = []
         
         if not self.data_dir.exists():
             return files
         
         for file_path in self.data_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
+            if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS:
                 files.append(file_path.name)
         
         return sorted(files)
@@ -0,0 +1,290 @@
+"""
+HTTP Cache for scraped pages
+Backed by SQLite so list and abstract pages survive restarts; stale entries
+are revalidated with conditional GETs instead of downloaded again
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.shared_state import LocalState, SharedState
+
+# (URL regex, seconds an entry is served without revalidation); first match wins
+DEFAULT_TTLS: List[Tuple[str, float]] = [
+    (r"/abs/", 7 * 86400),  # abstract pages only change with a new version
+    (r"/list/[^/]+/recent", 3600),  # the recent listing changes daily
+    (r"/list/", 86400),
+]
+
+
+def parse_ttls(spec: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    TTL rules from a spec like "/abs/=604800,/list/.*/recent=3600"
+
+    Returns:
+        (pattern, seconds) pairs, or an empty list if spec is empty
+    """
+    rules = []
+    for part in (spec or "").split(","):
+        pattern, sep, seconds = part.strip().rpartition("=")
+        if sep and pattern:
+            rules.append((pattern, float(seconds)))
+    return rules
+
+
+class CachedResponse:
+    """A 200 response served from the cache, with the parts of a requests/httpx response the scraper uses"""
+
+    def __init__(self, url: str, content: bytes, content_type: Optional[str], source: str):
+        self.url = url
+        self.status_code = 200
+        self.content = content
+        self.headers = {"content-type": content_type} if content_type else {}
+        self.from_cache = source  # 'fresh' (within TTL) or 'revalidated' (304)
+
+    @property
+    def text(self) -> str:
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""))
+        try:
+            return self.content.decode(match.group(1) if match else "utf-8", errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+
+class HttpCache:
+    """
+    Persistent cache of GET responses, keyed by URL. Each entry keeps the
+    body (zlib-compressed) and its validators (ETag, Last-Modified). Entries
+    younger than their URL's TTL are served without a request; older ones
+    are revalidated with If-None-Match / If-Modified-Since, and a 304 serves
+    the stored body. The total body size is bounded, evicting the least
+    recently used entries first.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: Optional[List[Tuple[str, float]]] = None,
+        default_ttl: float = 3600,
+        state: Optional[SharedState] = None,
+    ):
+        """
+        Initialize HTTP cache
+
+        Args:
+            db_path: Path of the SQLite database. Defaults to backend/cache/http.sqlite3
+            max_bytes: Bound on the stored (compressed) body size
+            ttls: (URL regex, seconds) rules, first match wins. Defaults to DEFAULT_TTLS
+            default_ttl: Seconds for URLs no rule matches
+            state: Where hit/miss counters are kept, so hit rates cover every
+                   worker sharing it. Defaults to per-process counters.
+        """
+        if db_path is None:
+            backend_dir = Path(__file__).parent.parent
+            db_path = str(backend_dir / "cache" / "http.sqlite3")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self.default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        # Running total of stored body sizes, so puts needn't sum the table
+        self._total_size = self._stored_size()
+        self.state = state if state is not None else LocalState()
+
+    def ttl_for(self, url: str) -> float:
+        """Seconds a response for this URL is served without revalidation"""
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry of a URL and mark it as recently used
+
+        Returns:
+            Dict with 'url', 'raw_size', 'content_type', 'etag', 'last_modified',
+            'stored_at' and 'fresh' (within its TTL), or None. The body is
+            read only when the entry is served (see respond)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, raw_size, content_type, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        entry = dict(row)
+        entry["fresh"] = time.time() - entry["stored_at"] < self.ttl_for(url)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers revalidating an entry"""
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def respond(self, entry: Dict[str, Any], source: str) -> Optional[CachedResponse]:
+        """Serve an entry's body (source 'fresh' or 'revalidated'), counting the bytes not downloaded"""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE url = ?", (entry["url"],)).fetchone()
+        if row is None:
+            return None  # evicted since lookup
+        self.state.incr("http_cache.hits")
+        self.state.incr(f"http_cache.{source}")
+        self.state.incr("http_cache.bytes_saved", entry["raw_size"])
+        return CachedResponse(entry["url"], zlib.decompress(row["body"]), entry["content_type"], source)
+
+    def update(self, url: str, entry: Optional[Dict[str, Any]], status: int, headers, body: bytes) -> Optional[CachedResponse]:
+        """
+        Record the response to a (possibly conditional) GET
+
+        A 304 for a cached entry restarts its TTL and returns it as a
+        CachedResponse. A cacheable 200 is stored. Anything else counts as a
+        miss and returns None, so the caller uses the response it got.
+        """
+        if status == 304 and entry is not None:
+            with self._lock:
+                self._conn.execute(
+                    """
+                    UPDATE responses SET stored_at = ?,
+                        etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                    WHERE url = ?
+                    """,
+                    (time.time(), headers.get("etag"), headers.get("last-modified"), url),
+                )
+                self._conn.commit()
+            cached = self.respond(entry, "revalidated")
+            if cached is not None:
+                return cached
+        self.state.incr("http_cache.misses")
+        if status == 200 and "no-store" not in (headers.get("cache-control") or ""):
+            self.put(url, body, headers.get("content-type"), headers.get("etag"), headers.get("last-modified"))
+        return None
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        content_type: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Insert or replace a response, then evict least recently used entries over max_bytes"""
+        compressed = zlib.compress(body, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (url, body, size, raw_size, content_type, etag, last_modified, stored_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, compressed, len(compressed), len(body), content_type, etag, last_modified, now, now),
+            )
+            self._total_size += len(compressed) - (replaced["size"] if replaced is not None else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _stored_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        # Caller holds the lock. Drops down to 90% of max_bytes so every put doesn't evict
+        if self._total_size <= self.max_bytes:
+            return
+        # Other processes sharing the database change it too: recount before evicting
+        self._total_size = self._stored_size()
+        if self._total_size <= self.max_bytes:
+            return
+        target = self._total_size - int(self.max_bytes * 0.9)
+        evicted = []
+        for row in self._conn.execute("SELECT url, size FROM responses ORDER BY last_used"):
+            if target <= 0:
+                break
+            evicted.append((row["url"],))
+            target -= row["size"]
+            self._total_size -= row["size"]
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        self.state.incr("http_cache.evictions", len(evicted))
+
+    def get(self, url: str, fetch: Callable[[Dict[str, str]], Any]):
+        """
+        GET through the cache with a blocking fetch(headers) -> response
+        (e.g. a requests session call). Returns a CachedResponse or the
+        fetched response.
+        """
+        entry = self.lookup(url)
+        if entry is not None and entry["fresh"]:
+            cached = self.respond(entry, "fresh")
+            if cached is not None:
+                return cached
+        response = fetch(self.conditional_headers(entry))
+        return self.update(url, entry, response.status_code, response.headers, response.content) or response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM responses").fetchone()
+        counters = self.state.counters("http_cache.")
+        hits = counters.get("http_cache.hits", 0)
+        misses = counters.get("http_cache.misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": row[0],
+            "size_bytes": row[1],
+            "raw_size_bytes": row[2],
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "fresh_hits": counters.get("http_cache.fresh", 0),
+            "revalidated": counters.get("http_cache.revalidated", 0),
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "bytes_saved": counters.get("http_cache.bytes_saved", 0),
+            "evictions": counters.get("http_cache.evictions", 0),
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,268 @@
+"""
+Image Processor Service for filtering, deduplicating and thumbnailing
+images extracted from PDFs
+"""
+
+import base64
+import hashlib
+from io import BytesIO
+from typing import Any, List, Dict, Optional, Sequence, Tuple
+
+from services.lazy_import import LazyModule, is_available
+
+# Pillow is imported on first use, not at startup
+Image = LazyModule("PIL.Image")
+features = LazyModule("PIL.features")
+PIL_AVAILABLE = is_available(Image)
+
+
+class ImageProcessorService:
+    """
+    Turns the raw images pulled out of a PDF into a small set of
+    client-friendly thumbnails.
+
+    Pipeline:
+    1. Drop images below a minimum width/height (logos, icons, bullets)
+    2. Drop duplicates by xref, exact content hash and perceptual hash
+    3. Encode downscaled WebP (or JPEG) thumbnails at the configured widths
+    """
+
+    def __init__(
+        self,
+        min_width: int = 100,
+        min_height: int = 100,
+        thumbnail_widths: Sequence[int] = (480,),
+        thumbnail_format: str = "webp",
+        quality: int = 75,
+        hash_distance: int = 4,
+    ):
+        """
+        Initialize image processor
+
+        Args:
+            min_width: Images narrower than this (in pixels) are dropped
+            min_height: Images shorter than this (in pixels) are dropped
+            thumbnail_widths: Target widths for thumbnails. The first width is
+                              the primary thumbnail returned in ``data``.
+            thumbnail_format: "webp" or "jpeg". Falls back to JPEG if the
+                              installed Pillow has no WebP support.
+            quality: Encoder quality (1-100)
+            hash_distance: Maximum Hamming distance between perceptual hashes
+                           for two images to be considered the same figure
+        """
+        self.min_width = min_width
+        self.min_height = min_height
+        # Deduplicate while keeping the caller's order (first width is primary)
+        self.thumbnail_widths = list(dict.fromkeys(int(w) for w in thumbnail_widths if int(w) > 0)) or [480]
+        self.thumbnail_format = thumbnail_format.lower()
+        self.quality = quality
+        self.hash_distance = hash_distance
+
+    def settings(self) -> Dict[str, Any]:
+        """Every setting that changes which images are kept or how thumbnails are encoded"""
+        return {
+            "min_width": self.min_width,
+            "min_height": self.min_height,
+            "thumbnail_widths": self.thumbnail_widths,
+            "thumbnail_format": self._output_format(),
+            "quality": self.quality,
+            "hash_distance": self.hash_distance,
+        }
+
+    def _output_format(self) -> str:
+        """Resolve the thumbnail format supported by the installed Pillow"""
+        if self.thumbnail_format == "webp" and PIL_AVAILABLE and features.check("webp"):
+            return "webp"
+        return "jpeg"
+
+    def is_too_small(self, width: int, height: int) -> bool:
+        """Check whether an image falls below the configured size threshold"""
+        return width < self.min_width or height < self.min_height
+
+    @staticmethod
+    def content_hash(image_bytes: bytes) -> str:
+        """Exact content hash of the encoded image bytes"""
+        return hashlib.sha1(image_bytes).hexdigest()
+
+    @staticmethod
+    def perceptual_hash(pil_image) -> int:
+        """
+        Compute a 64-bit difference hash (dHash) of an image.
+        Re-encoded or slightly rescaled copies of the same figure hash close together.
+        """
+        small = pil_image.convert("L").resize((9, 8))
+        pixels = list(small.getdata())
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                value = (value << 1) | (1 if left > right else 0)
+        return value
+
+    def _is_perceptual_duplicate(self, phash: int, seen: List[int]) -> bool:
+        for other in seen:
+            if bin(phash ^ other).count("1") <= self.hash_distance:
+                return True
+        return False
+
+    def make_thumbnail(self, pil_image, width: int) -> Tuple[bytes, int, int, str]:
+        """
+        Encode a downscaled copy of an image
+
+        Args:
+            pil_image: Source PIL image
+            width: Target width; images are never upscaled
+
+        Returns:
+            Tuple of (encoded_bytes, width, height, format)
+        """
+        fmt = self._output_format()
+        image = pil_image
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        if fmt == "jpeg" and image.mode == "RGBA":
+            # JPEG has no alpha channel: flatten onto white
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+
+        output = BytesIO()
+        image.save(output, format=fmt.upper(), quality=self.quality)
+        return output.getvalue(), image.width, image.height, fmt
+
+    @staticmethod
+    def to_data_uri(image_bytes: bytes, fmt: str) -> str:
+        """Encode image bytes as a base64 data URI"""
+        mime_type = "image/jpeg" if fmt in ("jpg", "jpeg") else f"image/{fmt}"
+        return f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+
+    def process(self, raw_images: List[Dict]) -> Tuple[List[Dict], Dict[str, int]]:
+        """
+        Filter, dedupe and thumbnail raw PDF images
+
+        Args:
+            raw_images: List of dicts with keys 'xref', 'page', 'index',
+                        'image' (raw bytes), 'ext', 'width' and 'height'.
+                        Repeated xrefs may already have been collapsed by the
+                        caller, in which case 'occurrences' counts them.
+
+        Returns:
+            Tuple of (images, stats). Each image dict has 'data' (primary
+            thumbnail data URI), 'format', 'page', 'index', 'xref', 'width',
+            'height' and, when more than one width is configured,
+            'thumbnails' with the other sizes.
+        """
+        if not PIL_AVAILABLE:
+            raise ImportError(
+                "Pillow (PIL) is not installed. Please install it with: pip install Pillow"
+            )
+
+        stats = {
+            "images_found": 0,
+            "dropped_small": 0,
+            "dropped_duplicate": 0,
+            "skipped_errors": 0,
+            "images_returned": 0,
+            "original_bytes": 0,
+            "returned_bytes": 0,
+            "bytes_saved": 0,
+        }
+
+        seen_xrefs = set()
+        seen_hashes = set()
+        seen_phashes: List[int] = []
+        images = []
+
+        for raw in raw_images:
+            occurrences = raw.get("occurrences", 1)
+            image_bytes = raw["image"]
+            stats["images_found"] += occurrences
+            stats["original_bytes"] += len(image_bytes) * occurrences
+            # Every occurrence after the first is a duplicate of the same xref
+            stats["dropped_duplicate"] += occurrences - 1
+
+            xref = raw.get("xref")
+            if xref is not None:
+                if xref in seen_xrefs:
+                    stats["dropped_duplicate"] += 1
+                    continue
+                seen_xrefs.add(xref)
+
+            if self.is_too_small(raw.get("width", 0), raw.get("height", 0)):
+                stats["dropped_small"] += 1
+                continue
+
+            digest = self.content_hash(image_bytes)
+            if digest in seen_hashes:
+                stats["dropped_duplicate"] += 1
+                continue
+
+            try:
+                pil_image = Image.open(BytesIO(image_bytes))
+                pil_image.load()
+            except Exception:
+                # Skip images Pillow can't decode, but count them so they don't vanish from the stats
+                stats["skipped_errors"] += 1
+                continue
+
+            phash = self.perceptual_hash(pil_image)
+            if self._is_perceptual_duplicate(phash, seen_phashes):
+                stats["dropped_duplicate"] += 1
+                continue
+            seen_hashes.add(digest)
+            seen_phashes.append(phash)
+
+            variants = []
+            for width in self.thumbnail_widths:
+                thumb_bytes, thumb_w, thumb_h, fmt = self.make_thumbnail(pil_image, width)
+                stats["returned_bytes"] += len(thumb_bytes)
+                variants.append({
+                    "data": self.to_data_uri(thumb_bytes, fmt),
+                    "format": fmt,
+                    "width": thumb_w,
+                    "height": thumb_h,
+                })
+
+            primary = variants[0]
+            image_info = {
+                "data": primary["data"],
+                "format": primary["format"],
+                "page": raw["page"],
+                "index": raw["index"],
+                "xref": xref,
+                "width": pil_image.width,
+                "height": pil_image.height,
+            }
+            if len(variants) > 1:
+                image_info["thumbnails"] = variants[1:]
+            images.append(image_info)
+
+        stats["images_returned"] = len(images)
+        stats["bytes_saved"] = max(0, stats["original_bytes"] - stats["returned_bytes"])
+        return images, stats
+
+
+def parse_widths(value: Optional[str], default: Sequence[int] = (480,)) -> List[int]:
+    """
+    Parse a comma-separated list of thumbnail widths (e.g. from an env var)
+
+    Args:
+        value: String such as "320,640"
+        default: Widths to use if value is empty or invalid
+
+    Returns:
+        List of positive integer widths
+    """
+    if not value:
+        return list(default)
+    widths = []
+    for part in value.split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) > 0:
+            widths.append(int(part))
+    return widths or list(default)
@@ -0,0 +1,339 @@
+"""
+Scheduled arXiv ingestion
+Crawls a configured set of subjects on a cron-like schedule, sharing one
+paper budget per run across them, and hands each saved abstract on (e.g. to
+the pre-summarizer). Runs in the backend process or in scripts/ingest.py.
+"""
+
+import os
+import time
+import random
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("uvicorn")
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    """One cron field ('*', '5', '1-5', '*/15', '1-30/2', or a comma list of these)"""
+    values = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(v) for v in spec.split("-", 1))
+        else:
+            start = end = int(spec)
+        step_n = int(step) if step else 1
+        if step and spec != "*" and "-" not in spec:
+            end = high  # '5/15' means from 5 to the end, every 15
+        if start < low or end > high or start > end or step_n < 1:
+            raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step_n))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week),
+    in local time, or one of @hourly, @daily, @weekly, @monthly. As in cron,
+    when both day fields are restricted a day matching either one counts.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip()
+        fields = ALIASES.get(self.spec, self.spec).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {spec!r}")
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = frozenset(d % 7 for d in _parse_field(fields[4], 0, 7))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        day = t.day in self.days
+        weekday = (t.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, ts: float) -> float:
+        """Timestamp of the first matching minute after ts"""
+        t = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f"Cron expression never matches: {self.spec!r}")
+
+    def last_at_or_before(self, ts: float) -> float:
+        """Timestamp of the last matching minute at or before ts"""
+        t = datetime.fromtimestamp(ts).replace(second=0, microsecond=0)
+        limit = t - timedelta(days=366 * 5)
+        while t > limit:
+            if t.month not in self.months:
+                t = t.replace(day=1, hour=0, minute=0) - timedelta(minutes=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) - timedelta(minutes=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) - timedelta(minutes=1)
+            elif t.minute not in self.minutes:
+                t -= timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f"Cron expression never matches: {self.spec!r}")
+
+
+class IngestScheduler:
+    """
+    Background task that crawls each subject at every scheduled time.
+
+    - Each run starts a random 0..jitter seconds after its scheduled time, so
+      several deployments don't all hit arXiv on the minute
+    - budget caps the papers saved per run across all subjects; a subject
+      gets an even share of what is left and whatever it doesn't use rolls
+      over to the next one. The order rotates each run so no subject is
+      always last
+    - With a shared state, a lease per scheduled time makes sure only one
+      worker (or the separate entry point) runs it. The run on start catches
+      up the latest scheduled time under that time's lease, so workers
+      starting together (or restarting soon after a run) crawl it once;
+      triggered runs share one lease while they are in progress
+    """
+
+    def __init__(
+        self,
+        crawl: Callable[[str, int], Awaitable[List[Dict]]],
+        subjects: Sequence[str],
+        schedule: str = "0 */6 * * *",
+        jitter: float = 300.0,
+        budget: int = 200,
+        on_saved: Optional[Callable[[Dict], None]] = None,
+        state: Optional[Any] = None,
+        run_io: Optional[Callable[..., Awaitable[Any]]] = None,
+        run_on_start: bool = False,
+    ):
+        """
+        Initialize ingestion scheduler
+
+        Args:
+            crawl: Coroutine function (subject, max_papers) -> list of saved
+                   items (dicts with 'id' and 'filename')
+            subjects: arXiv categories crawled each run
+            schedule: Cron expression for run times (see CronSchedule)
+            jitter: Most seconds a run is delayed past its scheduled time
+            budget: Most papers saved per run, across all subjects
+            on_saved: Optional non-blocking callback for each saved item (e.g. queue it
+                      for pre-summarization)
+            state: Optional SharedState used to run each scheduled time only once across workers
+            run_io: Coroutine function used to call the shared state (required with state)
+            run_on_start: Also run the latest scheduled time right after start, unless
+                          another worker already did, instead of waiting for the next one
+        """
+        self.crawl = crawl
+        self.subjects = [s for s in subjects if s]
+        self.schedule = CronSchedule(schedule)
+        self.jitter = max(0.0, jitter)
+        self.budget = max(1, budget)
+        self.on_saved = on_saved
+        self.state = state
+        self.run_io = run_io
+        self.run_on_start = run_on_start
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._rotation = 0
+
+        self.running = False
+        self.next_run_at: Optional[float] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.last_success_at: Optional[float] = None
+        self.runs = 0
+        self.failed_runs = 0
+        self.skipped_runs = 0
+        self.saved = 0
+        self.crawl_seconds = 0.0
+
+    def start(self):
+        """Start the scheduling loop (call from the app lifespan)"""
+        if self._task is not None or not self.subjects:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Cancel the scheduling loop, interrupting a run in progress"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def trigger(self) -> bool:
+        """Run now instead of at the next scheduled time; False if not started or already running"""
+        if self._wake is None or self.running:
+            return False
+        self._wake.set()
+        return True
+
+    async def _loop(self):
+        if self.run_on_start:
+            await self._run_logged(self.schedule.last_at_or_before(time.time()))
+        while True:
+            scheduled = self.schedule.next_after(time.time())
+            start_at = scheduled + random.uniform(0, self.jitter)
+            self.next_run_at = start_at
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, start_at - time.time()))
+                # Triggered: run now, outside the schedule
+                scheduled = None
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self.next_run_at = None
+            await self._run_logged(scheduled)
+
+    async def _run_logged(self, scheduled: Optional[float]):
+        try:
+            await self.run_once(scheduled)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Ingestion run failed: {e}")
+
+    async def _claim(self, key: str, ttl: float) -> bool:
+        """Lease a run so no other worker runs it too"""
+        if self.state is None:
+            return True
+        return await self.run_io(self.state.acquire, key, self.owner, ttl)
+
+    async def run_once(self, scheduled: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Crawl every subject once within the budget
+
+        Args:
+            scheduled: Scheduled time this run is for, or None for a run
+                       outside the schedule (triggered or --once)
+
+        Returns:
+            Summary of the run (also kept as last_run), or None if another
+            worker already took this scheduled time or is doing a run
+            outside the schedule
+        """
+        if scheduled is not None:
+            key = f"ingest:run:{int(scheduled)}"
+            # Held for a day: long enough to outlast the run and any worker that wakes up late
+            claimed = await self._claim(key, 86400.0)
+        else:
+            # Released when the run ends; the ttl only matters if this worker dies mid-run
+            key = "ingest:run:triggered"
+            claimed = await self._claim(key, 3600.0)
+        if not claimed:
+            self.skipped_runs += 1
+            return None
+        try:
+            return await self._crawl_subjects(scheduled if scheduled is not None else time.time())
+        finally:
+            if scheduled is None and self.state is not None:
+                await self.run_io(self.state.release, key, self.owner)
+
+    async def _crawl_subjects(self, scheduled: float) -> Dict[str, Any]:
+        self.running = True
+        started = time.time()
+        subjects = self.subjects[self._rotation:] + self.subjects[:self._rotation]
+        self._rotation = (self._rotation + 1) % len(self.subjects)
+        remaining = self.budget
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            for i, subject in enumerate(subjects):
+                share = -(-remaining // (len(subjects) - i))  # ceil: leftovers go to later subjects
+                if share <= 0:
+                    results[subject] = {"saved": 0, "skipped": "budget"}
+                    continue
+                subject_started = time.perf_counter()
+                try:
+                    items = await self.crawl(subject, share)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Ingestion of {subject} failed: {e}")
+                    results[subject] = {"saved": 0, "error": str(e)}
+                    continue
+                for item in items:
+                    if self.on_saved is not None:
+                        self.on_saved(item)
+                remaining -= len(items)
+                results[subject] = {
+                    "saved": len(items),
+                    "seconds": round(time.perf_counter() - subject_started, 3),
+                }
+        finally:
+            self.running = False
+
+        finished = time.time()
+        saved = sum(r["saved"] for r in results.values())
+        errors = sum(1 for r in results.values() if "error" in r)
+        self.runs += 1
+        self.saved += saved
+        self.crawl_seconds += finished - started
+        if errors == len(subjects):
+            self.failed_runs += 1
+        else:
+            self.last_success_at = finished
+        self.last_run = {
+            "scheduled_at": scheduled,
+            "started_at": started,
+            "finished_at": finished,
+            "start_delay_seconds": round(started - scheduled, 3),
+            "duration_seconds": round(finished - started, 3),
+            "saved": saved,
+            "budget": self.budget,
+            "papers_per_second": round(saved / (finished - started), 3) if finished > started else None,
+            "subjects": results,
+        }
+        logger.info(f"Ingestion run saved {saved} paper(s) across {len(subjects)} subject(s)")
+        return self.last_run
+
+    def stats(self) -> Dict[str, Any]:
+        """Schedule, last run, lag (seconds since the last successful run) and throughput"""
+        return {
+            "running": self.running,
+            "started": self._task is not None,
+            "schedule": self.schedule.spec,
+            "subjects": self.subjects,
+            "budget": self.budget,
+            "jitter": self.jitter,
+            "next_run_at": self.next_run_at,
+            "last_run": self.last_run,
+            "last_success_at": self.last_success_at,
+            "lag_seconds": round(time.time() - self.last_success_at, 1) if self.last_success_at else None,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "skipped_runs": self.skipped_runs,
+            "saved": self.saved,
+            "papers_per_second": round(self.saved / self.crawl_seconds, 3) if self.crawl_seconds else None,
+        }
@@ -0,0 +1,81 @@
+"""
+Lazy imports for heavy optional dependencies
+Keeps PDF, imaging, HTTP and numeric libraries out of process startup
+"""
+
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Every public attribute belongs to the real module (np.load is numpy.load);
+    the wrapper's own members are underscored. is_available() only looks the
+    top-level package up (importlib.util.find_spec), so feature flags can be
+    computed at import time without loading anything:
+
+        pdfplumber = LazyModule("pdfplumber")
+        PDFPLUMBER_AVAILABLE = is_available(pdfplumber)
+        ...
+        with pdfplumber.open(path) as pdf:  # imported here, once
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize lazy module
+
+        Args:
+            name: Dotted module name, e.g. "PIL.Image" or "scipy.sparse"
+        """
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+        self.__dict__["_found"] = None
+
+    @property
+    def _available(self) -> bool:
+        """Whether the module's top-level package is installed, without importing it"""
+        if self._found is None:
+            # find_spec on a dotted name would import its parent packages (scipy, PIL);
+            # the submodule itself is only resolved on first use
+            try:
+                found = importlib.util.find_spec(self._name.partition(".")[0]) is not None
+            except (ImportError, ValueError):
+                found = False
+            self.__dict__["_found"] = found
+        return self._found
+
+    @property
+    def _loaded(self) -> bool:
+        """Whether the module has been imported yet"""
+        return self._module is not None
+
+    def _load(self) -> ModuleType:
+        """Import the module (once) and return it"""
+        module: Optional[ModuleType] = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self.__dict__["_module"] = importlib.import_module(self._name)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def is_available(module: LazyModule) -> bool:
+    """Whether a lazy module's package is installed, without importing it"""
+    return module._available
@@ -4,11 +4,17 @@ Supports Ollama (free, local) and Groq (fast, free tier)
 """
 
 import os
-import httpx
+import json
 import asyncio
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from enum import Enum
 
+from services import deadline
+from services.lazy_import import LazyModule
+
+# Imported on the first LLM request rather than at startup
+httpx = LazyModule("httpx")
+
 
 class APIProvider(str, Enum):
     """Supported API providers"""
@@ -22,6 +28,10 @@ class LLMService:
     Supports Ollama (local, free) and Groq (fast, free tier).
     """
     
+    # Bump whenever a prompt template changes, so cached summaries and ETags
+    # built from the old prompts are invalidated
+    PROMPT_VERSION = "1"
+    
     def __init__(self, model_name: str = "mistral", provider: str = "ollama"):
         """
         Initialize LLM service
@@ -141,44 +151,7 @@ class LLMService:
         # Summarize each chunk with rate limit handling
         chunk_summaries = []
         for i, chunk in enumerate(chunks):
-            try:
-                logger.info(f"Processing chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
-                
-                # Add delay between chunks for rate limit prevention
-                if i > 0 and self.provider == APIProvider.GROQ:
-                    # Groq free tier: 6000 tokens/min = 100 tokens/sec
-                    # Each chunk uses ~2000-3000 tokens, so need ~20-30 seconds between chunks
-                    delay = 15.0  # 15 second delay to stay under rate limit
-                    logger.info(f"Waiting {delay}s to avoid Groq rate limits (free tier: 6000 tokens/min)...")
-                    await asyncio.sleep(delay)
-                
-                # Retry logic for rate limits
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        if self.provider == APIProvider.OLLAMA:
-                            summary = await self._generate_with_ollama(chunk, topic)
-                        else:
-                            summary = await self._generate_with_api(chunk, topic)
-                        chunk_summaries.append(summary)
-                        logger.info(f"Chunk {i+1} completed")
-                        break  # Success, exit retry loop
-                    except Exception as e:
-                        error_str = str(e).lower()
-                        # Check if it's a rate limit error
-                        if "rate limit" in error_str or "429" in error_str:
-                            if attempt < max_retries - 1:
-                                wait_time = (attempt + 1) * 2  # Exponential backoff: 2s, 4s, 6s
-                                logger.warning(f"Rate limit hit on chunk {i+1}, retrying in {wait_time}s...")
-                                await asyncio.sleep(wait_time)
-                                continue
-                        # If not rate limit or out of retries, raise
-                        raise
-                        
-            except Exception as e:
-                logger.error(f"Chunk {i+1} failed after retries: {str(e)}")
-                # If a chunk fails, continue with others
-                chunk_summaries.append(f"[Chunk {i+1} summary unavailable: {str(e)}]")
+            chunk_summaries.append(await self._summarize_chunk(chunk, topic, i))
         
         # Combine all chunk summaries
         combined_summaries = "\n\n".join(chunk_summaries)
@@ -200,12 +173,260 @@ class LLMService:
                 else:
                     final_summary = await self._generate_with_api(combined_text, topic)
                 return final_summary
+            except deadline.DeadlineExceeded:
+                raise
             except Exception:
                 # If final summary fails, return combined summaries
                 return f"Summary of {len(chunks)} sections:\n\n{combined_summaries}"
         
         return combined_summaries
     
+    async def _summarize_chunk(self, chunk: str, topic: Optional[str], index: int) -> str:
+        """
+        Summarize one chunk of a long document, pacing and retrying on rate limits
+        
+        Args:
+            chunk: Chunk text
+            topic: Optional topic/subject tag
+            index: Position of the chunk (0-based), used for pacing and logs
+            
+        Returns:
+            Chunk summary, or a placeholder if the chunk failed after retries
+        """
+        import logging
+        logger = logging.getLogger("uvicorn")
+        
+        try:
+            # Nothing left of the request's budget: don't start another call
+            deadline.check()
+            logger.info(f"Processing chunk {index+1} ({len(chunk)} chars)...")
+            
+            # Add delay between chunks for rate limit prevention
+            if index > 0 and self.provider == APIProvider.GROQ:
+                # Groq free tier: 6000 tokens/min = 100 tokens/sec
+                # Each chunk uses ~2000-3000 tokens, so need ~20-30 seconds between chunks
+                delay = 15.0  # 15 second delay to stay under rate limit
+                logger.info(f"Waiting {delay}s to avoid Groq rate limits (free tier: 6000 tokens/min)...")
+                await deadline.sleep(delay)
+            
+            # Retry logic for rate limits
+            max_retries = 3
+            for attempt in range(max_retries):
+                try:
+                    if self.provider == APIProvider.OLLAMA:
+                        summary = await self._generate_with_ollama(chunk, topic)
+                    else:
+                        summary = await self._generate_with_api(chunk, topic)
+                    logger.info(f"Chunk {index+1} completed")
+                    return summary
+                except Exception as e:
+                    error_str = str(e).lower()
+                    # Check if it's a rate limit error
+                    if "rate limit" in error_str or "429" in error_str:
+                        if attempt < max_retries - 1:
+                            wait_time = (attempt + 1) * 2  # Exponential backoff: 2s, 4s, 6s
+                            logger.warning(f"Rate limit hit on chunk {index+1}, retrying in {wait_time}s...")
+                            await deadline.sleep(wait_time)
+                            continue
+                    # If not rate limit or out of retries, raise
+                    raise
+                    
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Chunk {index+1} failed after retries: {str(e)}")
+            # If a chunk fails, continue with others
+            return f"[Chunk {index+1} summary unavailable: {str(e)}]"
+    
+    def _default_chunk_size(self) -> int:
+        # Groq is fast, can handle larger chunks; smaller default for Ollama
+        return 8000 if self.provider == APIProvider.GROQ else 3000
+    
+    async def stream_summary(self, text: str, topic: Optional[str] = None, chunk_size: int = None) -> AsyncIterator[str]:
+        """
+        Generate a summary and yield it in pieces as the model produces it.
+        Long texts are chunked like generate_summary(); only the final
+        combining step is streamed.
+        
+        Args:
+            text: The text to summarize
+            topic: Optional topic/subject tag for context
+            chunk_size: Maximum characters per chunk (smart default if None)
+            
+        Yields:
+            Pieces of the summary text
+        """
+        async def single():
+            yield text
+        
+        async for piece in self.stream_summary_incremental(single(), topic, chunk_size):
+            yield piece
+    
+    async def stream_summary_incremental(
+        self,
+        pieces: AsyncIterator[str],
+        topic: Optional[str] = None,
+        chunk_size: int = None,
+        overlap: int = 200,
+    ) -> AsyncIterator[str]:
+        """
+        Summarize text that is still being produced (e.g. pages being extracted).
+        
+        Each chunk is summarized as soon as enough text for it has arrived, so
+        chunk summaries overlap with the producer; the final summary is streamed.
+        
+        Args:
+            pieces: Async iterator of text pieces, in document order
+            topic: Optional topic/subject tag for context
+            chunk_size: Maximum characters per chunk (smart default if None)
+            overlap: Characters shared between consecutive chunks
+            
+        Yields:
+            Pieces of the summary text
+        """
+        if chunk_size is None:
+            chunk_size = self._default_chunk_size()
+        
+        buffer = ""
+        chunk_summaries: List[str] = []
+        async for piece in pieces:
+            buffer = f"{buffer}\n\n{piece}" if buffer else piece
+            # Keep some lookahead so the cut can land on a sentence boundary
+            while len(buffer) > chunk_size + 500:
+                # Same boundary rule as _chunk_text: last sentence end in the final 500 chars
+                end = chunk_size
+                for i in range(chunk_size, chunk_size - 500, -1):
+                    if buffer[i] in '.!?\n':
+                        end = i + 1
+                        break
+                chunk = buffer[:end].strip()
+                buffer = buffer[end - overlap:]
+                if chunk:
+                    chunk_summaries.append(await self._summarize_chunk(chunk, topic, len(chunk_summaries)))
+        
+        buffer = buffer.strip()
+        if not chunk_summaries:
+            if len(buffer) <= chunk_size:
+                if not buffer:
+                    yield "No content to summarize."
+                    return
+                async for delta in self._stream_prompt(self._build_prompt(buffer, topic)):
+                    yield delta
+                return
+        for chunk in self._chunk_text(buffer, chunk_size, overlap):
+            chunk_summaries.append(await self._summarize_chunk(chunk, topic, len(chunk_summaries)))
+        
+        combined_summaries = "\n\n".join(chunk_summaries)
+        if len(chunk_summaries) == 1:
+            yield combined_summaries
+            return
+        if self.provider == APIProvider.OLLAMA:
+            prompt = self._build_combined_prompt(combined_summaries, topic)
+        else:
+            prompt = self._build_prompt(
+                "Section Summaries from a longer document:\n\n"
+                f"{combined_summaries}\n\n"
+                "Please provide a unified summary that synthesizes all these sections.",
+                topic,
+            )
+        try:
+            async for delta in self._stream_prompt(prompt):
+                yield delta
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception:
+            # If final summary fails, return combined summaries
+            yield f"Summary of {len(chunk_summaries)} sections:\n\n{combined_summaries}"
+    
+    async def _stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        if self.provider == APIProvider.OLLAMA:
+            stream = self._stream_with_ollama(prompt)
+        else:
+            stream = self._stream_with_openai_compatible(prompt)
+        async for delta in stream:
+            yield delta
+    
+    async def _stream_with_ollama(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a completion from Ollama (newline-delimited JSON)"""
+        timeout = deadline.timeout(300.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            try:
+                async with client.stream(
+                    "POST",
+                    f"{self.ollama_base_url}/api/generate",
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": True,
+                        "options": {
+                            "temperature": 0.7,
+                            "num_predict": 2000,
+                        }
+                    }
+                ) as response:
+                    if response.status_code >= 400:
+                        error_text = (await response.aread()).decode("utf-8", "replace")
+                        raise Exception(f"Ollama API error (status {response.status_code}): {error_text}")
+                    async for line in response.aiter_lines():
+                        deadline.check()
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        if event.get("response"):
+                            yield event["response"]
+                        if event.get("done"):
+                            break
+            except httpx.ConnectError:
+                raise Exception(
+                    f"Could not connect to Ollama at {self.ollama_base_url}. "
+                    "Make sure Ollama is running. Install from https://ollama.ai"
+                )
+            except httpx.TimeoutException:
+                # The timeout was capped by the request's deadline
+                deadline.check(slack=1.0)
+                raise Exception(
+                    f"Request to Ollama timed out after {timeout:.0f} seconds. "
+                    "The PDF may be too long or the model is too slow."
+                )
+    
+    async def _stream_with_openai_compatible(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a completion from Groq (OpenAI-compatible server-sent events)"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        async with httpx.AsyncClient(timeout=deadline.timeout(120.0)) as client:
+            async with client.stream(
+                "POST",
+                f"{self.api_base_url}/chat/completions",
+                headers=headers,
+                json={
+                    "model": self.model_name,
+                    "messages": [
+                        {"role": "system", "content": "You are a helpful assistant that summarizes academic papers and educational content."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_tokens": 2000,
+                    "temperature": 0.7,
+                    "stream": True
+                }
+            ) as response:
+                if response.status_code >= 400:
+                    error_text = (await response.aread()).decode("utf-8", "replace")
+                    if response.status_code == 429:
+                        raise Exception(f"Rate limit exceeded: {error_text}")
+                    raise Exception(f"Groq API error (status {response.status_code}): {error_text}")
+                async for line in response.aiter_lines():
+                    deadline.check()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+    
     def _build_combined_prompt(self, combined_summaries: str, topic: Optional[str] = None) -> str:
         """Build prompt for combining multiple section summaries"""
         topic_context = f"Topic: {topic}\n\n" if topic else ""
@@ -223,7 +444,8 @@ Summary:"""
     
     async def _generate_with_ollama_custom(self, prompt: str) -> str:
         """Generate with Ollama using a custom prompt (not built by _build_prompt)"""
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        timeout = deadline.timeout(300.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
             try:
                 response = await client.post(
                     f"{self.ollama_base_url}/api/generate",
@@ -249,8 +471,10 @@ Summary:"""
                     "Make sure Ollama is running. Install from https://ollama.ai"
                 )
             except httpx.TimeoutException:
+                # The timeout was capped by the request's deadline
+                deadline.check(slack=1.0)
                 raise Exception(
-                    f"Request to Ollama timed out after 300 seconds. "
+                    f"Request to Ollama timed out after {timeout:.0f} seconds. "
                     "The PDF may be too long or the model is too slow."
                 )
             except httpx.HTTPStatusError as e:
@@ -268,7 +492,9 @@ Summary:"""
         """
         prompt = self._build_prompt(text, topic)
         
-        async with httpx.AsyncClient(timeout=300.0) as client:  # Increased timeout for long PDFs
+        # Increased timeout for long PDFs, capped by the request's remaining budget
+        timeout = deadline.timeout(300.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
             try:
                 response = await client.post(
                     f"{self.ollama_base_url}/api/generate",
@@ -294,8 +520,10 @@ Summary:"""
                     "Make sure Ollama is running. Install from https://ollama.ai"
                 )
             except httpx.TimeoutException:
+                # The timeout was capped by the request's deadline
+                deadline.check(slack=1.0)
                 raise Exception(
-                    f"Request to Ollama timed out after 300 seconds. "
+                    f"Request to Ollama timed out after {timeout:.0f} seconds. "
                     "The PDF may be too long or the model is too slow. "
                     "Try a faster model or reduce the PDF size."
                 )
@@ -324,8 +552,9 @@ Summary:"""
         # Groq model (use configured model name)
         api_model = self.model_name
         
-        # Longer timeout for Groq since it's fast but might need time for large requests
-        timeout = 120.0
+        # Longer timeout for Groq since it's fast but might need time for large requests,
+        # capped by the request's remaining budget
+        timeout = deadline.timeout(120.0)
         
         async with httpx.AsyncClient(timeout=timeout) as client:
             try:
@@ -345,6 +574,10 @@ Summary:"""
                 response.raise_for_status()
                 result = response.json()
                 return result["choices"][0]["message"]["content"].strip()
+            except httpx.TimeoutException:
+                # The timeout was capped by the request's deadline
+                deadline.check(slack=1.0)
+                raise
             except httpx.HTTPStatusError as e:
                 error_text = e.response.text if hasattr(e.response, 'text') else str(e)
                 # Check for rate limit (429)
@@ -0,0 +1,255 @@
+"""
+Paper Structure Parser
+Segments extracted paper text into title, abstract, sections, references and appendix
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# "3 Method", "3. Method", "3.2 Training Details"
+_NUMBERED_HEADING = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,2})\.?\s+([A-Z][^\n]{1,80})$")
+# "IV. EXPERIMENTS"
+_ROMAN_HEADING = re.compile(r"^([IVX]{1,5})\.\s+([A-Z][A-Za-z \-:&,]{2,80})$")
+# Appendix sections after the references: "A Proofs", "B.1 Hyperparameters"
+# (no dot after a bare letter, so author initials in references don't match)
+_LETTER_HEADING = re.compile(r"^([A-H](?:\.\d{1,2}){0,2})\s+([A-Z][^\n,]{1,60})$")
+_ABSTRACT_HEADING = re.compile(r"^abstract\b\s*[:.\-—–]?\s*(.*)$", re.IGNORECASE)
+_KEYWORDS_LINE = re.compile(r"^(?:keywords?|index terms)\b", re.IGNORECASE)
+_REFERENCES_HEADING = re.compile(r"^(?:\d{1,2}\.?\s+|[IVX]{1,5}\.\s+)?(?:references|bibliography|literature cited)$", re.IGNORECASE)
+_APPENDIX_HEADING = re.compile(r"^(?:appendix|appendices|supplementary material)\b", re.IGNORECASE)
+_UNNUMBERED_HEADINGS = {
+    "introduction", "related work", "background", "method", "methods", "methodology",
+    "results", "experiments", "discussion", "conclusion", "conclusions",
+    "acknowledgments", "acknowledgements", "acknowledgment", "acknowledgement",
+}
+
+_ROMAN_VALUES = {"I": 1, "V": 5, "X": 10}
+
+
+def _roman_to_int(numeral: str) -> int:
+    total = 0
+    for i, ch in enumerate(numeral):
+        value = _ROMAN_VALUES[ch]
+        if i + 1 < len(numeral) and _ROMAN_VALUES[numeral[i + 1]] > value:
+            total -= value
+        else:
+            total += value
+    return total
+
+
+def _looks_like_heading(title: str) -> bool:
+    """Reject body lines that merely start with a number ("2 of the samples were ...")"""
+    words = title.split()
+    return 0 < len(words) <= 12 and not title.rstrip().endswith((".", ",", ";")) and not any(
+        ch.isdigit() for ch in words[0]
+    )
+
+
+def is_heading_line(line: str) -> bool:
+    """Whether a line has the shape of a section heading (used to keep headings on their own line)"""
+    line = line.strip()
+    for pattern in (_NUMBERED_HEADING, _ROMAN_HEADING):
+        match = pattern.match(line)
+        if match and _looks_like_heading(match.group(2)):
+            return True
+    return bool(
+        line.lower().rstrip(":") in _UNNUMBERED_HEADINGS
+        or _REFERENCES_HEADING.match(line)
+        or (_APPENDIX_HEADING.match(line) and len(line) < 60)
+        or _ABSTRACT_HEADING.match(line)
+        or _KEYWORDS_LINE.match(line)
+    )
+
+
+def parse_paper(text: str) -> Dict[str, Any]:
+    """
+    Segment the extracted text of a paper in a single pass over its lines
+
+    Headings are recognized by shape (numbered, Roman-numeral or well-known
+    unnumbered headings) and top-level section numbers must increase, which
+    filters out most body lines that happen to start with a number.
+
+    Args:
+        text: Extracted text of the paper
+
+    Returns:
+        Dict with 'title', 'abstract', 'sections' (list of {'number',
+        'heading', 'text'}), 'references', 'appendix' and 'front_matter'
+        (authors and affiliations). Missing parts are empty strings / an empty list.
+    """
+    lines = text.replace("\r\n", "\n").split("\n")
+    title = ""
+    front: List[str] = []
+    abstract: List[str] = []
+    references: List[str] = []
+    appendix: List[str] = []
+    sections: List[Dict[str, Any]] = []
+    current: Optional[List[str]] = None
+    state = "front"
+    last_top = 0
+
+    def start_section(number: str, heading: str):
+        nonlocal current
+        section = {"number": number, "heading": heading.strip(), "lines": []}
+        sections.append(section)
+        current = section["lines"]
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            if current is not None:
+                current.append("")
+            elif state == "abstract":
+                abstract.append("")
+            continue
+        if not title:
+            title = line
+            continue
+
+        # References and appendix: everything after them stays there, except
+        # an appendix heading that follows the references
+        if state in ("references", "appendix"):
+            if state == "references":
+                letter = _LETTER_HEADING.match(line)
+                if _APPENDIX_HEADING.match(line) or (
+                    letter and _looks_like_heading(letter.group(2)) and not line[-1].isdigit()
+                ):
+                    state = "appendix"
+            (references if state == "references" else appendix).append(line)
+            continue
+        if _REFERENCES_HEADING.match(line):
+            state = "references"
+            current = None
+            continue
+        if _APPENDIX_HEADING.match(line) and len(line) < 60:
+            state = "appendix"
+            current = None
+            appendix.append(line)
+            continue
+
+        if state in ("front", "abstract") and not sections:
+            match = _ABSTRACT_HEADING.match(line)
+            if match and state == "front":
+                state = "abstract"
+                if match.group(1):
+                    abstract.append(match.group(1))
+                continue
+            if state == "abstract" and _KEYWORDS_LINE.match(line):
+                state = "front"
+                continue
+
+        match = _NUMBERED_HEADING.match(line)
+        if match and _looks_like_heading(match.group(2)):
+            number = match.group(1)
+            top = int(number.split(".")[0])
+            if last_top <= top <= last_top + 1 and ("." in number or top != last_top):
+                last_top = top
+                state = "body"
+                start_section(number, match.group(2))
+                continue
+        match = _ROMAN_HEADING.match(line)
+        if match and _looks_like_heading(match.group(2)):
+            top = _roman_to_int(match.group(1))
+            if top == last_top + 1:
+                last_top = top
+                state = "body"
+                start_section(match.group(1), match.group(2))
+                continue
+        if line.lower().rstrip(":") in _UNNUMBERED_HEADINGS:
+            state = "body"
+            start_section("", line.rstrip(":"))
+            continue
+
+        if current is not None:
+            current.append(line)
+        elif state == "abstract":
+            abstract.append(line)
+        else:
+            front.append(line)
+
+    def join(parts: List[str]) -> str:
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(parts)).strip()
+
+    return {
+        "title": title,
+        "abstract": join(abstract),
+        "sections": [
+            {"number": s["number"], "heading": s["heading"], "text": join(s["lines"])}
+            for s in sections
+        ],
+        "references": join(references),
+        "appendix": join(appendix),
+        "front_matter": join(front),
+    }
+
+
+def select_text(
+    structure: Dict[str, Any],
+    sections: Optional[List[str]] = None,
+    include_references: bool = False,
+    include_appendix: bool = False,
+) -> str:
+    """
+    Assemble the text to summarize from a parsed paper
+
+    Args:
+        structure: Result of parse_paper
+        sections: Parts to include, matched against "abstract", section numbers
+                  ("3", which also selects 3.1, 3.2 ...) or words of the
+                  heading ("method"). None selects the abstract and every section.
+        include_references: Also include the reference list
+        include_appendix: Also include the appendix
+
+    Returns:
+        Selected text with headings, in document order
+    """
+    wanted = [s.strip().lower() for s in sections] if sections is not None else None
+    parts: List[str] = []
+
+    if structure["abstract"] and (wanted is None or "abstract" in wanted):
+        parts.append(f"Abstract\n{structure['abstract']}")
+    for section in structure["sections"]:
+        if wanted is not None and not any(_section_matches(section, w) for w in wanted):
+            continue
+        heading = f"{section['number']} {section['heading']}".strip()
+        parts.append(f"{heading}\n{section['text']}".strip())
+    if include_references and structure["references"]:
+        parts.append(f"References\n{structure['references']}")
+    if include_appendix and structure["appendix"]:
+        parts.append(structure["appendix"])
+    return "\n\n".join(parts)
+
+
+def _section_matches(section: Dict[str, Any], wanted: str) -> bool:
+    number = section["number"].lower()
+    if number and (number == wanted or number.startswith(wanted + ".")):
+        return True
+    return wanted != "abstract" and wanted in section["heading"].lower()
+
+
+def summary_text(structure: Dict[str, Any], full_text: str, max_chars: int = 4000) -> str:
+    """
+    Text used for a default (abstract-only) summary: the abstract if one was
+    found, otherwise the start of the body without references or appendix
+
+    Args:
+        structure: Result of parse_paper
+        full_text: Extracted text, used if the paper has no recognizable structure
+        max_chars: Length of the fallback text
+    """
+    if len(structure["abstract"]) >= 200:
+        return structure["abstract"][: max_chars * 2]
+    body = select_text(structure)
+    if len(body) < 200:
+        body = full_text
+    return body[:max_chars].strip()
+
+
+def section_outline(structure: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Headings and sizes of the parsed parts, for clients choosing sections"""
+    outline = [{"number": "", "heading": "Abstract", "chars": len(structure["abstract"])}] if structure["abstract"] else []
+    outline += [
+        {"number": s["number"], "heading": s["heading"], "chars": len(s["text"])}
+        for s in structure["sections"]
+    ]
+    return outline
@@ -0,0 +1,250 @@
+"""
+Background pre-summarizer that keeps the summary store filled
+for every article in the data directory
+"""
+
+import time
+import asyncio
+import logging
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.summary_store import SummaryStore
+from services.article_catalog import ArticleCatalog
+
+logger = logging.getLogger("uvicorn")
+
+
+class PreSummarizer:
+    """
+    Background worker that summarizes articles ahead of time.
+
+    A scanner periodically checks the article catalog for new or changed
+    articles and queues them;
+    workers summarize queued articles and write the results to the store.
+    Explicitly enqueued items (e.g. just fetched files or topics a user asked
+    for) jump ahead of the background scan. An article that fails is retried
+    by later scans with exponential backoff, and given up on after
+    max_attempts until the file changes.
+    """
+
+    PRIORITY_REQUESTED = 0
+    PRIORITY_BACKGROUND = 1
+
+    def __init__(
+        self,
+        catalog: ArticleCatalog,
+        store: SummaryStore,
+        summarize: Callable[[str, Optional[str]], Awaitable[Dict[str, Any]]],
+        model: str,
+        run_io: Callable[..., Awaitable[Any]],
+        topics: Sequence[str] = (),
+        concurrency: int = 1,
+        scan_interval: float = 30.0,
+        on_summarized: Optional[Callable[[str, Optional[str], str], None]] = None,
+        retry_base: float = 300.0,
+        retry_max: float = 86400.0,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize pre-summarizer
+
+        Args:
+            catalog: Catalog of the data directory
+            store: Where finished summaries are written
+            summarize: Coroutine function (filename, topic) -> dict with 'summary'
+                       and optionally 'images' and 'image_stats'
+            model: Model name summaries are stored under
+            run_io: Coroutine function used to run blocking calls off the event loop
+            topics: Topics to precompute a variant for, besides the default summary
+            concurrency: Number of articles summarized at the same time
+            scan_interval: Seconds between checks of the catalog
+            on_summarized: Optional blocking callback (filename, topic, summary),
+                           run off the event loop after each summary is stored
+            retry_base: Seconds before a failed article is retried; doubles per attempt
+            retry_max: Longest wait between retries
+            max_attempts: Failed attempts before an article is given up on (until it changes)
+        """
+        self.catalog = catalog
+        self.store = store
+        self.summarize = summarize
+        self.model = model
+        self.run_io = run_io
+        self.topics: List[Optional[str]] = [None] + [t for t in topics if t]
+        self.concurrency = max(1, concurrency)
+        self.scan_interval = scan_interval
+        self.on_summarized = on_summarized
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pending = set()
+        self._counter = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._last_generation: Optional[int] = None
+        # Earliest time a failed article's backoff ends, so the next scan after it runs
+        self._next_retry_at: Optional[float] = None
+
+        self.processed = 0
+        self.failed = 0
+        self.backing_off = 0
+        self.given_up = 0
+        self.last_scan_at: Optional[float] = None
+
+    def start(self):
+        """Start the scanner and worker tasks (call from the app lifespan)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks.append(asyncio.create_task(self._scan_loop()))
+        for _ in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        """Cancel the background tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, filename: str, topic: Optional[str] = None, priority: int = PRIORITY_REQUESTED):
+        """
+        Queue an article for summarization (no-op if it is already queued)
+
+        Args:
+            filename: Article filename in the data directory
+            topic: Topic variant to generate (None for the default summary)
+            priority: PRIORITY_REQUESTED or PRIORITY_BACKGROUND
+        """
+        if self._queue is None:
+            return
+        key = (filename, topic or None)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        self._queue.put_nowait((priority, next(self._counter), key))
+
+    def _find_stale(self) -> List[Tuple[str, Optional[str]]]:
+        """Blocking scan: (filename, topic) pairs missing or outdated in the store"""
+        now = time.time()
+        generation = self.catalog.generation
+        # Nothing was added, removed or changed since the last scan, and no backoff has ended
+        if generation == self._last_generation and (self._next_retry_at is None or now < self._next_retry_at):
+            return []
+        self._last_generation = generation
+        self._next_retry_at = None
+
+        failures = self.store.failures(self.model)
+        stale = []
+        backing_off = given_up = 0
+        for entry in self.catalog.entries(self.catalog.names(type="article")):
+            for topic in self.topics:
+                if self.store.is_current(entry.name, self.model, entry.version, topic):
+                    continue
+                failure = failures.get((entry.name, topic))
+                # Failures of an older version of the file don't count
+                if failure is not None and failure["source_version"] == entry.version:
+                    if failure["attempts"] >= self.max_attempts:
+                        given_up += 1
+                        continue
+                    if failure["next_attempt"] > now:
+                        backing_off += 1
+                        if self._next_retry_at is None or failure["next_attempt"] < self._next_retry_at:
+                            self._next_retry_at = failure["next_attempt"]
+                        continue
+                stale.append((entry.name, topic))
+        self.backing_off = backing_off
+        self.given_up = given_up
+        return stale
+
+    async def _scan_loop(self):
+        while True:
+            try:
+                stale = await self.run_io(self._find_stale)
+                self.last_scan_at = time.time()
+                for filename, topic in stale:
+                    self.enqueue(filename, topic, priority=self.PRIORITY_BACKGROUND)
+                if stale:
+                    logger.info(f"Pre-summarizer queued {len(stale)} article(s)")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pre-summarizer scan failed: {e}")
+            await asyncio.sleep(self.scan_interval)
+
+    async def _worker(self):
+        while True:
+            _, _, key = await self._queue.get()
+            filename, topic = key
+            try:
+                await self._summarize_one(filename, topic)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                attempts = await self._record_failure(filename, topic, e)
+                logger.warning(
+                    f"Pre-summarize failed for {filename} (topic={topic}, attempt {attempts}/{self.max_attempts}): {e}"
+                )
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    async def _record_failure(self, filename: str, topic: Optional[str], error: Exception) -> int:
+        """Schedule the retry of a failed article; returns its attempts so far"""
+        entry = self.catalog.get(filename)
+        if entry is None:
+            return 0
+        attempts = await self.run_io(
+            self.store.record_failure,
+            filename,
+            self.model,
+            entry.version,
+            str(error),
+            topic,
+            self.retry_base,
+            self.retry_max,
+        )
+        retry_at = time.time() + min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        if attempts >= self.max_attempts:
+            self.given_up += 1
+        elif self._next_retry_at is None or retry_at < self._next_retry_at:
+            self._next_retry_at = retry_at
+        return attempts
+
+    async def _summarize_one(self, filename: str, topic: Optional[str]):
+        entry = self.catalog.get(filename)
+        if entry is None:
+            return  # removed since it was queued
+        version = entry.version
+        if await self.run_io(self.store.is_current, filename, self.model, version, topic):
+            return
+        result = await self.summarize(filename, topic)
+        await self.run_io(
+            self.store.put,
+            filename,
+            self.model,
+            version,
+            result["summary"],
+            topic,
+            result.get("images"),
+            result.get("image_stats"),
+        )
+        if self.on_summarized is not None:
+            await self.run_io(self.on_summarized, filename, topic, result["summary"])
+        self.processed += 1
+        logger.info(f"Pre-summarized {filename} (topic={topic})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and progress counters"""
+        return {
+            "running": bool(self._tasks),
+            "queued": len(self._pending),
+            "processed": self.processed,
+            "failed": self.failed,
+            "backing_off": self.backing_off,
+            "given_up": self.given_up,
+            "last_scan_at": self.last_scan_at,
+            "topics": [t for t in self.topics if t],
+        }
@@ -0,0 +1,568 @@
+"""
+Search Index: incremental inverted index with BM25 ranking over
+article titles, abstracts and generated summaries
+"""
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import heapq
+import struct
+import asyncio
+import logging
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.lazy_import import LazyModule, is_available
+
+# NumPy vectorizes scoring of long posting lists; pure Python is the fallback.
+# It is imported on the first scored query, not at startup.
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = is_available(np)
+
+logger = logging.getLogger("uvicorn")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was we were which with our these their can also than into using based".split()
+)
+
+# Documents are indexed as (filename + suffix) so a summary can be (re)indexed
+# without touching the title/abstract document of the same article
+SUMMARY_SUFFIX = "#summary"
+
+_MAGIC = b"TSIX1"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords or single characters"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index persisted as a compact snapshot plus an
+    append-only log of changes since the snapshot.
+
+    - Postings are parallel arrays of doc ids and term frequencies
+    - Titles are weighted by repeating their terms (title_weight)
+    - Updates append a new doc and tombstone the old one; tombstones are
+      dropped when the index is compacted on save
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        title_weight: int = 2,
+        checkpoint_every: int = 5000,
+    ):
+        """
+        Initialize search index
+
+        Args:
+            index_dir: Directory for the snapshot and log. Defaults to backend/cache/search
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            title_weight: How many times title terms are counted
+            checkpoint_every: Logged changes after which a new snapshot is written
+        """
+        if index_dir is None:
+            index_dir = str(Path(__file__).parent.parent / "cache" / "search")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.index_dir / "index.bin"
+        self.log_path = self.index_dir / "index.log"
+        # Changes covered by a snapshot that is still being written
+        self.prev_log_path = self.index_dir / "index.log.1"
+
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.checkpoint_every = checkpoint_every
+
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._reset()
+        self._log_file = None
+        self._logged = 0
+        self._checkpoint: Optional[threading.Thread] = None
+
+    def _reset(self):
+        self.keys: List[Optional[str]] = []  # doc id -> key (None once deleted)
+        self.versions: List[str] = []
+        self.titles: List[str] = []
+        self.lengths = array("I")
+        self.alive = array("B")  # 1 for live docs, 0 for tombstones
+        self.key_to_id: Dict[str, int] = {}
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.total_length = 0
+        self.live_docs = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _add(self, key: str, version: str, title: str, body: str):
+        self._delete(key)
+        counts = Counter(tokenize(body))
+        for term in tokenize(title):
+            counts[term] += self.title_weight
+        doc_id = len(self.keys)
+        self.keys.append(key)
+        self.versions.append(version)
+        self.titles.append(title)
+        length = sum(counts.values())
+        self.lengths.append(length)
+        self.alive.append(1)
+        self.key_to_id[key] = doc_id
+        self.total_length += length
+        self.live_docs += 1
+        for term, tf in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("H"))
+            entry[0].append(doc_id)
+            entry[1].append(min(tf, 65535))
+
+    def _delete(self, key: str):
+        doc_id = self.key_to_id.pop(key, None)
+        if doc_id is None:
+            return
+        self.keys[doc_id] = None
+        self.alive[doc_id] = 0
+        self.total_length -= self.lengths[doc_id]
+        self.live_docs -= 1
+
+    def _log(self, record: Dict[str, Any]):
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+        self._log_file.write(json.dumps(record) + "\n")
+        self._log_file.flush()
+        self._logged += 1
+        if self._logged >= self.checkpoint_every and not (self._checkpoint and self._checkpoint.is_alive()):
+            # Written off the caller's thread so updates and searches don't wait on it
+            self._checkpoint = threading.Thread(target=self._run_checkpoint, name="search-checkpoint", daemon=True)
+            self._checkpoint.start()
+
+    def _run_checkpoint(self):
+        try:
+            self.save()
+        except Exception as e:
+            logger.warning(f"Search index checkpoint failed: {e}")
+
+    def add_document(self, filename: str, title: str, body: str, version: str = ""):
+        """
+        Index (or re-index) an article's title and abstract/body
+
+        Args:
+            filename: Article filename
+            title: Article title
+            body: Abstract or extracted text
+            version: Version stamp of the source file, used to skip unchanged files
+        """
+        with self._lock:
+            self._add(filename, version, title, body)
+            self._log({"op": "add", "key": filename, "version": version, "title": title, "body": body})
+
+    def add_summary(self, filename: str, summary: str):
+        """Index (or re-index) the generated summary of an article"""
+        key = filename + SUMMARY_SUFFIX
+        with self._lock:
+            self._add(key, "", "", summary)
+            self._log({"op": "add", "key": key, "version": "", "title": "", "body": summary})
+
+    def remove_document(self, filename: str):
+        """Remove an article and its summary from the index"""
+        with self._lock:
+            for key in (filename, filename + SUMMARY_SUFFIX):
+                if key in self.key_to_id:
+                    self._delete(key)
+                    self._log({"op": "delete", "key": key})
+
+    def version(self, filename: str) -> Optional[str]:
+        """Indexed version of an article, or None if it isn't indexed"""
+        with self._lock:
+            doc_id = self.key_to_id.get(filename)
+            return self.versions[doc_id] if doc_id is not None else None
+
+    def indexed_names(self) -> List[str]:
+        """Article filenames in the index (summaries excluded)"""
+        with self._lock:
+            return [key for key in self.key_to_id if not key.endswith(SUMMARY_SUFFIX)]
+
+    def __len__(self):
+        return self.live_docs
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top-k articles for a query ranked by BM25
+
+        Scores of an article's title/abstract document and its summary
+        document are added together.
+
+        Returns:
+            List of {'filename', 'title', 'score'} sorted by descending score
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+        with self._lock:
+            if self.live_docs == 0:
+                return []
+            avgdl = max(self.total_length / self.live_docs, 1.0)
+            # Fetch extra candidates since two docs can map to one article
+            candidates = self._score_numpy(terms, avgdl, k * 2) if NUMPY_AVAILABLE else \
+                self._score_python(terms, avgdl, k * 2)
+
+            merged: Dict[str, float] = {}
+            titles: Dict[str, str] = {}
+            for doc_id, score in candidates:
+                key = self.keys[doc_id]
+                if key is None:
+                    continue
+                filename = key[: -len(SUMMARY_SUFFIX)] if key.endswith(SUMMARY_SUFFIX) else key
+                merged[filename] = merged.get(filename, 0.0) + score
+                if self.titles[doc_id]:
+                    titles[filename] = self.titles[doc_id]
+                elif filename not in titles:
+                    main_id = self.key_to_id.get(filename)
+                    titles[filename] = self.titles[main_id] if main_id is not None else ""
+
+        top = heapq.nlargest(k, merged.items(), key=lambda item: item[1])
+        return [{"filename": f, "title": titles.get(f, ""), "score": round(s, 4)} for f, s in top]
+
+    def _idf(self, df: int) -> float:
+        n = max(self.live_docs, 1)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _score_numpy(self, terms: List[str], avgdl: float, k: int) -> List[Tuple[int, float]]:
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        k1, b = self.k1, self.b
+        for term in terms:
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            ids = np.frombuffer(entry[0], dtype=np.uint32)
+            tfs = np.frombuffer(entry[1], dtype=np.uint16).astype(np.float32)
+            norm = k1 * (1 - b + b * lengths[ids] / avgdl)
+            # Doc ids are unique within a posting list, so fancy-index += is safe
+            scores[ids] += self._idf(len(ids)) * tfs * (k1 + 1) / (tfs + norm)
+        # Zero out tombstoned docs
+        scores *= np.frombuffer(self.alive, dtype=np.uint8)
+        nonzero = int(np.count_nonzero(scores))
+        if nonzero == 0:
+            return []
+        k = min(k, nonzero)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def _score_python(self, terms: List[str], avgdl: float, k: int) -> List[Tuple[int, float]]:
+        scores: Dict[int, float] = {}
+        k1, b = self.k1, self.b
+        lengths = self.lengths
+        keys = self.keys
+        for term in terms:
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            idf = self._idf(len(entry[0]))
+            for doc_id, tf in zip(entry[0], entry[1]):
+                if keys[doc_id] is None:
+                    continue
+                norm = k1 * (1 - b + b * lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _compact(self):
+        """Drop tombstoned docs and renumber the remaining ones"""
+        if self.live_docs == len(self.keys):
+            return
+        remap = array("i", [-1]) * len(self.keys)
+        keys, versions, titles, lengths = [], [], [], array("I")
+        for old_id, key in enumerate(self.keys):
+            if key is None:
+                continue
+            remap[old_id] = len(keys)
+            keys.append(key)
+            versions.append(self.versions[old_id])
+            titles.append(self.titles[old_id])
+            lengths.append(self.lengths[old_id])
+        postings = {}
+        for term, (ids, tfs) in self.postings.items():
+            new_ids, new_tfs = array("I"), array("H")
+            for doc_id, tf in zip(ids, tfs):
+                new_id = remap[doc_id]
+                if new_id >= 0:
+                    new_ids.append(new_id)
+                    new_tfs.append(tf)
+            if new_ids:
+                postings[term] = (new_ids, new_tfs)
+        self.keys, self.versions, self.titles, self.lengths = keys, versions, titles, lengths
+        self.alive = array("B", [1]) * len(keys)
+        self.key_to_id = {key: i for i, key in enumerate(keys)}
+        self.postings = postings
+
+    def save(self):
+        """
+        Write a compacted snapshot and drop the changes it covers from the log.
+
+        The index is compacted and copied under the lock, and the log is
+        rotated to index.log.1 at the same point; the snapshot is then written
+        without holding the lock, so updates and searches carry on meanwhile.
+        index.log.1 is removed once the snapshot is in place.
+
+        Snapshot layout (zlib-compressed): magic, JSON header with doc keys,
+        versions and titles, doc lengths, then per term its delta-encoded
+        doc ids and term frequencies as packed arrays.
+        """
+        with self._save_lock:
+            with self._lock:
+                self._compact()
+                keys, versions, titles = list(self.keys), list(self.versions), list(self.titles)
+                lengths = self.lengths[:]
+                postings = {term: (ids[:], tfs[:]) for term, (ids, tfs) in self.postings.items()}
+                self._rotate_log()
+
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            compressor = zlib.compressobj(6)
+            with open(tmp_path, "wb") as f:
+                def write(data: bytes):
+                    f.write(compressor.compress(data))
+
+                header = json.dumps({
+                    "k1": self.k1,
+                    "b": self.b,
+                    "keys": keys,
+                    "versions": versions,
+                    "titles": titles,
+                }).encode("utf-8")
+                write(_MAGIC + struct.pack("<I", len(header)) + header)
+                write(struct.pack("<I", len(lengths)) + lengths.tobytes())
+                write(struct.pack("<I", len(postings)))
+                for term, (ids, tfs) in postings.items():
+                    encoded = term.encode("utf-8")
+                    # Delta-encode doc ids: small gaps compress far better
+                    deltas = ids
+                    for i in range(len(deltas) - 1, 0, -1):
+                        deltas[i] -= deltas[i - 1]
+                    write(struct.pack("<HI", len(encoded), len(ids)) + encoded)
+                    write(deltas.tobytes() + tfs.tobytes())
+                f.write(compressor.flush())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self.prev_log_path.unlink(missing_ok=True)
+
+    def _rotate_log(self):
+        """Move the log aside for the snapshot being written (call with the lock held)"""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        if self.log_path.exists():
+            if self.prev_log_path.exists():
+                # An earlier snapshot never made it to disk: its changes are still needed
+                with open(self.prev_log_path, "ab") as prev, open(self.log_path, "rb") as log:
+                    prev.write(log.read())
+                self.log_path.unlink()
+            else:
+                os.replace(self.log_path, self.prev_log_path)
+        self._logged = 0
+
+    def load(self):
+        """Load the snapshot (if any) and replay the change log"""
+        with self._lock:
+            self._reset()
+            if self.snapshot_path.exists():
+                self._load_snapshot()
+            # index.log.1 is left over if the process stopped while a snapshot
+            # was being written. Replaying changes is idempotent, so it doesn't
+            # matter whether that snapshot made it to disk
+            for path in (self.prev_log_path, self.log_path):
+                if not path.exists():
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn write from a crash; later changes may follow it
+                        if record["op"] == "add":
+                            self._add(record["key"], record["version"], record["title"], record["body"])
+                        elif record["op"] == "delete":
+                            self._delete(record["key"])
+                        self._logged += 1
+
+    def _load_snapshot(self):
+        data = zlib.decompress(self.snapshot_path.read_bytes())
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"Not a search index snapshot: {self.snapshot_path}")
+        pos = len(_MAGIC)
+        (header_len,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = json.loads(data[pos:pos + header_len].decode("utf-8"))
+        pos += header_len
+        self.keys = header["keys"]
+        self.versions = header["versions"]
+        self.titles = header["titles"]
+        self.key_to_id = {key: i for i, key in enumerate(self.keys) if key is not None}
+        self.live_docs = len(self.key_to_id)
+        self.alive = array("B", (0 if key is None else 1 for key in self.keys))
+
+        (n_docs,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        self.lengths = array("I")
+        self.lengths.frombytes(data[pos:pos + 4 * n_docs])
+        pos += 4 * n_docs
+        self.total_length = sum(length for length, live in zip(self.lengths, self.alive) if live)
+
+        (n_terms,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        for _ in range(n_terms):
+            term_len, count = struct.unpack_from("<HI", data, pos)
+            pos += 6
+            term = data[pos:pos + term_len].decode("utf-8")
+            pos += term_len
+            ids = array("I")
+            ids.frombytes(data[pos:pos + 4 * count])
+            pos += 4 * count
+            for i in range(1, count):
+                ids[i] += ids[i - 1]
+            tfs = array("H")
+            tfs.frombytes(data[pos:pos + 2 * count])
+            pos += 2 * count
+            self.postings[term] = (ids, tfs)
+
+    def close(self):
+        """Write a final snapshot and close the log"""
+        # Not under the index lock: save() takes it, after waiting for a checkpoint in progress
+        if self._logged or self.prev_log_path.exists():
+            self.save()
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+
+class SearchIndexer:
+    """
+    Background task that indexes catalog articles that are missing from the
+    index or changed since they were indexed.
+
+    Extra indexes with the same add_document / remove_document / version /
+    indexed_names interface (e.g. the similarity index) are kept current from
+    the same document loads.
+    """
+
+    def __init__(
+        self,
+        index: SearchIndex,
+        catalog,
+        load_document: Callable[[str], Awaitable[Tuple[str, str]]],
+        run_io: Callable[..., Awaitable[Any]],
+        scan_interval: float = 10.0,
+        extra_indexes: Sequence[Any] = (),
+    ):
+        """
+        Initialize indexer
+
+        Args:
+            index: Index to keep current
+            catalog: ArticleCatalog of the data directory
+            load_document: Coroutine function filename -> (title, body)
+            run_io: Coroutine function used to run blocking calls off the event loop
+            scan_interval: Seconds between checks of the catalog
+            extra_indexes: Other indexes to feed with the same documents
+        """
+        self.index = index
+        self.indexes = [index, *extra_indexes]
+        self.catalog = catalog
+        self.load_document = load_document
+        self.run_io = run_io
+        self.scan_interval = scan_interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_generation: Optional[int] = None
+        self.indexed = 0
+        self.failed = 0
+        self.scans = 0  # completed passes over the catalog
+
+    def start(self):
+        """Start the background task (call from the app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _pending(self) -> List[Tuple[str, str, List[Any]]]:
+        generation = self.catalog.generation
+        if generation == self._last_generation:
+            return []
+        self._last_generation = generation
+        # A PDF attached to its abstract is the same paper: only the abstract is indexed
+        entries = [e for e in self.catalog.entries(self.catalog.names()) if not self.catalog.is_attachment(e)]
+        live = {entry.name for entry in entries}
+        for index in self.indexes:
+            for name in index.indexed_names():
+                if name not in live:
+                    index.remove_document(name)
+        pending = []
+        for e in entries:
+            stale = [index for index in self.indexes if index.version(e.name) != e.version]
+            if stale:
+                pending.append((e.name, e.version, stale))
+        return pending
+
+    async def _run(self):
+        while True:
+            try:
+                pending = await self.run_io(self._pending)
+                for filename, version, stale in pending:
+                    try:
+                        title, body = await self.load_document(filename)
+                        for index in stale:
+                            await self.run_io(index.add_document, filename, title, body, version)
+                        self.indexed += 1
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.failed += 1
+                        logger.warning(f"Indexing failed for {filename}: {e}")
+                if pending:
+                    logger.info(f"Search index updated: {len(pending)} article(s), {len(self.index)} documents")
+                self.scans += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Search indexer scan failed: {e}")
+            await asyncio.sleep(self.scan_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "documents": len(self.index),
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "scans": self.scans,
+        }
@@ -0,0 +1,449 @@
+"""
+Shared State for caches and in-flight dedupe across uvicorn workers
+Pluggable backends: in-process (one worker), SQLite WAL (workers on one host)
+and Redis (several hosts)
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services import deadline
+from services.lazy_import import LazyModule, is_available
+
+redis = LazyModule("redis")
+
+
+class SharedState:
+    """
+    Small key-value interface shared by all workers using the same backend:
+    JSON values with an optional TTL, integer counters and leases (expiring
+    locks with an owner). All methods are blocking; call them via run_io.
+    """
+
+    backend = "base"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value stored under key, or None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value, expiring after ttl seconds (None keeps it)"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove a key"""
+        raise NotImplementedError
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        """Add to a counter and return its new value"""
+        raise NotImplementedError
+
+    def counters(self, prefix: str = "") -> Dict[str, int]:
+        """Counters whose name starts with prefix"""
+        raise NotImplementedError
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """
+        Take or extend a lease. Succeeds if the lease is free, expired or
+        already held by owner; the lease expires after ttl seconds.
+        """
+        raise NotImplementedError
+
+    def release(self, key: str, owner: str):
+        """Give up a lease (no-op unless owner holds it)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections"""
+
+
+class LocalState(SharedState):
+    """In-process state: only shared by the tasks and threads of one worker"""
+
+    backend = "local"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._leases: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.time():
+                self._values.pop(key, None)
+                self._expires.pop(key, None)
+            return self._values.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._values[key] = value
+            if ttl is None:
+                self._expires.pop(key, None)
+            else:
+                self._expires[key] = time.time() + ttl
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            return self._counters[name]
+
+    def counters(self, prefix: str = "") -> Dict[str, int]:
+        with self._lock:
+            return {k: v for k, v in self._counters.items() if k.startswith(prefix)}
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            held = self._leases.get(key)
+            if held is not None and held[0] != owner and held[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key: str, owner: str):
+        with self._lock:
+            held = self._leases.get(key)
+            if held is not None and held[0] == owner:
+                del self._leases[key]
+
+
+class SQLiteState(SharedState):
+    """
+    State in a SQLite database in WAL mode. Every worker on the host opens the
+    same file, so caches, counters and leases are shared between them.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize SQLite state
+
+        Args:
+            db_path: Path of the SQLite database. Defaults to backend/cache/shared_state.sqlite3
+        """
+        if db_path is None:
+            backend_dir = Path(__file__).parent.parent
+            db_path = str(backend_dir / "cache" / "shared_state.sqlite3")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        # Other workers hold the write lock briefly; wait instead of failing
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self._sets = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl if ttl is not None else None),
+            )
+            self._sets += 1
+            if self._sets % 256 == 0:
+                # Expired rows are skipped on read; clear them out now and then
+                self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO counters (name, value) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+                """,
+                (name, amount),
+            )
+            row = self._conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+            self._conn.commit()
+        return row[0]
+
+    def counters(self, prefix: str = "") -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, value FROM counters WHERE substr(name, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        return dict(rows)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # One statement, so the check and the write are atomic across processes
+            cursor = self._conn.execute(
+                """
+                INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at <= ?
+                """,
+                (key, owner, now + ttl, now),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def release(self, key: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisState(SharedState):
+    """
+    State in a Redis-compatible server (Redis, Valkey, KeyDB, ...), shared by
+    workers on any number of hosts. Needs the redis package.
+    """
+
+    backend = "redis"
+
+    # Delete the lease only if it still belongs to the caller
+    _RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str, prefix: str = "topical:"):
+        """
+        Initialize Redis state
+
+        Args:
+            url: Server URL, e.g. redis://localhost:6379/0
+            prefix: Prefix for every key, so several apps can share a server
+        """
+        if not is_available(redis):
+            raise ImportError("Redis shared state needs the redis package: pip install redis")
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._counters_key = f"{prefix}counters"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl is not None else None)
+
+    def delete(self, key: str):
+        self._client.delete(self.prefix + key)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        return self._client.hincrby(self._counters_key, name, amount)
+
+    def counters(self, prefix: str = "") -> Dict[str, int]:
+        values = self._client.hgetall(self._counters_key)
+        return {k: int(v) for k, v in values.items() if k.startswith(prefix)}
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        lease_key = f"{self.prefix}lease:{key}"
+        if self._client.set(lease_key, owner, nx=True, px=int(ttl * 1000)):
+            return True
+        # Extending our own lease; a small race here only shortens another owner's wait
+        if self._client.get(lease_key) == owner:
+            self._client.pexpire(lease_key, int(ttl * 1000))
+            return True
+        return False
+
+    def release(self, key: str, owner: str):
+        self._client.eval(self._RELEASE_SCRIPT, 1, f"{self.prefix}lease:{key}", owner)
+
+    def close(self):
+        self._client.close()
+
+
+def create_shared_state(url: Optional[str] = None) -> SharedState:
+    """
+    Create the shared state backend named by a URL
+
+    Args:
+        url: "local" (one worker), "sqlite" or "sqlite:///path/to/file.sqlite3"
+             (workers on one host, the default), or "redis://host:port/db" /
+             "rediss://..." (several hosts)
+    """
+    url = (url or "sqlite").strip()
+    if url == "local":
+        return LocalState()
+    if url == "sqlite":
+        return SQLiteState()
+    if url.startswith("sqlite:///"):
+        return SQLiteState(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisState(url)
+    raise ValueError(f"Unknown shared state backend: {url!r}")
+
+
+def hit_rates(counters: Dict[str, int]) -> Dict[str, Optional[float]]:
+    """Hit rate of every '<name>.hits' / '<name>.misses' counter pair"""
+    rates = {}
+    for name, hits in counters.items():
+        if not name.endswith(".hits"):
+            continue
+        base = name[: -len(".hits")]
+        lookups = hits + counters.get(base + ".misses", 0)
+        rates[base] = round(hits / lookups, 3) if lookups else None
+    return rates
+
+
+class SingleFlight:
+    """
+    Runs each keyed computation once at a time across all workers.
+
+    Callers in the same worker share one task. Across workers, the first to
+    take the key's lease computes; the others poll ``lookup`` (usually a cache
+    read) until the result shows up, or take over if the lease is released or
+    expires without one.
+    """
+
+    def __init__(
+        self,
+        state: SharedState,
+        run_io: Callable[..., Awaitable[Any]],
+        name: str,
+        lease_ttl: float = 120.0,
+        poll_interval: float = 0.25,
+    ):
+        """
+        Initialize single flight
+
+        Args:
+            state: Shared state holding the leases and counters
+            run_io: Coroutine function used to run blocking calls off the event loop
+            name: Name used for lease keys and counters
+            lease_ttl: Seconds a lease lasts; renewed while the computation runs
+            poll_interval: Seconds between lookups while another worker computes
+        """
+        self.state = state
+        self.run_io = run_io
+        self.name = name
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._flights: Dict[str, asyncio.Task] = {}
+        # Callers awaiting each flight in this worker
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Awaitable[Optional[Any]]]] = None,
+    ) -> Any:
+        """
+        Return compute()'s result, computing it only if no other caller is
+
+        Args:
+            key: Identifies the computation
+            compute: Coroutine function producing the result; it should also
+                     store the result where lookup finds it
+            lookup: Coroutine function returning the stored result or None
+        """
+        while True:
+            task = self._flights.get(key)
+            joined = task is not None
+            if not joined:
+                task = asyncio.ensure_future(self._run_shared(key, compute, lookup))
+                self._flights[key] = task
+                task.add_done_callback(lambda done: self._forget(key, done))
+            self._waiters[task] = self._waiters.get(task, 0) + 1
+            try:
+                if joined:
+                    await self.run_io(self.state.incr, f"{self.name}.joined_local")
+                # One cancelled caller (e.g. a disconnected client) doesn't cancel the
+                # others' result; the computation is cancelled once every caller is gone
+                return await asyncio.shield(task)
+            except deadline.DeadlineExceeded:
+                # The computation ran under the deadline of the caller that started
+                # it; a caller that joined it and has time left starts it again
+                # under its own
+                if not joined or deadline.expired():
+                    raise
+            finally:
+                self._waiters[task] -= 1
+                if not self._waiters[task]:
+                    del self._waiters[task]
+                    if not task.done():
+                        task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+    async def _run_shared(self, key: str, compute, lookup) -> Any:
+        lease = f"{self.name}:{key}"
+        waited = False
+        while True:
+            if await self.run_io(self.state.acquire, lease, self.owner, self.lease_ttl):
+                renew = asyncio.create_task(self._renew(lease))
+                try:
+                    await self.run_io(self.state.incr, f"{self.name}.computed")
+                    return await compute()
+                finally:
+                    renew.cancel()
+                    await self.run_io(self.state.release, lease, self.owner)
+            if not waited:
+                waited = True
+                await self.run_io(self.state.incr, f"{self.name}.joined_remote")
+            await deadline.sleep(self.poll_interval)
+            if lookup is not None:
+                result = await lookup()
+                if result is not None:
+                    return result
+
+    async def _renew(self, lease: str):
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            await self.run_io(self.state.acquire, lease, self.owner, self.lease_ttl)
+
+    def in_flight(self) -> int:
+        """Computations this worker is running or waiting on"""
+        return len(self._flights)
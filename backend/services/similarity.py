@@ -0,0 +1,392 @@
+"""
+Similarity Engine for "related articles"
+Hashed TF-IDF vectors in a memory-mapped sparse matrix, queried with cosine similarity
+"""
+
+import os
+import json
+import time
+import shutil
+import zlib
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.lazy_import import LazyModule, is_available
+from services.search_index import tokenize
+
+# Imported when the index is first loaded or queried, not at startup
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = is_available(np)
+sp = LazyModule("scipy.sparse")
+SCIPY_AVAILABLE = is_available(sp)
+
+
+def _require_numeric():
+    if not NUMPY_AVAILABLE or not SCIPY_AVAILABLE:
+        raise ImportError(
+            "NumPy and SciPy are required for related articles. Please install them with: pip install numpy scipy"
+        )
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity index over hashed TF-IDF vectors.
+
+    - Features are token hashes (crc32 mod n_features, signed) so the
+      vocabulary never has to be stored or rebuilt
+    - The base matrix is a CSR matrix saved as .npy files and memory-mapped
+      on load; articles added since the last save live in a small in-memory
+      delta and use the IDF weights of the last build
+    - save() merges the delta into a new base; once the delta has grown large
+      relative to the base it also recomputes IDF from the matrix itself
+      (document frequency = non-zeros per column) and reweights every row,
+      so nothing is ever re-tokenized
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        n_features: int = 2 ** 18,
+        reweight_ratio: float = 0.5,
+        checkpoint_every: int = 5000,
+    ):
+        """
+        Initialize similarity index
+
+        Args:
+            index_dir: Directory for the saved matrix. Defaults to backend/cache/similarity
+            n_features: Size of the hashed feature space
+            reweight_ratio: Delta size (relative to the base) above which
+                            save() recomputes IDF weights
+            checkpoint_every: Save automatically after this many added articles
+        """
+        if index_dir is None:
+            index_dir = str(Path(__file__).parent.parent / "cache" / "similarity")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.n_features = n_features
+        self.reweight_ratio = reweight_ratio
+        self.checkpoint_every = checkpoint_every
+
+        self._lock = threading.RLock()
+        self.names: List[Optional[str]] = []  # row -> filename (None once removed)
+        self.versions: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self._dead_rows: set = set()
+        self.idf = None
+        self.base = None  # csr_matrix, memory-mapped after load()
+        self.base_rows = 0
+        self._delta_rows: List[Any] = []
+        self._matrix = None  # cached vstack of the delta rows
+
+    # ------------------------------------------------------------------
+    # Vectorizing
+    # ------------------------------------------------------------------
+
+    def _hashed_counts(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = defaultdict(float)
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            # The top bit picks a sign so hash collisions tend to cancel out
+            counts[h % self.n_features] += 1.0 if h & 0x80000000 else -1.0
+        return counts
+
+    def _vectorize(self, text: str, idf=None) -> Tuple[Any, Any]:
+        """Sparse (indices, values) of an L2-normalized, sublinear TF-IDF vector"""
+        counts = self._hashed_counts(text)
+        items = [(i, v) for i, v in counts.items() if v != 0]
+        if not items:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        items.sort()
+        indices = np.fromiter((i for i, _ in items), dtype=np.int32, count=len(items))
+        raw = np.fromiter((v for _, v in items), dtype=np.float32, count=len(items))
+        values = np.sign(raw) * (1.0 + np.log(np.abs(raw)))
+        if idf is not None:
+            values *= idf[indices]
+        norm = float(np.linalg.norm(values))
+        if norm > 0:
+            values /= norm
+        return indices, values.astype(np.float32)
+
+    def _row(self, indices, values):
+        return sp.csr_matrix(
+            (values, indices, np.array([0, len(indices)], dtype=np.int64)),
+            shape=(1, self.n_features),
+        )
+
+    # ------------------------------------------------------------------
+    # Building and updates
+    # ------------------------------------------------------------------
+
+    def add_document(self, filename: str, title: str, body: str, version: str = ""):
+        """
+        Add or replace an article incrementally (uses the IDF of the last save)
+
+        Args:
+            filename: Article filename
+            title: Article title
+            body: Abstract or extracted text
+            version: Version stamp of the source file
+        """
+        _require_numeric()
+        with self._lock:
+            indices, values = self._vectorize(f"{title}\n{body}", self.idf)
+            self._remove(filename)
+            self.row_of[filename] = len(self.names)
+            self.names.append(filename)
+            self.versions.append(version)
+            self._delta_rows.append(self._row(indices, values))
+            self._matrix = None
+            if len(self._delta_rows) >= self.checkpoint_every:
+                self.save()
+
+    def _remove(self, filename: str):
+        row = self.row_of.pop(filename, None)
+        if row is not None:
+            self.names[row] = None
+            self._dead_rows.add(row)
+
+    def remove_document(self, filename: str):
+        """Remove an article (its row is dropped on the next save)"""
+        with self._lock:
+            self._remove(filename)
+
+    def version(self, filename: str) -> Optional[str]:
+        """Indexed version of an article, or None if it isn't indexed"""
+        with self._lock:
+            row = self.row_of.get(filename)
+            return self.versions[row] if row is not None else None
+
+    def indexed_names(self) -> List[str]:
+        """Filenames currently in the index"""
+        with self._lock:
+            return list(self.row_of)
+
+    def needs_reweight(self) -> bool:
+        """True when the delta is large enough that the IDF weights are stale"""
+        with self._lock:
+            return len(self._delta_rows) > max(100, self.reweight_ratio * self.base_rows)
+
+    def __len__(self):
+        return len(self.row_of)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _delta_matrix(self):
+        if self._matrix is None:
+            if self._delta_rows:
+                self._matrix = sp.vstack(self._delta_rows, format="csr")
+            else:
+                self._matrix = sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        return self._matrix
+
+    def _rows(self, rows: List[int]):
+        """Stack the given rows (base or delta) into one query matrix"""
+        delta = self._delta_matrix()
+        parts = [
+            self.base[row] if row < self.base_rows else delta[row - self.base_rows]
+            for row in rows
+        ]
+        return sp.vstack(parts, format="csr")
+
+    def _scores(self, query_matrix):
+        """Dense (rows x queries) cosine similarities; rows are L2-normalized"""
+        parts = []
+        if self.base is not None and self.base_rows:
+            parts.append((self.base @ query_matrix.T).toarray())
+        if self._delta_rows:
+            parts.append((self._delta_matrix() @ query_matrix.T).toarray())
+        if not parts:
+            return np.zeros((0, query_matrix.shape[0]), dtype=np.float32)
+        return np.vstack(parts) if len(parts) > 1 else parts[0]
+
+    def _alive_mask(self):
+        alive = np.ones(len(self.names), dtype=bool)
+        if self._dead_rows:
+            alive[np.fromiter(self._dead_rows, dtype=np.int64, count=len(self._dead_rows))] = False
+        return alive
+
+    def related_batch(self, filenames: List[str], k: int = 5, chunk_size: int = 8) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Top-k most similar articles for several articles at once
+
+        The query rows are multiplied against the whole matrix in one sparse
+        product per chunk, so a batch costs about the same as a single query.
+
+        Args:
+            filenames: Articles to find related articles for (unknown names are skipped)
+            k: Number of related articles per query
+            chunk_size: Query rows per sparse product (bounds the dense result size)
+
+        Returns:
+            Dict mapping each known filename to a list of {'filename', 'score'}
+        """
+        _require_numeric()
+        with self._lock:
+            alive = self._alive_mask()
+            queries = [(name, self.row_of[name]) for name in filenames if name in self.row_of]
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            for start in range(0, len(queries), chunk_size):
+                chunk = queries[start:start + chunk_size]
+                # One sparse product per chunk: (N x F) @ (F x m) -> N x m
+                scores = self._scores(self._rows([row for _, row in chunk]))
+                scores[~alive, :] = -np.inf
+                for col, (name, row) in enumerate(chunk):
+                    column = scores[:, col]
+                    column[row] = -np.inf
+                    kk = min(k, int(np.count_nonzero(np.isfinite(column))))
+                    if kk <= 0:
+                        results[name] = []
+                        continue
+                    top = np.argpartition(-column, kk - 1)[:kk]
+                    top = top[np.argsort(-column[top])]
+                    results[name] = [
+                        {"filename": self.names[i], "score": round(float(column[i]), 4)}
+                        for i in top
+                        if column[i] > 0
+                    ]
+            return results
+
+    def related(self, filename: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Top-k most similar articles to one article
+
+        Raises:
+            KeyError: If the article isn't indexed
+        """
+        result = self.related_batch([filename], k)
+        if filename not in result:
+            raise KeyError(filename)
+        return result[filename]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self):
+        """
+        Merge the delta into a new base, drop removed rows and write it as a new
+        version directory; the CURRENT pointer is switched atomically.
+        """
+        _require_numeric()
+        with self._lock:
+            parts = []
+            if self.base is not None and self.base_rows:
+                parts.append(self.base)
+            if self._delta_rows:
+                parts.append(self._delta_matrix())
+            if not parts:
+                matrix = sp.csr_matrix((0, self.n_features), dtype=np.float32)
+            else:
+                matrix = sp.vstack(parts, format="csr") if len(parts) > 1 else parts[0]
+            alive = self._alive_mask()
+            keep = np.flatnonzero(alive)
+            merged = matrix[keep] if len(keep) != matrix.shape[0] else matrix
+            names = [self.names[i] for i in keep]
+            versions = [self.versions[i] for i in keep]
+            idf = self.idf
+            if idf is None or self.needs_reweight():
+                merged, idf = self._reweight(merged, idf)
+
+            version_dir = self.index_dir / f"v{time.time_ns()}"
+            version_dir.mkdir()
+            np.save(version_dir / "data.npy", np.asarray(merged.data, dtype=np.float32))
+            # scipy wants indices and indptr in one dtype; anything else forces a copy on load
+            index_dtype = np.int32 if merged.nnz < 2 ** 31 - 1 else np.int64
+            np.save(version_dir / "indices.npy", np.asarray(merged.indices, dtype=index_dtype))
+            np.save(version_dir / "indptr.npy", np.asarray(merged.indptr, dtype=index_dtype))
+            np.save(version_dir / "idf.npy", idf)
+            with open(version_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({"n_features": self.n_features, "names": names, "versions": versions}, f)
+
+            pointer_tmp = self.index_dir / "CURRENT.tmp"
+            pointer_tmp.write_text(version_dir.name)
+            os.replace(pointer_tmp, self.index_dir / "CURRENT")
+
+            # Old versions can go: open memory maps keep their inodes alive
+            for old in self.index_dir.glob("v*"):
+                if old.is_dir() and old.name != version_dir.name:
+                    shutil.rmtree(old, ignore_errors=True)
+
+            self._load_version(version_dir)
+
+    def _reweight(self, matrix, old_idf):
+        """Recompute IDF from the rows in the matrix and rescale them to it"""
+        n = matrix.shape[0]
+        df = np.bincount(np.asarray(matrix.indices), minlength=self.n_features)
+        idf = (np.log((1 + n) / (1 + df)) + 1.0).astype(np.float32)
+        scale = idf if old_idf is None else idf / old_idf
+        indices = np.asarray(matrix.indices)
+        data = np.asarray(matrix.data, dtype=np.float32) * scale[indices]
+        # Renormalize each row to unit length
+        lengths = np.diff(np.asarray(matrix.indptr))
+        rows = np.repeat(np.arange(n), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=data.astype(np.float64) ** 2, minlength=n))
+        norms[norms == 0] = 1.0
+        data /= norms[rows].astype(np.float32)
+        reweighted = sp.csr_matrix(
+            (data, indices.copy(), np.asarray(matrix.indptr).copy()),
+            shape=matrix.shape,
+        )
+        return reweighted, idf
+
+    def load(self) -> bool:
+        """
+        Memory-map the last saved version
+
+        Returns:
+            True if a saved index was found
+        """
+        _require_numeric()
+        pointer = self.index_dir / "CURRENT"
+        if not pointer.exists():
+            return False
+        version_dir = self.index_dir / pointer.read_text().strip()
+        if not version_dir.exists():
+            return False
+        with self._lock:
+            self._load_version(version_dir)
+        return True
+
+    def _load_version(self, version_dir: Path):
+        with open(version_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["n_features"] != self.n_features:
+            raise ValueError(
+                f"Saved similarity index uses {meta['n_features']} features, expected {self.n_features}"
+            )
+        data = np.load(version_dir / "data.npy", mmap_mode="r")
+        indices = np.load(version_dir / "indices.npy", mmap_mode="r")
+        indptr = np.load(version_dir / "indptr.npy", mmap_mode="r")
+        self.idf = np.load(version_dir / "idf.npy")
+        self.names = meta["names"]
+        self.versions = meta["versions"]
+        self.row_of = {name: i for i, name in enumerate(self.names)}
+        self.base_rows = len(self.names)
+        self._dead_rows = set()
+        # copy=False with matching dtypes wraps the memory maps instead of reading them into RAM
+        self.base = sp.csr_matrix(
+            (data, indices, indptr), shape=(self.base_rows, self.n_features), copy=False
+        )
+        self._delta_rows = []
+        self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "articles": len(self.row_of),
+                "base_rows": self.base_rows,
+                "delta_rows": len(self._delta_rows),
+                "n_features": self.n_features,
+                "needs_reweight": self.needs_reweight(),
+            }
+
+    def close(self):
+        """Save pending additions (call on shutdown)"""
+        with self._lock:
+            if self._delta_rows or len(self.row_of) != self.base_rows:
+                self.save()
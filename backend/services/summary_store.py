@@ -0,0 +1,236 @@
+"""
+Summary Store for persisting precomputed article summaries
+Backed by SQLite so summaries survive restarts
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SummaryStore:
+    """
+    Persistent store of ready-to-serve summaries, keyed by
+    (filename, topic, model). Each entry remembers the version of the source
+    file it was built from so changed files are re-summarized.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize summary store
+
+        Args:
+            db_path: Path of the SQLite database. Defaults to backend/cache/summaries.sqlite3
+        """
+        if db_path is None:
+            backend_dir = Path(__file__).parent.parent
+            db_path = str(backend_dir / "cache" / "summaries.sqlite3")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                topic TEXT NOT NULL DEFAULT '',
+                model TEXT NOT NULL,
+                source_version TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                images TEXT,
+                image_stats TEXT,
+                created_at REAL NOT NULL,
+                UNIQUE (filename, topic, model)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_topic_model ON summaries (topic, model, id)"
+        )
+        # Failed summarization attempts, so a file that keeps failing is retried with backoff
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS failures (
+                filename TEXT NOT NULL,
+                topic TEXT NOT NULL DEFAULT '',
+                model TEXT NOT NULL,
+                source_version TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (filename, topic, model)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def source_version(path: Path) -> str:
+        """Cheap version stamp of a source file (size and mtime, same as CatalogEntry.version)"""
+        stat = path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "filename": row["filename"],
+            "topic": row["topic"] or None,
+            "model": row["model"],
+            "source_version": row["source_version"],
+            "summary": row["summary"],
+            "images": json.loads(row["images"]) if row["images"] else None,
+            "image_stats": json.loads(row["image_stats"]) if row["image_stats"] else None,
+            "created_at": row["created_at"],
+        }
+
+    def put(
+        self,
+        filename: str,
+        model: str,
+        source_version: str,
+        summary: str,
+        topic: Optional[str] = None,
+        images: Optional[List[Dict]] = None,
+        image_stats: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Insert or replace the summary for a file
+
+        Args:
+            filename: Article filename in the data directory
+            model: Model that produced the summary
+            source_version: Version stamp of the source file (see source_version)
+            summary: Summary text
+            topic: Topic the summary was generated for (None for the default summary)
+            images: Processed images to serve alongside the summary
+            image_stats: Image processing stats
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO summaries
+                    (filename, topic, model, source_version, summary, images, image_stats, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (filename, topic, model) DO UPDATE SET
+                    source_version = excluded.source_version,
+                    summary = excluded.summary,
+                    images = excluded.images,
+                    image_stats = excluded.image_stats,
+                    created_at = excluded.created_at
+                """,
+                (
+                    filename,
+                    topic or "",
+                    model,
+                    source_version,
+                    summary,
+                    json.dumps(images) if images is not None else None,
+                    json.dumps(image_stats) if image_stats is not None else None,
+                    time.time(),
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM failures WHERE filename = ? AND topic = ? AND model = ?",
+                (filename, topic or "", model),
+            )
+            self._conn.commit()
+
+    def get(self, filename: str, model: str, topic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the stored summary for a file, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM summaries WHERE filename = ? AND topic = ? AND model = ?",
+                (filename, topic or "", model),
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def is_current(self, filename: str, model: str, source_version: str, topic: Optional[str] = None) -> bool:
+        """Check whether a summary exists and was built from this version of the file"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source_version FROM summaries WHERE filename = ? AND topic = ? AND model = ?",
+                (filename, topic or "", model),
+            ).fetchone()
+        return row is not None and row["source_version"] == source_version
+
+    def record_failure(
+        self,
+        filename: str,
+        model: str,
+        source_version: str,
+        error: str,
+        topic: Optional[str] = None,
+        retry_base: float = 300.0,
+        retry_max: float = 86400.0,
+    ) -> int:
+        """
+        Record a failed attempt to summarize a file and schedule the next one,
+        retry_base seconds later and doubling per attempt up to retry_max. A
+        new version of the file starts counting again.
+
+        Returns:
+            Attempts so far for this version of the file
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source_version, attempts FROM failures WHERE filename = ? AND topic = ? AND model = ?",
+                (filename, topic or "", model),
+            ).fetchone()
+            attempts = row["attempts"] + 1 if row is not None and row["source_version"] == source_version else 1
+            backoff = min(retry_base * 2 ** (attempts - 1), retry_max)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO failures
+                    (filename, topic, model, source_version, attempts, next_attempt, last_error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (filename, topic or "", model, source_version, attempts, now + backoff, error[:500], now),
+            )
+            self._conn.commit()
+        return attempts
+
+    def failures(self, model: str) -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+        """Recorded failures for a model: (filename, topic) -> source_version, attempts, next_attempt"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, topic, source_version, attempts, next_attempt FROM failures WHERE model = ?",
+                (model,),
+            ).fetchall()
+        return {
+            (row["filename"], row["topic"] or None): {
+                "source_version": row["source_version"],
+                "attempts": row["attempts"],
+                "next_attempt": row["next_attempt"],
+            }
+            for row in rows
+        }
+
+    def delete(self, filename: str):
+        """Remove every stored summary (and recorded failure) for a file"""
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries WHERE filename = ?", (filename,))
+            self._conn.execute("DELETE FROM failures WHERE filename = ?", (filename,))
+            self._conn.commit()
+
+    def count(self, model: Optional[str] = None, topic: Optional[str] = None) -> int:
+        """Number of stored summaries, optionally for one model/topic"""
+        query = "SELECT COUNT(*) FROM summaries"
+        params: List[Any] = []
+        if model is not None:
+            query += " WHERE model = ? AND topic = ?"
+            params = [model, topic or ""]
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,167 @@
+"""
+Text Normalizer for extracted PDF text
+Removes layout noise (hyphenation, hard wraps, running headers, page numbers,
+math and table fragments) before text is sent to the LLM
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from services.paper_structure import is_heading_line
+
+_LIGATURES = str.maketrans({
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+    "\u00ad": None,  # soft hyphen
+    "\u00a0": " ",  # no-break space
+    "\u2009": " ",  # thin space
+    "\u200b": None,  # zero-width space
+})
+_LIGATURE_CHARS = re.compile("[\ufb00-\ufb06\u00ad\u00a0\u2009\u200b]")
+_PAGE_NUMBER = re.compile(r"^(?:page\s+)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?$", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"[ \t]+")
+_HYPHEN_END = re.compile(r"[A-Za-z]-$")
+_SENTENCE_END = (".", "!", "?", ":", ";")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (about four characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def _edge_key(line: str) -> str:
+    # Running headers differ only in page numbers ("Page 3", "3 / 12")
+    return _DIGITS.sub("#", line.lower())
+
+
+def _is_non_prose(line: str) -> bool:
+    """Math fragments, table rows and other lines that are mostly not words"""
+    if len(line) <= 2:
+        return True
+    letters = sum(1 for ch in line if ch.isalpha())
+    visible = sum(1 for ch in line if not ch.isspace())
+    return visible >= 4 and letters / visible < 0.4
+
+
+def normalize_pages(pages: List[str]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Normalize the extracted text of a document's pages
+
+    Steps, all linear in the text size:
+    - fix ligatures, soft hyphens and odd spaces
+    - drop running headers/footers (lines at the top or bottom of many pages,
+      compared with digits masked) and bare page numbers
+    - drop non-prose lines (mostly symbols/digits, or 1-2 characters)
+    - join words hyphenated across line breaks and unwrap hard-wrapped lines,
+      keeping paragraph breaks and heading lines
+
+    Args:
+        pages: Extracted text of each page, in order
+
+    Returns:
+        Tuple of (normalized page texts, stats). Stats include characters and
+        estimated tokens before/after and counts of each kind of removal.
+    """
+    stats = {
+        "chars_before": sum(len(p) for p in pages),
+        "ligatures_fixed": 0,
+        "header_footer_lines": 0,
+        "page_number_lines": 0,
+        "non_prose_lines": 0,
+        "hyphenations_joined": 0,
+        "lines_unwrapped": 0,
+    }
+    stats["tokens_before"] = sum(estimate_tokens(p) for p in pages)
+
+    page_lines: List[List[str]] = []
+    for page in pages:
+        if _LIGATURE_CHARS.search(page):
+            stats["ligatures_fixed"] += len(_LIGATURE_CHARS.findall(page))
+            page = page.translate(_LIGATURES)
+        page_lines.append([_SPACES.sub(" ", line).strip() for line in page.split("\n")])
+
+    # Count candidate header/footer lines: the first and last two non-empty lines of each page
+    edge_counts: Counter = Counter()
+    for lines in page_lines:
+        non_empty = [line for line in lines if line]
+        edges = set(non_empty[:2] + non_empty[-2:])
+        edge_counts.update({_edge_key(line) for line in edges})
+    threshold = max(2, int(len(pages) * 0.4 + 0.5))
+    repeated = set()
+    if len(pages) >= 3:
+        # Long lines are body text even if they recur (e.g. a repeated figure caption)
+        repeated = {key for key, count in edge_counts.items() if count >= threshold and len(key) <= 100}
+
+    normalized_pages = []
+    for lines in page_lines:
+        non_empty_positions = [i for i, line in enumerate(lines) if line]
+        edge_positions = set(non_empty_positions[:2] + non_empty_positions[-2:])
+        kept: List[str] = []
+        for i, line in enumerate(lines):
+            if not line:
+                kept.append("")
+                continue
+            if i in edge_positions:
+                if _PAGE_NUMBER.match(line):
+                    stats["page_number_lines"] += 1
+                    continue
+                if _edge_key(line) in repeated:
+                    stats["header_footer_lines"] += 1
+                    continue
+            if _is_non_prose(line):
+                stats["non_prose_lines"] += 1
+                continue
+            kept.append(line)
+        normalized_pages.append(_unwrap(kept, stats))
+
+    stats["chars_after"] = sum(len(p) for p in normalized_pages)
+    stats["tokens_after"] = sum(estimate_tokens(p) for p in normalized_pages)
+    stats["chars_removed"] = stats["chars_before"] - stats["chars_after"]
+    stats["tokens_removed"] = stats["tokens_before"] - stats["tokens_after"]
+    return normalized_pages, stats
+
+
+def _unwrap(lines: List[str], stats: Dict[str, int]) -> str:
+    """Join hard-wrapped lines into paragraphs; empty lines and headings break paragraphs"""
+    paragraphs: List[str] = []
+    current: List[str] = []
+    previous = ""
+    for line in lines:
+        if not line:
+            if current:
+                paragraphs.append("".join(current))
+                current = []
+            continue
+        if not current:
+            current = [line]
+        elif is_heading_line(line) or is_heading_line(previous):
+            paragraphs.append("".join(current))
+            current = [line]
+        elif _HYPHEN_END.search(previous) and line[0].islower():
+            current[-1] = current[-1][:-1]
+            current.append(line)
+            stats["hyphenations_joined"] += 1
+        elif previous.endswith(_SENTENCE_END) and line[0].isupper() and len(previous) < 40:
+            # A short line ending a sentence is most likely the end of a paragraph
+            paragraphs.append("".join(current))
+            current = [line]
+        else:
+            current.append(" " + line)
+            stats["lines_unwrapped"] += 1
+        previous = line
+    if current:
+        paragraphs.append("".join(current))
+    return "\n".join(paragraphs)
+
+
+def normalize_text(pages: List[str]) -> Tuple[str, Dict[str, int]]:
+    """Normalize a document's pages and join them into one text (see normalize_pages)"""
+    normalized, stats = normalize_pages(pages)
+    return "\n\n".join(p for p in normalized if p).strip(), stats
@@ -0,0 +1,258 @@
+"""
+Upload Service for receiving user documents
+Streams multipart uploads to disk in chunks, enforcing size and type limits
+"""
+
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+# python-multipart renamed its import package in 0.0.13
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    MULTIPART_AVAILABLE = True
+except ImportError:
+    try:
+        from multipart.multipart import MultipartParser, parse_options_header
+        MULTIPART_AVAILABLE = True
+    except ImportError:
+        MULTIPART_AVAILABLE = False
+        MultipartParser = None
+        parse_options_header = None
+
+
+class UploadError(ValueError):
+    """The upload is malformed or of an unsupported type (HTTP 400/415)"""
+
+
+class UploadTooLarge(UploadError):
+    """The upload exceeds the configured size limit (HTTP 413)"""
+
+
+class _PartState:
+    """Parser state for the multipart part currently being read"""
+
+    def __init__(self):
+        self.header_field = b""
+        self.header_value = b""
+        self.headers: Dict[bytes, bytes] = {}
+        self.name: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.value = bytearray()  # small form fields only
+
+
+class UploadService:
+    """
+    Receives a multipart/form-data body as it arrives and writes the file part
+    straight to disk.
+
+    Only a bounded write buffer is held in memory; the file is written to a
+    .part file and renamed into place once the upload is complete, so readers
+    never see a partial file.
+    """
+
+    SIGNATURES = {".pdf": b"%PDF-"}
+
+    def __init__(
+        self,
+        upload_dir: Optional[str] = None,
+        max_bytes: int = 50 * 1024 * 1024,
+        allowed_extensions: Tuple[str, ...] = (".pdf", ".txt"),
+        max_field_bytes: int = 4096,
+        flush_bytes: int = 1024 * 1024,
+    ):
+        """
+        Initialize upload service
+
+        Args:
+            upload_dir: Where uploaded files are written. Defaults to backend/uploads
+            max_bytes: Maximum size of the uploaded file
+            allowed_extensions: Accepted file extensions
+            max_field_bytes: Maximum size of each non-file form field
+            flush_bytes: Buffered bytes that trigger a write to disk
+        """
+        if upload_dir is None:
+            upload_dir = str(Path(__file__).parent.parent / "uploads")
+        self.upload_dir = Path(upload_dir)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.allowed_extensions = tuple(ext.lower() for ext in allowed_extensions)
+        self.max_field_bytes = max_field_bytes
+        self.flush_bytes = flush_bytes
+
+    async def receive(
+        self,
+        content_type: str,
+        content_length: Optional[int],
+        body: AsyncIterator[bytes],
+        run_io: Callable[..., Awaitable[Any]],
+        file_field: str = "file",
+    ) -> Dict[str, Any]:
+        """
+        Stream a multipart body to disk
+
+        Args:
+            content_type: The request's Content-Type header
+            content_length: The request's Content-Length, if sent
+            body: Async iterator over the raw request body (e.g. request.stream())
+            run_io: Coroutine function used to run blocking file writes
+            file_field: Name of the form field holding the file
+
+        Returns:
+            Dict with 'path', 'filename' (as sent by the client), 'bytes' and
+            'fields' (the other form fields as strings)
+
+        Raises:
+            UploadTooLarge: If the file is larger than max_bytes
+            UploadError: If the body is malformed or the file type isn't allowed
+        """
+        if not MULTIPART_AVAILABLE:
+            raise ImportError(
+                "python-multipart is not installed. Please install it with: pip install python-multipart"
+            )
+        ctype, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if ctype != b"multipart/form-data" or not boundary:
+            raise UploadError("Expected a multipart/form-data body")
+        if content_length is not None and content_length > self.max_bytes + 64 * 1024:
+            # Allow some room for the multipart framing around the file
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+
+        fields: Dict[str, str] = {}
+        state = {"part": None, "file": None, "errors": []}
+        pending = bytearray()
+        written = {"bytes": 0}
+        result: Dict[str, Any] = {}
+
+        def on_part_begin():
+            state["part"] = _PartState()
+
+        def on_header_field(data, start, end):
+            part = state["part"]
+            if part.header_value:
+                part.header_field = b""
+                part.header_value = b""
+            part.header_field += data[start:end]
+
+        def on_header_value(data, start, end):
+            state["part"].header_value += data[start:end]
+
+        def on_header_end():
+            part = state["part"]
+            part.headers[part.header_field.lower()] = part.header_value
+            part.header_field = b""
+            part.header_value = b""
+
+        def on_headers_finished():
+            part = state["part"]
+            _, disposition = parse_options_header(part.headers.get(b"content-disposition", b""))
+            part.name = disposition.get(b"name", b"").decode("utf-8", "replace")
+            if b"filename" in disposition:
+                part.filename = Path(disposition[b"filename"].decode("utf-8", "replace")).name
+            if part.name == file_field and part.filename is not None:
+                suffix = Path(part.filename).suffix.lower()
+                if suffix not in self.allowed_extensions:
+                    state["errors"].append(
+                        UploadError(f"Unsupported file type '{suffix}'. Allowed: {', '.join(self.allowed_extensions)}")
+                    )
+                    return
+                if state["file"] is not None:
+                    state["errors"].append(UploadError("Only one file per upload"))
+                    return
+                path = self.upload_dir / f"{uuid.uuid4().hex}{suffix}"
+                state["file"] = {"path": path, "tmp": path.with_name(path.name + ".part"), "name": part.filename}
+                result["filename"] = part.filename
+
+        def on_part_data(data, start, end):
+            part = state["part"]
+            if part.name == file_field and part.filename is not None:
+                if state["errors"]:
+                    return
+                written["bytes"] += end - start
+                if written["bytes"] > self.max_bytes:
+                    state["errors"].append(UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes"))
+                    return
+                pending.extend(data[start:end])
+            else:
+                part.value.extend(data[start:end])
+                if len(part.value) > self.max_field_bytes:
+                    state["errors"].append(UploadError(f"Form field '{part.name}' is too large"))
+
+        def on_part_end():
+            part = state["part"]
+            if part is not None and part.filename is None and part.name:
+                fields[part.name] = part.value.decode("utf-8", "replace")
+
+        parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": on_part_begin,
+                "on_header_field": on_header_field,
+                "on_header_value": on_header_value,
+                "on_header_end": on_header_end,
+                "on_headers_finished": on_headers_finished,
+                "on_part_data": on_part_data,
+                "on_part_end": on_part_end,
+            },
+        )
+
+        handle = None
+        checked_signature = False
+        try:
+            async for chunk in body:
+                parser.write(chunk)
+                if state["errors"]:
+                    raise state["errors"][0]
+                if state["file"] is not None and handle is None:
+                    handle = await run_io(open, state["file"]["tmp"], "wb")
+                if not checked_signature and state["file"] is not None and len(pending) >= 8:
+                    self._check_signature(state["file"]["path"].suffix, bytes(pending[:8]))
+                    checked_signature = True
+                if len(pending) >= self.flush_bytes:
+                    data = bytes(pending)
+                    pending.clear()
+                    await run_io(handle.write, data)
+            parser.finalize()
+            if state["errors"]:
+                raise state["errors"][0]
+            if state["file"] is None:
+                raise UploadError(f"No file found in form field '{file_field}'")
+            if handle is None:
+                handle = await run_io(open, state["file"]["tmp"], "wb")
+            if not checked_signature:
+                self._check_signature(state["file"]["path"].suffix, bytes(pending[:8]))
+            if pending:
+                await run_io(handle.write, bytes(pending))
+                pending.clear()
+            await run_io(handle.close)
+            handle = None
+            if written["bytes"] == 0:
+                raise UploadError("The uploaded file is empty")
+            await run_io(os.replace, state["file"]["tmp"], state["file"]["path"])
+        except BaseException:
+            # Clean up synchronously: this also runs when the request is cancelled
+            if handle is not None:
+                handle.close()
+            if state["file"] is not None:
+                self._unlink(state["file"]["tmp"])
+            raise
+
+        result.update({"path": state["file"]["path"], "bytes": written["bytes"], "fields": fields})
+        return result
+
+    def _check_signature(self, suffix: str, head: bytes):
+        signature = self.SIGNATURES.get(suffix)
+        if signature is not None and not head.startswith(signature):
+            raise UploadError(f"File content does not look like a {suffix} file")
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def discard(self, path: Path):
+        """Delete an uploaded file once it has been processed"""
+        self._unlink(Path(path))
@@ -0,0 +1,438 @@
+"""
+Bulk arXiv metadata ingestion
+Pulls titles, abstracts, authors, categories and dates from arXiv's export
+API (Atom) or its OAI-PMH feed, hundreds of records per response, instead of
+one list page plus one abstract page per paper. Responses are parsed with a
+streaming XML parser as they arrive.
+"""
+
+import os
+import re
+import asyncio
+import calendar
+import contextlib
+import xml.etree.ElementTree as ET
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlparse
+
+from scraper import USER_AGENT, save_abstract
+from async_crawler import THROTTLE_STATUSES, TokenBucket, _retry_after
+from services.crawl_ledger import listing_key
+from services.lazy_import import LazyModule
+
+httpx = LazyModule("httpx")
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ARXIV_OAI_URL = "https://oaipmh.arxiv.org/oai"
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV_ATOM = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+OAI = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_OAI = "{http://arxiv.org/OAI/arXiv/}"
+
+# Archives whose OAI-PMH set sits under "physics:" (e.g. physics:astro-ph)
+PHYSICS_ARCHIVES = {
+    "astro-ph", "cond-mat", "gr-qc", "hep-ex", "hep-lat", "hep-ph", "hep-th",
+    "math-ph", "nlin", "nucl-ex", "nucl-th", "physics", "quant-ph",
+}
+
+_VERSION = re.compile(r"v\d+$")
+
+
+def _text(elem) -> str:
+    """Element text with whitespace (including line wraps) collapsed"""
+    if elem is None or elem.text is None:
+        return ""
+    return " ".join(elem.text.split())
+
+
+def api_query_url(subject, year, month, start, max_results, api_url=ARXIV_API_URL):
+    """
+    Export API query for a subject, newest first: the month's submissions, or
+    all of them if year/month are None. A bare archive ('cs') matches all of
+    its categories (cs.AI, cs.LG, ...).
+    """
+    query = f"cat:{subject}" if "." in subject else f"cat:{subject} OR cat:{subject}.*"
+    if year is not None and month is not None:
+        last_day = calendar.monthrange(year, month)[1]
+        query = f"({query}) AND submittedDate:[{year:04d}{month:02d}010000 TO {year:04d}{month:02d}{last_day:02d}2359]"
+    return f"{api_url}?" + urlencode({
+        "search_query": query,
+        "sortBy": "submittedDate",
+        "sortOrder": "descending",
+        "start": start,
+        "max_results": max_results,
+    })
+
+
+def oai_set(subject: str) -> str:
+    """OAI-PMH set holding a subject ('cs.LG' -> 'cs', 'astro-ph' -> 'physics:astro-ph')"""
+    archive = subject.split(".")[0]
+    return f"physics:{archive}" if archive in PHYSICS_ARCHIVES else archive
+
+
+def oai_list_url(subject, year, month, resumption_token=None, oai_url=ARXIV_OAI_URL, recent_days=7):
+    """
+    ListRecords request: records updated in the given month, or in the last
+    recent_days days if year/month are None. A resumption token replaces all
+    other arguments, as OAI-PMH requires.
+    """
+    if resumption_token:
+        return f"{oai_url}?" + urlencode({"verb": "ListRecords", "resumptionToken": resumption_token})
+    if year is not None and month is not None:
+        since = date(year, month, 1)
+        until = date(year, month, calendar.monthrange(year, month)[1])
+    else:
+        until = date.today()
+        since = until - timedelta(days=recent_days)
+    return f"{oai_url}?" + urlencode({
+        "verb": "ListRecords",
+        "metadataPrefix": "arXiv",
+        "set": oai_set(subject),
+        "from": since.isoformat(),
+        "until": until.isoformat(),
+    })
+
+
+def parse_atom_entry(entry) -> Optional[Dict[str, Any]]:
+    """Record dict from an export API <entry>; raises on the API's error entries"""
+    entry_id = _text(entry.find(f"{ATOM}id"))
+    if "/api/errors" in entry_id:
+        raise RuntimeError(f"arXiv API error: {_text(entry.find(f'{ATOM}summary'))}")
+    arxiv_id = _VERSION.sub("", entry_id.split("/abs/")[-1])
+    if not arxiv_id:
+        return None
+    categories = [c.get("term") for c in entry.findall(f"{ATOM}category") if c.get("term")]
+    primary = entry.find(f"{ARXIV_ATOM}primary_category")
+    if primary is not None and primary.get("term") in categories:
+        categories.remove(primary.get("term"))
+        categories.insert(0, primary.get("term"))
+    return {
+        "arxiv_id": arxiv_id,
+        "title": _text(entry.find(f"{ATOM}title")),
+        "abstract": _text(entry.find(f"{ATOM}summary")),
+        "authors": [_text(a.find(f"{ATOM}name")) for a in entry.findall(f"{ATOM}author")],
+        "categories": categories,
+        "published": _text(entry.find(f"{ATOM}published"))[:10] or None,
+    }
+
+
+def parse_oai_record(record) -> Optional[Dict[str, Any]]:
+    """Record dict from an OAI-PMH <record> in the arXiv metadata format; None for deleted records"""
+    header = record.find(f"{OAI}header")
+    if header is not None and header.get("status") == "deleted":
+        return None
+    meta = record.find(f"{OAI}metadata/{ARXIV_OAI}arXiv")
+    if meta is None:
+        return None
+    authors = []
+    for author in meta.findall(f"{ARXIV_OAI}authors/{ARXIV_OAI}author"):
+        name = " ".join(
+            part for part in (
+                _text(author.find(f"{ARXIV_OAI}forenames")),
+                _text(author.find(f"{ARXIV_OAI}keyname")),
+                _text(author.find(f"{ARXIV_OAI}suffix")),
+            ) if part
+        )
+        if name:
+            authors.append(name)
+    return {
+        "arxiv_id": _text(meta.find(f"{ARXIV_OAI}id")),
+        "title": _text(meta.find(f"{ARXIV_OAI}title")),
+        "abstract": _text(meta.find(f"{ARXIV_OAI}abstract")),
+        "authors": authors,
+        "categories": _text(meta.find(f"{ARXIV_OAI}categories")).split(),
+        "published": _text(meta.find(f"{ARXIV_OAI}created")) or None,
+    }
+
+
+def save_records(records, subject, data_dir, store=None, on_saved=None, ledger=None, listing=None) -> List[Dict]:
+    """
+    Save parsed records like save_abstract, in one corpus store transaction
+    when a store is given, and record them as fetched in the crawl ledger if
+    one is given. on_saved gets each saved item.
+
+    Returns:
+        List of dicts with 'id', 'title', 'filename', 'subject', 'authors',
+        'categories' and 'published'
+    """
+    import logging
+    logger = logging.getLogger("uvicorn")
+
+    if store is not None:
+        filenames = store.put_many([{**r, "subject": subject} for r in records])
+    else:
+        filenames = [save_abstract(r["arxiv_id"], r["title"], r["abstract"], subject, data_dir) for r in records]
+    if ledger is not None:
+        ledger.record_fetched(listing, [(r["arxiv_id"], filename) for r, filename in zip(records, filenames)])
+    items = [
+        {
+            "id": r["arxiv_id"],
+            "title": r["title"],
+            "filename": filename,
+            "subject": subject,
+            "authors": r["authors"],
+            "categories": r["categories"],
+            "published": r["published"],
+        }
+        for r, filename in zip(records, filenames)
+    ]
+    if on_saved:
+        for item in items:
+            try:
+                on_saved(item)
+            except Exception as e:
+                logger.warning(f"on_saved failed for {item['filename']}: {e}")
+    return items
+
+
+class ArxivExporter:
+    """
+    Bulk ingestion from the export API ('api') or OAI-PMH ('oai'). Each
+    response carries up to page_size (API) or ~1000 (OAI) records and is
+    parsed element by element while it downloads; records are saved in
+    batches off the event loop while the next ones stream in. arXiv asks for
+    one request every 3 seconds on these endpoints, enforced by a token
+    bucket per host.
+    """
+
+    def __init__(
+        self,
+        api_url: str = ARXIV_API_URL,
+        oai_url: str = ARXIV_OAI_URL,
+        page_size: int = 200,
+        delay: float = 3.0,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        save_batch: int = 100,
+        run_io: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        """
+        Initialize arXiv exporter
+
+        Args:
+            api_url: Export API query endpoint (a local stand-in for benchmarks)
+            oai_url: OAI-PMH endpoint
+            page_size: Records per export API request (arXiv allows up to 2000)
+            delay: Seconds between requests to a host (0 for no limit)
+            timeout: Seconds per HTTP request
+            max_retries: Retries of a request answered with 429 or 503 (OAI-PMH
+                         flow control answers 503 with Retry-After)
+            save_batch: Records saved per run_io call
+            run_io: Coroutine function running blocking calls (saves, callbacks)
+                    off the event loop; defaults to asyncio.to_thread
+        """
+        self.api_url = api_url
+        self.oai_url = oai_url
+        self.page_size = max(1, min(page_size, 2000))
+        self.delay = delay
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.save_batch = max(1, save_batch)
+        self.run_io = run_io or asyncio.to_thread
+        self._client = None
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.requests = 0
+        self.retries = 0
+        self.records = 0
+        self.bytes_received = 0
+
+    @property
+    def client(self):
+        """HTTP client, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the HTTP client (call from the app lifespan)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(1 / self.delay if self.delay > 0 else 0, 1)
+        return bucket
+
+    async def iter_elements(self, url: str, tags) -> AsyncIterator:
+        """
+        GET a URL politely and yield each completed element whose tag is in
+        tags while the body is still downloading. Yielded elements are cleared
+        once the consumer moves on, so memory stays flat on large responses.
+        """
+        bucket = self._bucket(url)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            self.requests += 1
+            async with self.client.stream("GET", url) as response:
+                if response.status_code in THROTTLE_STATUSES and attempt < self.max_retries:
+                    self.retries += 1
+                    bucket.pause(_retry_after(response, default=self.delay * (attempt + 2)))
+                    continue
+                response.raise_for_status()
+                parser = ET.XMLPullParser(events=("end",))
+                async for chunk in response.aiter_bytes():
+                    self.bytes_received += len(chunk)
+                    parser.feed(chunk)
+                    for _, elem in parser.read_events():
+                        if elem.tag in tags:
+                            yield elem
+                            elem.clear()
+                parser.close()
+                for _, elem in parser.read_events():
+                    if elem.tag in tags:
+                        yield elem
+                        elem.clear()
+            return
+
+    async def iter_api_records(self, subject, year, month, max_papers) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Records from the export API, newest first, paging with start/max_results
+        until the consumer stops. The first page holds max_papers records; later
+        ones (needed when records are skipped) hold page_size.
+        """
+        start = 0
+        while True:
+            url = api_query_url(subject, year, month, start, min(self.page_size, max_papers) if not start else self.page_size,
+                                self.api_url)
+            entries = 0
+            total = None
+            async with contextlib.aclosing(self.iter_elements(url, (f"{ATOM}entry", f"{OPENSEARCH}totalResults"))) as elements:
+                async for elem in elements:
+                    if elem.tag == f"{OPENSEARCH}totalResults":
+                        total = int(_text(elem) or 0)
+                        continue
+                    entries += 1
+                    record = parse_atom_entry(elem)
+                    if record:
+                        yield record
+            start += entries
+            if not entries or (total is not None and start >= total):
+                return
+
+    async def iter_oai_records(self, subject, year, month) -> AsyncIterator[Dict[str, Any]]:
+        """Records from OAI-PMH ListRecords, following resumption tokens until the list ends"""
+        token = None
+        while True:
+            url = oai_list_url(subject, year, month, token, self.oai_url)
+            token = None
+            tags = (f"{OAI}record", f"{OAI}resumptionToken", f"{OAI}error")
+            async with contextlib.aclosing(self.iter_elements(url, tags)) as elements:
+                async for elem in elements:
+                    if elem.tag == f"{OAI}resumptionToken":
+                        token = _text(elem) or None
+                    elif elem.tag == f"{OAI}error":
+                        if elem.get("code") == "noRecordsMatch":
+                            return
+                        raise RuntimeError(f"OAI-PMH error {elem.get('code')}: {_text(elem)}")
+                    else:
+                        record = parse_oai_record(elem)
+                        # A set holds a whole archive; keep only the requested category
+                        if record and ("." not in subject or subject in record["categories"]):
+                            yield record
+            if not token:
+                return
+
+    async def fetch_arxiv_abstracts_bulk(
+        self,
+        subject: str,
+        year: Optional[int],
+        month: Optional[int],
+        max_papers: int,
+        data_dir: str,
+        source: str = "api",
+        on_saved: Optional[Callable[[Dict], None]] = None,
+        store=None,
+        ledger=None,
+        on_item: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    ) -> List[Dict]:
+        """
+        Fetch up to max_papers abstracts from the export API ('api') or OAI-PMH
+        ('oai') and save them like HTMLpull.fetch_arxiv_abstracts_bulk: one
+        {arxiv_id}_abstract.txt per paper in data_dir, or in the corpus store
+        if given. on_saved (a blocking callable, run via run_io) gets each
+        result right after it is saved. With a crawl ledger, records already
+        fetched are skipped and don't count toward max_papers. on_item (a
+        coroutine function) is awaited with each saved result plus its
+        'abstract'; while it blocks, streaming waits (at most one batch ahead).
+
+        Returns:
+            List of dicts with 'id', 'title', 'filename', 'subject', 'authors',
+            'categories' and 'published', in feed order
+        """
+        if source == "api":
+            records = self.iter_api_records(subject, year, month, max_papers)
+        elif source == "oai":
+            records = self.iter_oai_records(subject, year, month)
+        else:
+            raise ValueError(f"Unknown arXiv export source: {source}")
+
+        await self.run_io(os.makedirs, data_dir, exist_ok=True)
+        listing = f"{source}:{listing_key(subject, year, month)}"
+        seen = set()
+        admitted = 0
+        batch: List[Dict[str, Any]] = []
+        saves: List[asyncio.Task] = []
+
+        async def flush():
+            # Saving runs in the I/O pool while the next records stream in
+            nonlocal admitted
+            records = list(batch)
+            batch.clear()
+            if ledger is not None:
+                fetched = await self.run_io(ledger.fetched, [r["arxiv_id"] for r in records])
+                records = [r for r in records if r["arxiv_id"] not in fetched]
+            records = records[:max_papers - admitted]
+            admitted += len(records)
+            if records:
+                if on_item and saves:
+                    await saves[-1]  # backpressure: the previous batch must be taken first
+                saves.append(asyncio.create_task(save_and_forward(records)))
+
+        async def save_and_forward(records):
+            items = await self.run_io(save_records, records, subject, data_dir, store, on_saved, ledger, listing)
+            if on_item:
+                for item, record in zip(items, records):
+                    await on_item({**item, "abstract": record["abstract"]})
+            return items
+
+        try:
+            async with contextlib.aclosing(records):
+                async for record in records:
+                    if not record["abstract"] or record["arxiv_id"] in seen:
+                        continue
+                    seen.add(record["arxiv_id"])
+                    self.records += 1
+                    batch.append(record)
+                    if len(batch) >= min(self.save_batch, max_papers - admitted):
+                        await flush()
+                    if admitted >= max_papers:
+                        break
+            if batch:
+                await flush()
+            saved = await asyncio.gather(*saves)
+        finally:
+            # Also runs when the caller is cancelled (e.g. the client disconnected)
+            for task in saves:
+                task.cancel()
+        return [item for items in saved for item in items]
+
+    def stats(self) -> Dict[str, Any]:
+        """Request and record counts, and time spent waiting on the per-host rate limits"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "records": self.records,
+            "bytes_received": self.bytes_received,
+            "rate_limit_wait_seconds": {host: round(bucket.waited, 3) for host, bucket in self._buckets.items()},
+        }
@@ -0,0 +1,122 @@
+"""
+Targeted arXiv HTML extraction
+Pulls the title, abstract and abstract links out of arXiv pages without
+building a full BeautifulSoup tree: a regex scan of the tags that matter
+first (citation_* meta tags, abstract links), then lxml or a SoupStrainer
+limited to <title> and <blockquote>. Each function returns None when it
+can't find what it needs, so the caller falls through to the next one.
+"""
+
+import re
+from html import unescape
+from typing import Dict, List, Optional, Tuple
+
+from services.lazy_import import LazyModule, is_available
+
+lxml_html = LazyModule("lxml.html")
+LXML_AVAILABLE = is_available(lxml_html)
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+_META = re.compile(r"<meta\b[^>]*>", re.I)
+_ANCHOR = re.compile(r"<a\b[^>]*>", re.I)
+_ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_ARXIV_ID = re.compile(r"^[\d.]+\w*$")
+_DESCRIPTOR = re.compile(r"^Abstract:\s*")
+
+# How many pages each path parsed, to check the fast paths are taken
+parse_counts: Dict[str, int] = {"meta": 0, "lxml": 0, "strainer": 0, "soup": 0, "anchors": 0, "soup_links": 0}
+
+
+def _attrs(tag: str) -> Dict[str, str]:
+    """Attributes of one start tag, names lowercased, values unescaped"""
+    return {
+        name.lower(): unescape(next(v for v in values if v is not None))
+        for name, *values in _ATTR.findall(tag)
+    }
+
+
+def clean_abstract(text: str) -> str:
+    """Abstract text without the 'Abstract:' label arXiv puts in front of it"""
+    return _DESCRIPTOR.sub("", text.strip())
+
+
+def abstract_from_meta(html: str) -> Optional[Dict[str, str]]:
+    """
+    Fast path: the <title> and citation_abstract meta tag, both in <head>.
+    Only the head is scanned; None if the page has no citation_abstract.
+    """
+    end = html.find("</head>")
+    head = html if end < 0 else html[:end]
+    abstract = None
+    for tag in _META.findall(head):
+        if "citation_abstract" in tag:
+            attrs = _attrs(tag)
+            if attrs.get("name") == "citation_abstract" and attrs.get("content"):
+                abstract = attrs["content"]
+                break
+    if not abstract:
+        return None
+    match = _TITLE.search(head)
+    parse_counts["meta"] += 1
+    return {
+        "title": unescape(match.group(1)) if match else "",
+        "abstract": clean_abstract(abstract),
+    }
+
+
+def abstract_from_lxml(html: str) -> Optional[Dict[str, str]]:
+    """<title> and the abstract <blockquote> via lxml (C parser, XPath straight to the two elements)"""
+    if not LXML_AVAILABLE:
+        return None
+    tree = lxml_html.document_fromstring(html)
+    blockquotes = tree.xpath("//blockquote[contains(concat(' ', @class, ' '), ' abstract ')]") or tree.xpath("//blockquote")
+    if not blockquotes:
+        return None
+    abstract = " ".join(t.strip() for t in blockquotes[0].itertext() if t.strip())
+    if not abstract:
+        return None
+    title = tree.find(".//title")
+    parse_counts["lxml"] += 1
+    return {
+        "title": (title.text or "") if title is not None else "",
+        "abstract": clean_abstract(abstract),
+    }
+
+
+def abstract_from_strainer(html: str) -> Optional[Dict[str, str]]:
+    """<title> and the first <blockquote> via BeautifulSoup, building only those elements (SoupStrainer)"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(["title", "blockquote"]))
+    blockquote = soup.find("blockquote")
+    abstract = blockquote.get_text(separator=" ", strip=True) if blockquote else ""
+    if not abstract:
+        return None
+    title = soup.find("title")
+    parse_counts["strainer"] += 1
+    return {
+        "title": (title.string or "") if title else "",
+        "abstract": clean_abstract(abstract),
+    }
+
+
+def links_from_anchors(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    (arxiv_id, abs_url) of each title="Abstract" link on a list page, found
+    by scanning <a> start tags only. Empty if there are none.
+    """
+    links = []
+    seen = set()
+    for tag in _ANCHOR.findall(html):
+        if "Abstract" not in tag:
+            continue
+        attrs = _attrs(tag)
+        href = attrs.get("href", "")
+        if attrs.get("title") != "Abstract" or "/abs/" not in href:
+            continue
+        arxiv_id = href.split("/abs/")[-1].split("?")[0].strip("/")
+        if arxiv_id and _ARXIV_ID.match(arxiv_id) and arxiv_id not in seen:
+            seen.add(arxiv_id)
+            links.append((arxiv_id, f"{base_url}/abs/{arxiv_id}" if not href.startswith("http") else href.split("?")[0]))
+    if links:
+        parse_counts["anchors"] += 1
+    return links
@@ -0,0 +1,360 @@
+"""
+Async arXiv crawler
+Fetches list pages and abstract pages concurrently over one pooled HTTP
+client. A token bucket per host keeps the request rate polite, and list
+paging overlaps with abstract fetching.
+"""
+
+import os
+import time
+import asyncio
+import contextlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from scraper import (
+    ARXIV_BASE_URL,
+    LIST_PAGE_SIZE,
+    USER_AGENT,
+    abstract_saved,
+    list_page_url,
+    parse_abstract_page,
+    parse_list_page,
+    save_abstract,
+)
+from services.crawl_ledger import listing_key
+from services.lazy_import import LazyModule
+
+httpx = LazyModule("httpx")
+
+# Statuses that mean "slow down": the host is paused for Retry-After, then the request is retried
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """
+    Allows ``rate`` requests per second on average, in bursts of up to
+    ``burst``. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waited = 0.0  # total seconds callers spent waiting for a token
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for a token"""
+        if self.rate <= 0 and self.paused_until <= time.monotonic():
+            return
+        async with self._lock:
+            started = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    break
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+            self.waited += time.monotonic() - started
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next ``seconds`` (e.g. after a 429)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+def _retry_after(response, default: float) -> float:
+    value = response.headers.get("retry-after", "")
+    try:
+        return min(max(float(value), 0.0), 120.0)
+    except ValueError:
+        return default
+
+
+class ArxivCrawler:
+    """
+    Async counterpart of HTMLpull.fetch_arxiv_abstracts_bulk with the same
+    output. One task pages through the list while ``concurrency`` workers
+    fetch, parse and save abstracts. Every request to a host first takes a
+    token from that host's bucket and one of its connection slots.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ARXIV_BASE_URL,
+        concurrency: int = 4,
+        rate: float = 2.0,
+        burst: int = 2,
+        per_host_concurrency: int = 4,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        run_io: Optional[Callable[..., Awaitable[Any]]] = None,
+        http_cache=None,
+    ):
+        """
+        Initialize arXiv crawler
+
+        Args:
+            base_url: arXiv site to crawl (a local stand-in for benchmarks)
+            concurrency: Abstract pages fetched at once
+            rate: Requests per second per host (0 for no limit)
+            burst: Requests a host may get back to back before the rate applies
+            per_host_concurrency: Open requests per host
+            timeout: Seconds per HTTP request
+            max_retries: Retries of a request answered with 429 or 503
+            run_io: Coroutine function running blocking calls (HTML parsing,
+                    file writes, callbacks) off the event loop; defaults to
+                    asyncio.to_thread
+            http_cache: services.http_cache.HttpCache serving fresh pages without
+                        a request and revalidating stale ones with conditional GETs
+        """
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.run_io = run_io or asyncio.to_thread
+        self.http_cache = http_cache
+        self._client = None
+        self._hosts: Dict[str, Tuple[TokenBucket, asyncio.Semaphore]] = {}
+
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+        self.bytes_received = 0
+
+    @property
+    def client(self):
+        """Pooled HTTP client, created on first use"""
+        if self._client is None:
+            connections = self.per_host_concurrency + 2
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the HTTP client (call from the app lifespan)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host(self, url: str) -> Tuple[TokenBucket, asyncio.Semaphore]:
+        host = urlparse(url).netloc
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limiter = self._hosts[host] = (
+                TokenBucket(self.rate, self.burst),
+                asyncio.Semaphore(self.per_host_concurrency),
+            )
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Take a token and a connection slot for url's host, held until the block
+        exits (e.g. while streaming a download). Yields the host's bucket, so
+        a caller seeing 429/503 can pause the host.
+        """
+        bucket, slots = self._host(url)
+        await bucket.acquire()
+        async with slots:
+            self.requests += 1
+            yield bucket
+
+    async def get(self, url: str):
+        """
+        GET a URL politely: per-host rate and concurrency limits, backing off
+        on 429/503. Pages fresh in the HTTP cache skip the request (and the
+        rate limit) entirely; stale ones are revalidated.
+        """
+        cache = self.http_cache
+        entry = None
+        if cache is not None:
+            entry = await self.run_io(cache.lookup, url)
+            if entry is not None and entry["fresh"]:
+                cached = await self.run_io(cache.respond, entry, "fresh")
+                if cached is not None:
+                    return cached
+        headers = cache.conditional_headers(entry) if cache is not None else None
+        for attempt in range(self.max_retries + 1):
+            async with self.slot(url) as bucket:
+                response = await self.client.get(url, headers=headers)
+            self.bytes_received += len(response.content)
+            if response.status_code not in THROTTLE_STATUSES or attempt == self.max_retries:
+                break
+            self.retries += 1
+            bucket.pause(_retry_after(response, default=5.0 * (attempt + 1)))
+        if cache is not None:
+            cached = await self.run_io(
+                cache.update, url, entry, response.status_code, response.headers, response.content
+            )
+            if cached is not None:
+                return cached
+        return response
+
+    async def get_abstract_links(self, list_url: str) -> List[Tuple[str, str]]:
+        """(arxiv_id, abs_url) for each paper on a list page"""
+        response = await self.get(list_url)
+        if response.status_code == 400 and "?" in list_url:
+            # Some arXiv endpoints reject certain query params; try without
+            response = await self.get(list_url.split("?")[0])
+        response.raise_for_status()
+        return await self.run_io(parse_list_page, response.text, self.base_url)
+
+    async def scrape_arxiv_abstract(self, url: str) -> Dict[str, str]:
+        """Title and abstract of an abstract page, like HTMLpull.scrape_arxiv_abstract"""
+        response = await self.get(url)
+        response.raise_for_status()
+        parsed = await self.run_io(parse_abstract_page, response.text)
+        return {"url": url, **parsed}
+
+    async def fetch_arxiv_abstracts_bulk(
+        self,
+        subject: str,
+        year: Optional[int],
+        month: Optional[int],
+        max_papers: int,
+        data_dir: str,
+        on_saved: Optional[Callable[[Dict], None]] = None,
+        store=None,
+        ledger=None,
+        on_item: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    ) -> List[Dict]:
+        """
+        Fetch up to max_papers abstracts and save them like
+        HTMLpull.fetch_arxiv_abstracts_bulk: one {arxiv_id}_abstract.txt per
+        paper in data_dir, or in the corpus store if given. on_saved (a
+        blocking callable, run via run_io) gets each result right after it is
+        saved. Papers that fail are skipped.
+
+        on_item, a coroutine function, is then awaited with the result plus its
+        'abstract' text, so the next stage needn't read the file back. The
+        worker waits for it, so a bounded queue's put applies backpressure.
+
+        With a ledger (services.crawl_ledger.CrawlLedger), only papers not
+        fetched before count: papers an earlier crawl listed but didn't fetch
+        and failed papers due for a retry go first, then paging skips ids the
+        ledger knows and resumes from the listing's cursor once it catches up
+        with what earlier crawls listed.
+
+        Returns:
+            List of dicts with 'id', 'title', 'filename' and 'subject', in list order
+        """
+        import logging
+        logger = logging.getLogger("uvicorn")
+
+        await self.run_io(os.makedirs, data_dir, exist_ok=True)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results: Dict[int, Dict] = {}
+        listing = listing_key(subject, year, month)
+
+        def exists(arxiv_id):
+            return abstract_saved(arxiv_id, data_dir, store)
+
+        async def page():
+            # List pages are fetched one after another (the next skip depends on
+            # this page's size), while the workers drain the queue
+            queued, skip, cursor = 0, 0, 0
+            if ledger is not None:
+                for arxiv_id, abs_url in await self.run_io(ledger.pending, listing, max_papers):
+                    await queue.put((queued, arxiv_id, abs_url))
+                    queued += 1
+                cursor = await self.run_io(ledger.cursor, listing)
+            while queued < max_papers:
+                list_url = list_page_url(self.base_url, subject, year, month, skip, LIST_PAGE_SIZE)
+                try:
+                    batch = await self.get_abstract_links(list_url)
+                except Exception as e:
+                    if not queued:
+                        raise RuntimeError(f"Failed to fetch list page {list_url}: {e}") from e
+                    logger.warning(f"Failed to fetch list page {list_url}, keeping {queued} papers: {e}")
+                    return
+                new = batch
+                if ledger is not None:
+                    new = await self.run_io(ledger.record_listed, listing, batch, exists)
+                for arxiv_id, abs_url in new[:max_papers - queued]:
+                    await queue.put((queued, arxiv_id, abs_url))
+                    queued += 1
+                if len(batch) < LIST_PAGE_SIZE:
+                    if ledger is not None:
+                        await self.run_io(ledger.set_cursor, listing, 0, True)
+                    return
+                skip += LIST_PAGE_SIZE
+                if ledger is not None:
+                    if not new and skip < cursor:
+                        # Caught up with what earlier crawls listed: resume where they stopped
+                        skip = cursor
+                    if skip > cursor:
+                        cursor = skip
+                        await self.run_io(ledger.set_cursor, listing, cursor)
+
+        async def work():
+            while True:
+                entry = await queue.get()
+                if entry is None:
+                    return
+                index, arxiv_id, abs_url = entry
+                try:
+                    data = await self.scrape_arxiv_abstract(abs_url)
+                    title = data.get("title") or arxiv_id
+                    abstract = (data.get("abstract") or "").strip()
+                    if not abstract:
+                        if ledger is not None:
+                            await self.run_io(ledger.mark_failed, arxiv_id, "No abstract on page")
+                        continue
+                    filename = await self.run_io(save_abstract, arxiv_id, title, abstract, subject, data_dir, store)
+                    if ledger is not None:
+                        await self.run_io(ledger.mark_fetched, arxiv_id, filename)
+                    item = {"id": arxiv_id, "title": title, "filename": filename, "subject": subject}
+                    results[index] = item
+                    if on_saved:
+                        await self.run_io(on_saved, item)
+                    if on_item:
+                        await on_item({**item, "abstract": abstract})
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Failed to fetch abstract {abs_url}: {e}")
+                    if ledger is not None:
+                        await self.run_io(ledger.mark_failed, arxiv_id, str(e))
+
+        pager = asyncio.create_task(page())
+        workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            await pager
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            # Also runs when the caller is cancelled (e.g. the client disconnected)
+            for task in [pager, *workers]:
+                task.cancel()
+            await asyncio.gather(pager, *workers, return_exceptions=True)
+        return [results[i] for i in sorted(results)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts and time spent waiting on the per-host rate limits"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failed": self.failed,
+            "bytes_received": self.bytes_received,
+            "rate_limit_wait_seconds": {
+                host: round(bucket.waited, 3) for host, (bucket, _) in self._hosts.items()
+            },
+        }
@@ -0,0 +1,307 @@
+"""
+Concurrent arXiv PDF downloader
+Streams PDFs into the data directory through the async crawler's pooled
+client and per-host limits. Each download goes to a hidden .part file that
+is renamed into place only once it is complete and looks like a PDF, and an
+interrupted download resumes with an HTTP Range request.
+"""
+
+import os
+import json
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from async_crawler import THROTTLE_STATUSES, ArxivCrawler, _retry_after
+
+PDF_MAGIC = b"%PDF-"
+PDF_EOF = b"%%EOF"
+WRITE_BUFFER = 1024 * 1024  # bytes collected before each write to disk
+
+
+class PdfError(Exception):
+    """A download that can't be used (not a PDF, wrong size, too large)"""
+
+
+def pdf_filename(arxiv_id: str) -> str:
+    """Filename of a paper's PDF in the data directory ({arxiv_id}.pdf)"""
+    return f"{arxiv_id.replace('/', '_')}.pdf"
+
+
+def pdf_intact(path: str, min_bytes: int = 1024) -> bool:
+    """Whether a file is a complete-looking PDF: %PDF- header and %%EOF near the end"""
+    try:
+        size = os.path.getsize(path)
+        if size < min_bytes:
+            return False
+        with open(path, "rb") as f:
+            if f.read(len(PDF_MAGIC)) != PDF_MAGIC:
+                return False
+            f.seek(max(0, size - 2048))
+            return PDF_EOF in f.read()
+    except OSError:
+        return False
+
+
+def _content_range_total(value: str) -> Optional[int]:
+    # "bytes 100-999/1000" -> 1000 ("*" when the server doesn't know)
+    total = value.rpartition("/")[2].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _content_range_start(value: str) -> Optional[int]:
+    start = value.partition(" ")[2].partition("-")[0].strip()
+    return int(start) if start.isdigit() else None
+
+
+class PdfDownloader:
+    """
+    Downloads arXiv PDFs ``concurrency`` at a time. Requests go through the
+    crawler's per-host token bucket and connection slots (a download holds
+    its slot while it streams), so PDFs and abstract pages share one polite
+    rate per host.
+
+    - Files already present and intact are skipped
+    - A download is streamed to .{name}.part next to its destination, checked
+      (PDF header, %%EOF trailer, Content-Length/Content-Range size, max_bytes)
+      and moved into place with os.replace, so the data directory never holds
+      a partial PDF
+    - A .part left by a failed or interrupted download is resumed with
+      Range/If-Range; its validators are kept in a .part.json sidecar
+    """
+
+    def __init__(
+        self,
+        crawler: ArxivCrawler,
+        concurrency: int = 4,
+        max_bytes: int = 100 * 1024 * 1024,
+        min_bytes: int = 1024,
+        max_retries: int = 2,
+    ):
+        """
+        Initialize PDF downloader
+
+        Args:
+            crawler: Crawler whose client, host limits and run_io are used
+            concurrency: PDFs downloaded at once (per-host slots still apply)
+            max_bytes: Largest PDF accepted
+            min_bytes: Smallest file accepted as a PDF
+            max_retries: Retries of a failed download, resuming from what was received
+        """
+        self.crawler = crawler
+        self.concurrency = max(1, concurrency)
+        self.max_bytes = max_bytes
+        self.min_bytes = min_bytes
+        self.max_retries = max_retries
+        self.run_io = crawler.run_io
+
+        self.downloaded = 0
+        self.resumed = 0
+        self.present = 0
+        self.failed = 0
+        self.bytes_received = 0
+
+    def pdf_url(self, arxiv_id: str) -> str:
+        return f"{self.crawler.base_url}/pdf/{arxiv_id}"
+
+    async def download(self, arxiv_id: str, data_dir: str) -> Dict[str, Any]:
+        """
+        Download one paper's PDF into data_dir unless an intact copy is there
+
+        Returns:
+            Dict with 'id', 'filename', 'status' ('present', 'downloaded' or
+            'resumed') and 'bytes'
+        """
+        filename = pdf_filename(arxiv_id)
+        dest = os.path.join(data_dir, filename)
+        if await self.run_io(pdf_intact, dest, self.min_bytes):
+            self.present += 1
+            return {"id": arxiv_id, "filename": filename, "status": "present", "bytes": os.path.getsize(dest)}
+
+        part = os.path.join(data_dir, f".{filename}.part")
+        url = self.pdf_url(arxiv_id)
+        resumed = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                resumed = await self._fetch(url, part) or resumed
+                break
+            except PdfError:
+                await self.run_io(_remove, part, part + ".json")
+                raise
+            except Exception:
+                # Network trouble: keep the .part and resume from it
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(2.0 * (attempt + 1))
+
+        if not await self.run_io(pdf_intact, part, self.min_bytes):
+            await self.run_io(_remove, part, part + ".json")
+            raise PdfError("Download is not a complete PDF")
+        size = await self.run_io(_commit, part, dest)
+        if resumed:
+            self.resumed += 1
+        else:
+            self.downloaded += 1
+        return {"id": arxiv_id, "filename": filename, "status": "resumed" if resumed else "downloaded", "bytes": size}
+
+    async def _fetch(self, url: str, part: str) -> bool:
+        """Stream url into part, resuming if it has bytes already; True if a resume was used"""
+        have, validators = await self.run_io(_partial_state, part)
+        headers = {"Accept-Encoding": "identity"}  # so Content-Length and ranges count file bytes
+        if have:
+            headers["Range"] = f"bytes={have}-"
+            validator = validators.get("etag") or validators.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+
+        for attempt in range(self.crawler.max_retries + 1):
+            async with self.crawler.slot(url) as bucket:
+                async with self.crawler.client.stream("GET", url, headers=headers) as response:
+                    status = response.status_code
+                    if status in THROTTLE_STATUSES and attempt < self.crawler.max_retries:
+                        self.crawler.retries += 1
+                        bucket.pause(_retry_after(response, default=5.0 * (attempt + 1)))
+                        continue
+                    if status == 416 and have:
+                        # Nothing left to send: the .part already holds the whole file
+                        return True
+                    if 400 <= status < 500:
+                        raise PdfError(f"HTTP {status}")
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "")
+                    if "html" in content_type:
+                        raise PdfError(f"Got {content_type} instead of a PDF")
+
+                    if status == 206:
+                        content_range = response.headers.get("content-range", "")
+                        if _content_range_start(content_range) != have:
+                            raise PdfError(f"Unexpected Content-Range {content_range!r} resuming at {have}")
+                        total = _content_range_total(content_range)
+                        offset = have
+                    else:
+                        # 200: the server sent the whole file (no Range support, or it changed)
+                        length = response.headers.get("content-length", "")
+                        total = int(length) if length.isdigit() else None
+                        offset = 0
+                        await self.run_io(
+                            _write_validators, part,
+                            response.headers.get("etag"), response.headers.get("last-modified"),
+                        )
+                    if total is not None and total > self.max_bytes:
+                        raise PdfError(f"PDF is {total} bytes, over the {self.max_bytes} byte limit")
+
+                    written = await self._stream(response, part, offset)
+                    if total is not None and written != total:
+                        raise ConnectionError(f"Got {written} of {total} bytes")
+                    return status == 206
+
+    async def _stream(self, response, part: str, offset: int) -> int:
+        """Write the body to part starting at offset; returns the file's size"""
+        f = await self.run_io(_open_at, part, offset)
+        buffer = bytearray()
+        try:
+            size = offset
+            async for chunk in response.aiter_bytes():
+                if size == 0 and not buffer and not chunk.startswith(PDF_MAGIC[:len(chunk)]):
+                    raise PdfError("Response does not start with a PDF header")
+                buffer += chunk
+                size += len(chunk)
+                self.bytes_received += len(chunk)
+                if size > self.max_bytes:
+                    raise PdfError(f"PDF is over the {self.max_bytes} byte limit")
+                if len(buffer) >= WRITE_BUFFER:
+                    await self.run_io(f.write, bytes(buffer))
+                    buffer.clear()
+            return size
+        finally:
+            # Also on a dropped connection: what arrived is kept for the Range resume
+            if buffer:
+                await self.run_io(f.write, bytes(buffer))
+            await self.run_io(f.close)
+
+    async def download_many(
+        self,
+        arxiv_ids: List[str],
+        data_dir: str,
+        on_saved: Optional[Callable[[Dict], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Download PDFs for many papers, ``concurrency`` at a time. on_saved (a
+        blocking callable, run via run_io) gets each newly downloaded file.
+        Failures are logged and returned with an 'error' instead of a filename.
+
+        Returns:
+            One result dict per id, in the given order
+        """
+        import logging
+        logger = logging.getLogger("uvicorn")
+
+        await self.run_io(os.makedirs, data_dir, exist_ok=True)
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def one(arxiv_id):
+            async with slots:
+                try:
+                    result = await self.download(arxiv_id, data_dir)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Failed to download PDF for {arxiv_id}: {e}")
+                    return {"id": arxiv_id, "error": str(e)}
+                if on_saved and result["status"] != "present":
+                    await self.run_io(on_saved, result)
+                return result
+
+        return await asyncio.gather(*[one(arxiv_id) for arxiv_id in arxiv_ids])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "downloaded": self.downloaded,
+            "resumed": self.resumed,
+            "present": self.present,
+            "failed": self.failed,
+            "bytes_received": self.bytes_received,
+        }
+
+
+def _partial_state(part: str):
+    """Bytes already in a .part file and the validators of the response it came from"""
+    try:
+        have = os.path.getsize(part)
+    except OSError:
+        return 0, {}
+    try:
+        with open(part + ".json", encoding="utf-8") as f:
+            return have, json.load(f)
+    except (OSError, ValueError):
+        # No validators: the range can't be checked against the original response
+        return 0, {}
+
+
+def _write_validators(part: str, etag: Optional[str], last_modified: Optional[str]):
+    with open(part + ".json", "w", encoding="utf-8") as f:
+        json.dump({"etag": etag, "last_modified": last_modified}, f)
+
+
+def _open_at(part: str, offset: int):
+    f = open(part, "r+b" if offset else "wb")
+    f.seek(offset)
+    f.truncate()
+    return f
+
+
+def _commit(part: str, dest: str) -> int:
+    """Flush a finished .part to disk and rename it into place atomically"""
+    with open(part, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(part, dest)
+    _remove(part + ".json")
+    return os.path.getsize(dest)
+
+
+def _remove(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,10 +1,133 @@
 import re
 import time
 import os
-import requests
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+from arxiv_html import (
+    abstract_from_lxml,
+    abstract_from_meta,
+    abstract_from_strainer,
+    clean_abstract,
+    links_from_anchors,
+    parse_counts,
+)
+
+# requests and BeautifulSoup are imported where they are first used, so
+# importing this module (as the backend does at startup) stays cheap
+
+ARXIV_BASE_URL = "https://arxiv.org"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+# arXiv accepts show=25, 50, 100, or 2000 (show=200 returns 400)
+LIST_PAGE_SIZE = 50
+
+
+def list_page_url(base_url, subject, year, month, skip, show=LIST_PAGE_SIZE):
+    """URL of an arXiv list page: the month's listing, or 'recent' if year/month are None"""
+    if year is not None and month is not None:
+        return f"{base_url}/list/{subject}/{year:04d}-{month:02d}?skip={skip}&show={show}"
+    return f"{base_url}/list/{subject}/recent?skip={skip}&show={show}"
+
+
+def parse_abstract_page(html):
+    """
+    Title and abstract text of an arXiv abstract page. Tries the targeted
+    extractors in arxiv_html (citation_abstract meta tag, then lxml or a
+    SoupStrainer) before parsing the whole page with BeautifulSoup.
+    """
+    parsed = abstract_from_meta(html) or abstract_from_lxml(html) or abstract_from_strainer(html)
+    if parsed is None:
+        parsed = parse_abstract_page_soup(html)
+        parsed['abstract'] = clean_abstract(parsed['abstract'])
+    return parsed
+
+
+def parse_abstract_page_soup(html):
+    """Title and abstract text of an arXiv abstract page, from a full BeautifulSoup tree"""
+    parse_counts['soup'] += 1
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    title = soup.title.string if soup.title else ''
+    # arXiv puts the abstract in a blockquote; fallback to meta description or first blockquote
+    abstract = ''
+    blockquote = soup.find('blockquote')
+    if blockquote:
+        abstract = blockquote.get_text(separator=' ', strip=True)
+    if not abstract:
+        meta = soup.find('meta', attrs={'name': 'citation_abstract'})
+        if meta and meta.get('content'):
+            abstract = meta.get('content', '')
+    if not abstract:
+        # Fallback: find element containing "Abstract" and take following text
+        for elem in soup.find_all(['p', 'div', 'span']):
+            text = elem.get_text(strip=True)
+            if text.startswith('Abstract') and len(text) > 20:
+                abstract = text.replace('Abstract:', '').replace('Abstract', '', 1).strip()
+                break
+    return {
+        'title': title,
+        'abstract': abstract.strip() if abstract else '',
+    }
+
+
+def parse_list_page(html, base_url=ARXIV_BASE_URL):
+    """
+    (arxiv_id, abs_url) for each paper on an arXiv list page, in page order.
+    Scans <a> tags directly (arxiv_html.links_from_anchors) and only parses the
+    page with BeautifulSoup if that finds nothing.
+    """
+    return links_from_anchors(html, base_url) or parse_list_page_soup(html, base_url)
+
+
+def parse_list_page_soup(html, base_url=ARXIV_BASE_URL):
+    """(arxiv_id, abs_url) for each paper on an arXiv list page, from a full BeautifulSoup tree"""
+    parse_counts['soup_links'] += 1
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    # arXiv list pages: links with title="Abstract" point to /abs/XXXX.YYYY
+    for a in soup.find_all('a', href=True):
+        if a.get('title') == 'Abstract':
+            href = a['href']
+            if '/abs/' in href:
+                # href can be /abs/2401.00001 or full url
+                arxiv_id = href.split('/abs/')[-1].split('?')[0].strip('/')
+                # allow e.g. 2401.00001 or 2401.00001v1
+                if arxiv_id and re.match(r'^[\d.]+\w*$', arxiv_id):
+                    abs_url = f"{base_url}/abs/{arxiv_id}" if not href.startswith('http') else href.split('?')[0]
+                    links.append((arxiv_id, abs_url))
+    # Deduplicate by arxiv_id while preserving order
+    seen = set()
+    unique = []
+    for aid, url in links:
+        if aid not in seen:
+            seen.add(aid)
+            unique.append((aid, url))
+    return unique
+
+
+def save_abstract(arxiv_id, title, abstract, subject, data_dir, store=None):
+    """
+    Save a fetched abstract as {arxiv_id}_abstract.txt in data_dir, or in the
+    corpus store if one is given. Returns the filename.
+    """
+    if store is not None:
+        return store.put_abstract(arxiv_id, title, abstract, subject=subject)
+    # Save as {arxiv_id}_abstract.txt (safe filename: no slashes)
+    safe_id = arxiv_id.replace('/', '_')
+    filename = f"{safe_id}_abstract.txt"
+    filepath = os.path.join(data_dir, filename)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(f"Title: {title}\n\nAbstract:\n{abstract}\n")
+    return filename
+
+
+def abstract_saved(arxiv_id, data_dir, store=None):
+    """Whether save_abstract already saved this paper (in the corpus store or data_dir)"""
+    if store is not None:
+        return store.has_id(arxiv_id)
+    return os.path.exists(os.path.join(data_dir, f"{arxiv_id.replace('/', '_')}_abstract.txt"))
+
 
 # class ArxivScraper:
 #     def __init__(self):
@@ -259,17 +382,38 @@ from bs4 import BeautifulSoup
 #// ...existing code...
 
 class HTMLpull:
-    def __init__(self):
-        """Initialize the HTML scraper"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, base_url=ARXIV_BASE_URL, http_cache=None):
+        """
+        Initialize the HTML scraper (base_url can point at a local arXiv stand-in).
+        With an http_cache (services.http_cache.HttpCache), pages are served from
+        disk while fresh and revalidated with conditional GETs once stale.
+        """
+        self.base_url = base_url
+        self.http_cache = http_cache
+        self._session = None
+    
+    @property
+    def session(self):
+        """HTTP session, created on first use"""
+        if self._session is None:
+            import requests
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': USER_AGENT
+            })
+            self._session = session
+        return self._session
+
+    def _get(self, url, timeout=30):
+        """GET a page through the HTTP cache, if there is one"""
+        if self.http_cache is None:
+            return self.session.get(url, timeout=timeout)
+        return self.http_cache.get(url, lambda headers: self.session.get(url, timeout=timeout, headers=headers))
     
     def scrape_with_images(self, url):
         """Scrape a single webpage and return parsed content"""
         # Fetch the webpage
-        response = self.session.get(url, timeout=30)
+        response = self._get(url)
         response.raise_for_status()
         
         # Parse with Beautiful Soup
@@ -303,7 +447,7 @@ class HTMLpull:
     def scrape(self, url):
         """Scrape a single webpage and return parsed content"""
         # Fetch the webpage
-        response = self.session.get(url, timeout=30)
+        response = self._get(url)
         response.raise_for_status()
         
         # Parse with Beautiful Soup
@@ -326,97 +470,77 @@ class HTMLpull:
         Scrape an arXiv abstract page (e.g. https://arxiv.org/abs/XXXX.XXXXX)
         and return only the title and abstract section.
         """
-        response = self.session.get(url, timeout=30)
+        response = self._get(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        title = soup.title.string if soup.title else ''
-        # arXiv puts the abstract in a blockquote; fallback to meta description or first blockquote
-        abstract = ''
-        blockquote = soup.find('blockquote')
-        if blockquote:
-            abstract = blockquote.get_text(separator=' ', strip=True)
-        if not abstract:
-            meta = soup.find('meta', attrs={'name': 'citation_abstract'})
-            if meta and meta.get('content'):
-                abstract = meta.get('content', '')
-        if not abstract:
-            # Fallback: find element containing "Abstract" and take following text
-            for elem in soup.find_all(['p', 'div', 'span']):
-                text = elem.get_text(strip=True)
-                if text.startswith('Abstract') and len(text) > 20:
-                    abstract = text.replace('Abstract:', '').replace('Abstract', '', 1).strip()
-                    break
-        return {
-            'url': url,
-            'title': title,
-            'abstract': abstract.strip() if abstract else '',
-        }
+        return {'url': url, **parse_abstract_page(response.text)}
 
     def get_abstract_links_from_list_page(self, list_url):
         """
         Fetch an arXiv list page (e.g. /list/cs/recent or /list/cs/2024-01) and
         return a list of (arxiv_id, abs_url) for each paper's abstract page.
         """
-        response = self.session.get(list_url, timeout=30)
+        response = self._get(list_url)
         if response.status_code == 400 and "?" in list_url:
             # Some arXiv endpoints reject certain query params; try without
             list_url = list_url.split("?")[0]
-            response = self.session.get(list_url, timeout=30)
+            response = self._get(list_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links = []
-        # arXiv list pages: links with title="Abstract" point to /abs/XXXX.YYYY
-        for a in soup.find_all('a', href=True):
-            if a.get('title') == 'Abstract':
-                href = a['href']
-                if '/abs/' in href:
-                    # href can be /abs/2401.00001 or full url
-                    arxiv_id = href.split('/abs/')[-1].split('?')[0].strip('/')
-                    # allow e.g. 2401.00001 or 2401.00001v1
-                    if arxiv_id and re.match(r'^[\d.]+\w*$', arxiv_id):
-                        abs_url = f"https://arxiv.org/abs/{arxiv_id}" if not href.startswith('http') else href.split('?')[0]
-                        links.append((arxiv_id, abs_url))
-        # Deduplicate by arxiv_id while preserving order
-        seen = set()
-        unique = []
-        for aid, url in links:
-            if aid not in seen:
-                seen.add(aid)
-                unique.append((aid, url))
-        return unique
-
-    def fetch_arxiv_abstracts_bulk(self, subject, year, month, max_papers, data_dir, delay=0.5):
+        return parse_list_page(response.text, self.base_url)
+
+    def fetch_arxiv_abstracts_bulk(self, subject, year, month, max_papers, data_dir, delay=0.5, on_saved=None, store=None,
+                                   ledger=None):
         """
         Fetch abstracts from arXiv list pages (no PDFs). For each paper, fetch the
         abstract page HTML, extract the abstract text, and save to data_dir as
         {arxiv_id}_abstract.txt. Returns list of saved filenames and metadata.
         If year/month are None, uses the 'recent' list for the subject.
+        on_saved, if given, is called with each result dict right after its file
+        is written (e.g. to update the file catalog).
+        store, if given, is a corpus store (put_abstract) used instead of writing
+        one .txt file per paper.
+        ledger, if given, is a crawl ledger (services.crawl_ledger.CrawlLedger):
+        only papers not fetched before are fetched, unfinished and due failed
+        papers of this listing go first, and paging resumes from the listing's
+        cursor (see ArxivCrawler.fetch_arxiv_abstracts_bulk).
         """
         os.makedirs(data_dir, exist_ok=True)
-        # arXiv accepts show=25, 50, 100, or 2000 (show=200 returns 400)
-        show = 50
+        show = LIST_PAGE_SIZE
         skip = 0
         all_ids_urls = []
-        if year is not None and month is not None:
-            base_url = f"https://arxiv.org/list/{subject}/{year:04d}-{month:02d}"
-        else:
-            base_url = f"https://arxiv.org/list/{subject}/recent"
+        cursor = 0
+        if ledger is not None:
+            from services.crawl_ledger import listing_key
+            listing = listing_key(subject, year, month)
+            all_ids_urls = ledger.pending(listing, max_papers)
+            cursor = ledger.cursor(listing)
         while len(all_ids_urls) < max_papers:
-            list_url = f"{base_url}?skip={skip}&show={show}"
+            list_url = list_page_url(self.base_url, subject, year, month, skip, show)
             try:
                 batch = self.get_abstract_links_from_list_page(list_url)
             except Exception as e:
+                if all_ids_urls and ledger is not None:
+                    break  # fetch what was already listed; the next crawl resumes from the cursor
                 raise RuntimeError(f"Failed to fetch list page {list_url}: {e}") from e
             if not batch:
                 break
-            for aid, abs_url in batch:
+            new = batch
+            if ledger is not None:
+                new = ledger.record_listed(listing, batch, lambda aid: abstract_saved(aid, data_dir, store))
+            for aid, abs_url in new:
                 if len(all_ids_urls) >= max_papers:
                     break
                 all_ids_urls.append((aid, abs_url))
             if len(batch) < show:
+                if ledger is not None:
+                    ledger.set_cursor(listing, 0, complete=True)
                 break
             skip += show
+            if ledger is not None:
+                if not new and skip < cursor:
+                    skip = cursor  # caught up with earlier crawls: resume where they stopped
+                if skip > cursor:
+                    cursor = skip
+                    ledger.set_cursor(listing, cursor)
             time.sleep(delay)
         result = []
         for i, (arxiv_id, abs_url) in enumerate(all_ids_urls):
@@ -425,15 +549,19 @@ class HTMLpull:
                 title = data.get('title') or arxiv_id
                 abstract = (data.get('abstract') or '').strip()
                 if not abstract:
+                    if ledger is not None:
+                        ledger.mark_failed(arxiv_id, "No abstract on page")
                     continue
-                # Save as {arxiv_id}_abstract.txt (safe filename: no slashes)
-                safe_id = arxiv_id.replace('/', '_')
-                filename = f"{safe_id}_abstract.txt"
-                filepath = os.path.join(data_dir, filename)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(f"Title: {title}\n\nAbstract:\n{abstract}\n")
-                result.append({"id": arxiv_id, "title": title, "filename": filename})
+                filename = save_abstract(arxiv_id, title, abstract, subject, data_dir, store)
+                if ledger is not None:
+                    ledger.mark_fetched(arxiv_id, filename)
+                item = {"id": arxiv_id, "title": title, "filename": filename, "subject": subject}
+                result.append(item)
+                if on_saved:
+                    on_saved(item)
             except Exception as e:
+                if ledger is not None:
+                    ledger.mark_failed(arxiv_id, str(e))
                 continue  # skip failed papers
             if delay > 0:
                 time.sleep(delay)